@@ -3,6 +3,9 @@ from flask_cors import CORS
 import os
 
 def create_app():
+    from app.services.log import configure_logging
+    configure_logging()
+    
     # Get absolute path to app directory
     app_dir = os.path.dirname(os.path.abspath(__file__))
     
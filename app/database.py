@@ -1,190 +1,55 @@
 """
 Database management for Email Extractor Platform
-Uses MySQL for scalability
+Runs on a pluggable storage backend: MySQL for scalability, or embedded SQLite (WAL)
 """
 
-import mysql.connector
-from mysql.connector import Error
 import json
-from datetime import datetime
-from config import MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB
+from datetime import datetime, timedelta
+from app.storage import get_backend
+from app.services.metrics import DB_WRITE_SECONDS, timed
+from app.services.tracing import trace_methods
+from app.services.log import get_logger
 
+log = get_logger(__name__)
 
+
+@trace_methods('db', exclude=('get_connection', 'create_database'))
 class Database:
-    def __init__(self):
-        self.init_database()
-        self.migrate_database()
-    
+    """
+    Runtime data access. Performs no DDL - the schema is managed by the
+    versioned migrations in app/migrations.py (python scripts/migrate_db.py)
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+
+    @property
+    def backend(self):
+        # Created on first use so constructing a Database doesn't import the DB driver
+        if self._backend is None:
+            self._backend = get_backend()
+        return self._backend
+
     def get_connection(self):
         """Create database connection"""
-        try:
-            conn = mysql.connector.connect(
-                host=MYSQL_HOST,
-                user=MYSQL_USER,
-                password=MYSQL_PASSWORD,
-                database=MYSQL_DB
-            )
-            return conn
-        except Error as e:
-            print(f"Error connecting to MySQL: {e}")
-            # Try to connect without DB to create it if it doesn't exist
-            if "Unknown database" in str(e):
-                self.create_database()
-                return self.get_connection()
-            return None
+        return self.backend.connect()
 
     def create_database(self):
         """Create the database if it doesn't exist"""
-        try:
-            conn = mysql.connector.connect(
-                host=MYSQL_HOST,
-                user=MYSQL_USER,
-                password=MYSQL_PASSWORD
-            )
-            cursor = conn.cursor()
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {MYSQL_DB}")
-            print(f"Database '{MYSQL_DB}' created successfully")
-            conn.close()
-        except Error as e:
-            print(f"Error creating database: {e}")
-
-    def init_database(self):
-        """Initialize database tables"""
-        conn = self.get_connection()
-        if not conn:
-            return
+        self.backend.create_database()
 
-        cursor = conn.cursor()
-        
-        # Searches table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS searches (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                query VARCHAR(255) NOT NULL,
-                status VARCHAR(50) DEFAULT 'pending',
-                total_emails INT DEFAULT 0,
-                pages_crawled INT DEFAULT 0,
-                current_url TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP NULL
-            )
-        ''')
-        
-        # Emails table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS emails (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                search_id INT NOT NULL,
-                email VARCHAR(191) NOT NULL,
-                source_url TEXT,
-                domain VARCHAR(191),
-                found_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE,
-                UNIQUE KEY unique_email (search_id, email)
-            )
-        ''')
-        
-        # Phones table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS phones (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                search_id INT NOT NULL,
-                phone VARCHAR(50) NOT NULL,
-                source_url TEXT,
-                found_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE,
-                UNIQUE KEY unique_phone (search_id, phone)
-            )
-        ''')
-        
-        # Businesses table (for Yelp, Maps, etc.)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS businesses (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                search_id INT NOT NULL,
-                name VARCHAR(255),
-                phone VARCHAR(50),
-                address TEXT,
-                website TEXT,
-                rating DECIMAL(3,2),
-                review_count INT,
-                source VARCHAR(50) DEFAULT 'Yelp',
-                found_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Crawled URLs table (to avoid duplicate crawling)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS crawled_urls (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                search_id INT NOT NULL,
-                url TEXT NOT NULL,
-                crawled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE
+    def _bump_counters(self, cursor, deltas):
+        """Apply deltas to the aggregate counters within the caller's transaction"""
+        for name, delta in deltas.items():
+            if not delta:
+                continue
+            cursor.execute(
+                'INSERT INTO stats_counters (name, value) VALUES (%s, %s) '
+                + self.backend.on_conflict(['name'], f"value = value + {self.backend.excluded('value')}"),
+                (name, delta)
             )
-        ''')
-        
-        conn.commit()
-        conn.close()
-
-    def migrate_database(self):
-        """Add missing columns to tables"""
-        conn = self.get_connection()
-        if not conn: return
-        cursor = conn.cursor()
-        try:
-            # Check if search_type exists
-            cursor.execute("SHOW COLUMNS FROM searches LIKE 'search_type'")
-            if not cursor.fetchone():
-                cursor.execute("ALTER TABLE searches ADD COLUMN search_type VARCHAR(50) DEFAULT 'web'")
-                print("Added search_type column")
-            
-            # Check if engine exists
-            cursor.execute("SHOW COLUMNS FROM searches LIKE 'engine'")
-            if not cursor.fetchone():
-                cursor.execute("ALTER TABLE searches ADD COLUMN engine VARCHAR(50) DEFAULT 'duckduckgo'")
-                print("Added engine column")
-            
-            # Add business columns to emails table
-            cursor.execute("SHOW COLUMNS FROM emails LIKE 'business_name'")
-            if not cursor.fetchone():
-                cursor.execute("ALTER TABLE emails ADD COLUMN business_name VARCHAR(255)")
-                print("Added business_name to emails")
-            
-            cursor.execute("SHOW COLUMNS FROM emails LIKE 'website'")
-            if not cursor.fetchone():
-                cursor.execute("ALTER TABLE emails ADD COLUMN website TEXT")
-                print("Added website to emails")
-            
-            cursor.execute("SHOW COLUMNS FROM emails LIKE 'address'")
-            if not cursor.fetchone():
-                cursor.execute("ALTER TABLE emails ADD COLUMN address TEXT")
-                print("Added address to emails")
-            
-            # Add business columns to phones table
-            cursor.execute("SHOW COLUMNS FROM phones LIKE 'business_name'")
-            if not cursor.fetchone():
-                cursor.execute("ALTER TABLE phones ADD COLUMN business_name VARCHAR(255)")
-                print("Added business_name to phones")
-            
-            cursor.execute("SHOW COLUMNS FROM phones LIKE 'website'")
-            if not cursor.fetchone():
-                cursor.execute("ALTER TABLE phones ADD COLUMN website TEXT")
-                print("Added website to phones")
-            
-            cursor.execute("SHOW COLUMNS FROM phones LIKE 'address'")
-            if not cursor.fetchone():
-                cursor.execute("ALTER TABLE phones ADD COLUMN address TEXT")
-                print("Added address to phones")
-                
-            conn.commit()
-        except Error as e:
-            print(f"Migration error: {e}")
-        finally:
-            conn.close()
-
 
+    @timed(DB_WRITE_SECONDS, operation='create_search')
     def create_search(self, query, search_type='web', engine='duckduckgo'):
         """Create new search record"""
         conn = self.get_connection()
@@ -194,15 +59,31 @@ class Database:
             (query, 'running', search_type, engine)
         )
         search_id = cursor.lastrowid
+        self._bump_counters(cursor, {'total_searches': 1})
         conn.commit()
         conn.close()
         return search_id
     
+    @timed(DB_WRITE_SECONDS, operation='update_search_status')
     def update_search_status(self, search_id, status, pages_crawled=None, total_emails=None, current_url=None):
         """Update search status"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # Lock the row so counter deltas are computed against the stored totals
+        deltas = {}
+        if pages_crawled is not None or total_emails is not None:
+            cursor.execute(
+                'SELECT pages_crawled, total_emails FROM searches WHERE id = %s' + self.backend.lock_rows,
+                (search_id,)
+            )
+            row = cursor.fetchone()
+            if row:
+                if pages_crawled is not None:
+                    deltas['total_pages_crawled'] = pages_crawled - (row[0] or 0)
+                if total_emails is not None:
+                    deltas['total_emails_found'] = total_emails - (row[1] or 0)
+        
         update_parts = ['status = %s']
         params = [status]
         
@@ -229,45 +110,116 @@ class Database:
         
         query = f"UPDATE searches SET {', '.join(update_parts)} WHERE id = %s"
         cursor.execute(query, tuple(params))
+        self._bump_counters(cursor, deltas)
         conn.commit()
         conn.close()
     
+    def _link_contact(self, cursor, search_id, kind, value, source_url, domain=None,
+                      business_name=None, website=None, address=None, display=None):
+        """
+        Store a contact once globally and link it to a search
+
+        value is the unique key (an email, or a phone's E.164 form); display,
+        for phones, is how the number is shown.
+
+        Returns:
+            True if the contact was new for this search
+        """
+        cursor.execute(
+            f'{self.backend.insert_ignore} INTO contacts '
+            '(kind, value, display, domain, source_url, business_name, website, address, hit_count) '
+            'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0)',
+            (kind, value, display, domain, source_url, business_name, website, address)
+        )
+        cursor.execute('SELECT id FROM contacts WHERE kind = %s AND value = %s', (kind, value))
+        contact_id = cursor.fetchone()[0]
+
+        cursor.execute(
+            f'{self.backend.insert_ignore} INTO search_contacts (search_id, contact_id) VALUES (%s, %s)',
+            (search_id, contact_id)
+        )
+        if cursor.rowcount <= 0:
+            return False
+
+        # hit_count counts the searches that found this contact
+        cursor.execute(
+            'UPDATE contacts SET hit_count = hit_count + 1, last_seen = CURRENT_TIMESTAMP, '
+            'business_name = COALESCE(business_name, %s), website = COALESCE(website, %s), '
+            'address = COALESCE(address, %s) WHERE id = %s',
+            (business_name, website, address, contact_id)
+        )
+        return True
+
+    @timed(DB_WRITE_SECONDS, operation='add_email')
     def add_email(self, search_id, email, source_url, domain, business_name=None, website=None, address=None):
         """Add extracted email to database"""
         conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = self.backend.write_cursor(conn)
         inserted = False
         try:
-            cursor.execute(
-                'INSERT IGNORE INTO emails (search_id, email, source_url, domain, business_name, website, address) VALUES (%s, %s, %s, %s, %s, %s, %s)',
-                (search_id, email, source_url, domain, business_name, website, address)
+            inserted = self._link_contact(
+                cursor, search_id, 'email', email, source_url, domain=domain,
+                business_name=business_name, website=website, address=address
             )
             conn.commit()
-            inserted = cursor.rowcount > 0
-        except Error as e:
-            print(f"Error adding email: {e}")
+        except self.backend.Error as e:
+            log.error('Error adding email: %s', e)
         finally:
             conn.close()
         return inserted
 
+    @timed(DB_WRITE_SECONDS, operation='add_phone')
     def add_phone(self, search_id, phone, source_url, business_name=None, website=None, address=None):
-        """Add extracted phone to database"""
+        """Add extracted phone (a PhoneNumber) to database"""
         conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = self.backend.write_cursor(conn)
         inserted = False
         try:
-            cursor.execute(
-                'INSERT IGNORE INTO phones (search_id, phone, source_url, business_name, website, address) VALUES (%s, %s, %s, %s, %s, %s)',
-                (search_id, phone, source_url, business_name, website, address)
+            inserted = self._link_contact(
+                cursor, search_id, 'phone', phone.e164, source_url,
+                business_name=business_name, website=website, address=address, display=phone.display
             )
             conn.commit()
-            inserted = cursor.rowcount > 0
-        except Error as e:
-            print(f"Error adding phone: {e}")
+        except self.backend.Error as e:
+            log.error('Error adding phone: %s', e)
         finally:
             conn.close()
         return inserted
     
+    @timed(DB_WRITE_SECONDS, operation='add_page_results')
+    def add_page_results(self, search_id, source_url, emails, phones):
+        """
+        Add all emails and phones found on one page in a single transaction
+
+        Args:
+            emails: List of (email, domain) tuples
+            phones: List of PhoneNumber (e164, display)
+
+        Returns:
+            (new_emails, new_phones) - the values that were not already stored
+        """
+        new_emails, new_phones = [], []
+        if not emails and not phones:
+            return new_emails, new_phones
+
+        conn = self.get_connection()
+        cursor = self.backend.write_cursor(conn)
+        try:
+            for email, domain in emails:
+                if self._link_contact(cursor, search_id, 'email', email, source_url, domain=domain):
+                    new_emails.append(email)
+            for phone in phones:
+                if self._link_contact(cursor, search_id, 'phone', phone.e164, source_url, display=phone.display):
+                    new_phones.append(phone)
+            conn.commit()
+        except self.backend.Error as e:
+            log.error('Error adding page results: %s', e)
+            new_emails, new_phones = [], []
+        finally:
+            conn.close()
+        return new_emails, new_phones
+
+    @timed(DB_WRITE_SECONDS, operation='add_business')
     def add_business(self, search_id, business_data, source='Yelp'):
         """Add business data to database"""
         conn = self.get_connection()
@@ -290,13 +242,14 @@ class Database:
             ))
             conn.commit()
             inserted = cursor.rowcount > 0
-        except Error as e:
-            print(f"Error adding business: {e}")
+        except self.backend.Error as e:
+            log.error('Error adding business: %s', e)
         finally:
             conn.close()
         return inserted
 
     
+    @timed(DB_WRITE_SECONDS, operation='add_crawled_url')
     def add_crawled_url(self, search_id, url):
         """Mark URL as crawled"""
         conn = self.get_connection()
@@ -313,8 +266,8 @@ class Database:
                     (search_id, url)
                 )
                 conn.commit()
-        except Error as e:
-            print(f"Error adding crawled URL: {e}")
+        except self.backend.Error as e:
+            log.error('Error adding crawled URL: %s', e)
         finally:
             conn.close()
     
@@ -339,39 +292,59 @@ class Database:
         conn.close()
         return search
 
-    def get_search_results(self, search_id):
-        """Get all results for a search"""
-        conn = self.get_connection()
-        cursor = conn.cursor(dictionary=True)
+    def get_search_results(self, search_id, after_link_id=0):
+        """
+        Get the emails and phones of a search, newest first
         
-        # Get emails
-        cursor.execute(
-            'SELECT email, source_url, domain, found_at, business_name, website, address FROM emails WHERE search_id = %s ORDER BY found_at DESC',
-            (search_id,)
-        )
-        emails = cursor.fetchall()
+        Args:
+            search_id: Search to read
+            after_link_id: Only return results linked after this search_contacts id
         
-        # Get phones
-        cursor.execute(
-            'SELECT phone, source_url, found_at, business_name, website, address FROM phones WHERE search_id = %s ORDER BY found_at DESC',
-            (search_id,)
-        )
-        phones = cursor.fetchall()
+        Returns:
+            {'emails', 'phones', 'last_link_id'} - last_link_id is the cursor for the next call
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
         
+        # Range scan on the (search_id, id) index; one pass for both kinds
+        cursor.execute('''
+            SELECT sc.id AS link_id, c.kind, c.value, c.display, c.source_url, c.domain, sc.found_at,
+                   c.business_name, c.website, c.address
+            FROM search_contacts sc JOIN contacts c ON c.id = sc.contact_id
+            WHERE sc.search_id = %s AND sc.id > %s
+            ORDER BY sc.id DESC
+        ''', (search_id, after_link_id))
+        rows = cursor.fetchall()
         conn.close()
         
+        emails = []
+        phones = []
+        for row in rows:
+            link_id = row.pop('link_id')
+            kind = row.pop('kind')
+            value = row.pop('value')
+            display = row.pop('display')
+            after_link_id = max(after_link_id, link_id)
+            if kind == 'email':
+                emails.append({'email': value, **row})
+            else:
+                del row['domain']
+                phones.append({'phone': display or value, 'e164': value, **row})
+        
         return {
             'emails': emails,
-            'phones': phones
+            'phones': phones,
+            'last_link_id': after_link_id
         }
     
-    def get_businesses(self, search_id):
-        """Get all businesses for a search"""
+    def get_businesses(self, search_id, after_id=0):
+        """Get the businesses of a search, newest first (only those with id > after_id)"""
         conn = self.get_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute(
-            'SELECT name, phone, address, website, rating, review_count, source, found_at FROM businesses WHERE search_id = %s ORDER BY found_at DESC',
-            (search_id,)
+            'SELECT id, name, phone, address, website, rating, review_count, source, found_at '
+            'FROM businesses WHERE search_id = %s AND id > %s ORDER BY id DESC',
+            (search_id, after_id)
         )
         businesses = cursor.fetchall()
         conn.close()
@@ -383,7 +356,8 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute(
-            'SELECT * FROM searches ORDER BY created_at DESC LIMIT %s',
+            'SELECT id, query, status, search_type, engine, total_emails, pages_crawled, created_at, completed_at '
+            'FROM searches ORDER BY created_at DESC LIMIT %s',
             (limit,)
         )
         searches = cursor.fetchall()
@@ -395,9 +369,11 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute('''
-            SELECT DISTINCT email, domain, source_url, found_at, business_name, website, address
-            FROM emails
-            ORDER BY found_at DESC
+            SELECT value AS email, domain, source_url, last_seen AS found_at, business_name, website, address,
+                   first_seen, hit_count
+            FROM contacts
+            WHERE kind = 'email'
+            ORDER BY last_seen DESC
         ''')
         emails = cursor.fetchall()
         conn.close()
@@ -408,32 +384,473 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor(dictionary=True)
         cursor.execute('''
-            SELECT DISTINCT phone, source_url, found_at, business_name, website, address
-            FROM phones
-            ORDER BY found_at DESC
+            SELECT COALESCE(display, value) AS phone, value AS e164, source_url, last_seen AS found_at,
+                   business_name, website, address,
+                   first_seen, hit_count
+            FROM contacts
+            WHERE kind = 'phone'
+            ORDER BY last_seen DESC
         ''')
         phones = cursor.fetchall()
         conn.close()
         return phones
     
+    def iter_export_batches(self, table, columns, search_id=None, batch_size=5000):
+        """Stream rows of an export table in batches straight from the cursor"""
+        if table not in ('emails', 'phones', 'businesses'):
+            raise ValueError(f"Unsupported export table: {table}")
+
+        if table == 'businesses':
+            query = f"SELECT {', '.join(columns)} FROM businesses"
+            params = ()
+            if search_id is not None:
+                query += ' WHERE search_id = %s'
+                params = (search_id,)
+            query += ' ORDER BY id'
+        else:
+            # emails/phones are served from the global contacts store
+            kind = table[:-1]
+            expressions = {'email': 'c.value', 'phone': 'COALESCE(c.display, c.value)', 'e164': 'c.value'}
+            select = ', '.join(f'{expressions[col]} AS {col}' if col in expressions else f'c.{col}' for col in columns)
+            query = f"SELECT {select} FROM contacts c"
+            params = (kind,)
+            if search_id is not None:
+                query += ' JOIN search_contacts sc ON sc.contact_id = c.id AND sc.search_id = %s'
+                params = (search_id, kind)
+            query += ' WHERE c.kind = %s ORDER BY c.id'
+
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+            conn.close()
+
     def get_email_count(self, search_id):
         """Get total unique emails for a search"""
         conn = self.get_connection()
         cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            'SELECT COUNT(DISTINCT email) as count FROM emails WHERE search_id = %s',
-            (search_id,)
-        )
+        cursor.execute('''
+            SELECT COUNT(*) as count
+            FROM search_contacts sc JOIN contacts c ON c.id = sc.contact_id
+            WHERE sc.search_id = %s AND c.kind = 'email'
+        ''', (search_id,))
         result = cursor.fetchone()
         conn.close()
         return result['count']
     
+    @timed(DB_WRITE_SECONDS, operation='delete_search')
     def delete_search(self, search_id):
         """Delete search and all associated data"""
         conn = self.get_connection()
         cursor = conn.cursor()
-        # Cascading delete handles emails and crawled_urls if FK set up correctly, 
-        # but explicit delete is safer if not.
+        cursor.execute(
+            'SELECT pages_crawled, total_emails FROM searches WHERE id = %s' + self.backend.lock_rows,
+            (search_id,)
+        )
+        row = cursor.fetchone()
+        # Cascading delete removes the search's contact links and crawled_urls;
+        # the global contacts themselves are kept
         cursor.execute('DELETE FROM searches WHERE id = %s', (search_id,))
+        if row and cursor.rowcount > 0:
+            self._bump_counters(cursor, {
+                'total_searches': -1,
+                'total_pages_crawled': -(row[0] or 0),
+                'total_emails_found': -(row[1] or 0)
+            })
+        conn.commit()
+        conn.close()
+
+    # --- Search job queue -------------------------------------------------
+
+    def count_active_jobs(self, client_id=None):
+        """Count queued + running search jobs, optionally one client's single (non-batch) searches"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        query = "SELECT COUNT(*) FROM search_jobs WHERE status IN ('queued', 'running')"
+        params = ()
+        if client_id is not None:
+            query += ' AND client_id = %s AND batch_id IS NULL'
+            params = (client_id,)
+        cursor.execute(query, params)
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+
+    @timed(DB_WRITE_SECONDS, operation='create_queued_search')
+    def create_queued_search(self, query, search_type, engine, client_id, priority, params):
+        """
+        Create a search record and its queued job in one transaction
+
+        Args:
+            params: Keyword arguments for WebCrawler.crawl (JSON-serialisable)
+
+        Returns:
+            search_id
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            'INSERT INTO searches (query, status, search_type, engine) VALUES (%s, %s, %s, %s)',
+            (query, 'queued', search_type, engine)
+        )
+        search_id = cursor.lastrowid
+        cursor.execute(
+            'INSERT INTO search_jobs (search_id, client_id, priority, params) VALUES (%s, %s, %s, %s)',
+            (search_id, client_id, priority, json.dumps(params))
+        )
+        self._bump_counters(cursor, {'total_searches': 1})
+        conn.commit()
+        conn.close()
+        return search_id
+
+    def count_active_batches(self, client_id):
+        """Count a client's batches that still have queued or running searches"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(DISTINCT batch_id) FROM search_jobs "
+            "WHERE client_id = %s AND batch_id IS NOT NULL AND status IN ('queued', 'running')",
+            (client_id,)
+        )
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+
+    @timed(DB_WRITE_SECONDS, operation='create_search_batch')
+    def create_search_batch(self, name, client_id, priority, searches):
+        """
+        Create a batch with its searches and queued jobs in one transaction
+
+        Args:
+            searches: List of (query, search_type, engine, params) tuples
+
+        Returns:
+            (batch_id, [search_id, ...])
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            'INSERT INTO search_batches (name, client_id, total_searches) VALUES (%s, %s, %s)',
+            (name, client_id, len(searches))
+        )
+        batch_id = cursor.lastrowid
+        search_ids = []
+        for query, search_type, engine, params in searches:
+            cursor.execute(
+                'INSERT INTO searches (query, status, search_type, engine, batch_id) VALUES (%s, %s, %s, %s, %s)',
+                (query, 'queued', search_type, engine, batch_id)
+            )
+            search_id = cursor.lastrowid
+            cursor.execute(
+                'INSERT INTO search_jobs (search_id, client_id, priority, params, batch_id) VALUES (%s, %s, %s, %s, %s)',
+                (search_id, client_id, priority, json.dumps(params), batch_id)
+            )
+            search_ids.append(search_id)
+        self._bump_counters(cursor, {'total_searches': len(searches)})
+        conn.commit()
+        conn.close()
+        return batch_id, search_ids
+
+    def get_batch_progress(self, batch_id):
+        """Get a batch with aggregate progress over its searches, or None"""
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            'SELECT id, name, client_id, total_searches, created_at FROM search_batches WHERE id = %s',
+            (batch_id,)
+        )
+        batch = cursor.fetchone()
+        if not batch:
+            conn.close()
+            return None
+        cursor.execute(
+            'SELECT id, query, status, total_emails, pages_crawled FROM searches WHERE batch_id = %s ORDER BY id',
+            (batch_id,)
+        )
+        searches = cursor.fetchall()
+        conn.close()
+
+        by_status = {}
+        for search in searches:
+            by_status[search['status']] = by_status.get(search['status'], 0) + 1
+        finished = sum(count for status, count in by_status.items() if status not in ('queued', 'running'))
+        total = len(searches)
+
+        batch['status'] = 'completed' if finished == total else 'running'
+        batch['progress'] = {
+            'searches': by_status,
+            'finished': finished,
+            'percent': int(finished * 100 / total) if total else 100,
+            'total_emails': sum(search['total_emails'] or 0 for search in searches),
+            'pages_crawled': sum(search['pages_crawled'] or 0 for search in searches)
+        }
+        batch['searches'] = searches
+        return batch
+
+    @timed(DB_WRITE_SECONDS, operation='claim_search_job')
+    def claim_search_job(self, worker_id, max_running_per_client, max_running_per_batch):
+        """
+        Claim the highest-priority queued job under its running quota: a
+        single search while its client runs fewer than max_running_per_client
+        single searches, a batch's search while its batch runs fewer than
+        max_running_per_batch (so a batch's searches overlap and share pages)
+
+        Claims are optimistic (UPDATE ... WHERE status = 'queued'), so several
+        workers can poll the same table without locking each other out.
+
+        Returns:
+            {'id', 'search_id', 'params', 'batch_id'} or None if nothing is claimable
+        """
+        conn = self.get_connection()
+        cursor = self.backend.write_cursor(conn)
+        try:
+            for _ in range(5):
+                cursor.execute('''
+                    SELECT j.id, j.search_id, j.params, j.batch_id FROM search_jobs j
+                    WHERE j.status = 'queued'
+                      AND ((j.batch_id IS NULL
+                            AND (SELECT COUNT(*) FROM search_jobs r
+                                 WHERE r.client_id = j.client_id AND r.batch_id IS NULL AND r.status = 'running') < %s)
+                        OR (j.batch_id IS NOT NULL
+                            AND (SELECT COUNT(*) FROM search_jobs r
+                                 WHERE r.batch_id = j.batch_id AND r.status = 'running') < %s))
+                    ORDER BY j.priority DESC, j.id
+                    LIMIT 1
+                ''', (max_running_per_client, max_running_per_batch))
+                row = cursor.fetchone()
+                if not row:
+                    return None
+
+                now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                cursor.execute(
+                    "UPDATE search_jobs SET status = 'running', worker_id = %s, started_at = %s, heartbeat_at = %s "
+                    "WHERE id = %s AND status = 'queued'",
+                    (worker_id, now, now, row[0])
+                )
+                if cursor.rowcount == 1:
+                    cursor.execute("UPDATE searches SET status = 'running' WHERE id = %s", (row[1],))
+                    conn.commit()
+                    return {'id': row[0], 'search_id': row[1], 'params': json.loads(row[2]), 'batch_id': row[3]}
+
+                # Another worker claimed it first
+                conn.rollback()
+            return None
+        finally:
+            conn.close()
+
+    def heartbeat_search_jobs(self, job_ids):
+        """
+        Mark running jobs as alive
+
+        Returns:
+            search_ids of those jobs that have a pending stop request
+        """
+        if not job_ids:
+            return []
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        placeholders = ', '.join(['%s'] * len(job_ids))
+        cursor.execute(
+            f'UPDATE search_jobs SET heartbeat_at = %s WHERE id IN ({placeholders})',
+            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), *job_ids)
+        )
+        cursor.execute(
+            f'SELECT search_id FROM search_jobs WHERE id IN ({placeholders}) AND stop_requested = 1',
+            tuple(job_ids)
+        )
+        stop_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        conn.close()
+        return stop_ids
+
+    @timed(DB_WRITE_SECONDS, operation='finish_search_job')
+    def finish_search_job(self, job_id, status):
+        """Mark a claimed job 'done' or 'failed'"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            'UPDATE search_jobs SET status = %s, finished_at = %s WHERE id = %s',
+            (status, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), job_id)
+        )
+        conn.commit()
+        conn.close()
+
+    def request_job_stop(self, search_id):
+        """
+        Cancel a queued search, or flag a running one for its worker to stop
+
+        Returns:
+            'cancelled', 'stopping', or None if the search has no active job
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE search_jobs SET status = 'cancelled', finished_at = %s WHERE search_id = %s AND status = 'queued'",
+            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), search_id)
+        )
+        if cursor.rowcount > 0:
+            cursor.execute("UPDATE searches SET status = 'stopped' WHERE id = %s", (search_id,))
+            outcome = 'cancelled'
+        else:
+            cursor.execute(
+                "UPDATE search_jobs SET stop_requested = 1 WHERE search_id = %s AND status = 'running'",
+                (search_id,)
+            )
+            outcome = 'stopping' if cursor.rowcount > 0 else None
+        conn.commit()
+        conn.close()
+        return outcome
+
+    def requeue_stale_jobs(self, stale_after):
+        """Put running jobs whose worker stopped heartbeating back in the queue"""
+        cutoff = (datetime.now() - timedelta(seconds=stale_after)).strftime('%Y-%m-%d %H:%M:%S')
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, search_id, stop_requested FROM search_jobs WHERE status = 'running' AND heartbeat_at < %s",
+            (cutoff,)
+        )
+        requeued = 0
+        for job_id, search_id, stop_requested in cursor.fetchall():
+            # A search that was asked to stop is not worth restarting
+            job_status, search_status = ('cancelled', 'stopped') if stop_requested else ('queued', 'queued')
+            # Still stale: another worker may have requeued (and a third claimed) it meanwhile
+            cursor.execute(
+                "UPDATE search_jobs SET status = %s, worker_id = NULL, heartbeat_at = NULL "
+                "WHERE id = %s AND status = 'running' AND heartbeat_at < %s",
+                (job_status, job_id, cutoff)
+            )
+            if cursor.rowcount > 0:
+                cursor.execute('UPDATE searches SET status = %s WHERE id = %s', (search_status, search_id))
+                requeued += 1
+        conn.commit()
+        conn.close()
+        return requeued
+
+    def get_search_job(self, search_id):
+        """Get the queue state of a search (with its position while queued), or None"""
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            'SELECT id, status, priority, worker_id, created_at, started_at FROM search_jobs '
+            'WHERE search_id = %s ORDER BY id DESC LIMIT 1',
+            (search_id,)
+        )
+        job = cursor.fetchone()
+        if job and job['status'] == 'queued':
+            cursor.execute(
+                "SELECT COUNT(*) AS ahead FROM search_jobs WHERE status = 'queued' "
+                "AND (priority > %s OR (priority = %s AND id < %s))",
+                (job['priority'], job['priority'], job['id'])
+            )
+            job['queue_position'] = cursor.fetchone()['ahead'] + 1
+        conn.close()
+        return job
+
+    def count_jobs_by_status(self):
+        """Number of queued and running search jobs"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT status, COUNT(*) FROM search_jobs WHERE status IN ('queued', 'running') GROUP BY status"
+        )
+        counts = dict(cursor.fetchall())
+        conn.close()
+        return {'queued': counts.get('queued', 0), 'running': counts.get('running', 0)}
+
+    def save_trace(self, search_id, spans):
+        """Store a finished search's tracing spans (replacing any earlier trace)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM search_spans WHERE search_id = %s', (search_id,))
+        if spans:
+            cursor.executemany(
+                'INSERT INTO search_spans (search_id, name, category, start_ms, duration_ms, thread, detail) '
+                'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+                [(search_id, span['name'], span['category'], span['start_ms'], span['duration_ms'],
+                  span['thread'], span['detail']) for span in spans]
+            )
+        conn.commit()
+        conn.close()
+
+    def get_trace(self, search_id):
+        """Get a search's stored spans ordered by start time"""
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            'SELECT name, category, start_ms, duration_ms, thread, detail FROM search_spans '
+            'WHERE search_id = %s ORDER BY start_ms',
+            (search_id,)
+        )
+        spans = cursor.fetchall()
+        conn.close()
+        return spans
+
+    def save_profile(self, search_id, profile):
+        """Store a profiled search's folded stacks and allocation report"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM search_profiles WHERE search_id = %s', (search_id,))
+        cursor.execute(
+            'INSERT INTO search_profiles (search_id, samples, interval_ms, duration_s, peak_memory_bytes, folded, allocations) '
+            'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+            (search_id, profile['samples'], profile['interval_ms'], profile['duration_s'],
+             profile['peak_memory_bytes'], profile['folded'], json.dumps(profile['allocations']))
+        )
+        conn.commit()
+        conn.close()
+
+    def get_profile(self, search_id):
+        """Get a search's stored profile, or None if it wasn't profiled"""
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            'SELECT samples, interval_ms, duration_s, peak_memory_bytes, folded, allocations, created_at '
+            'FROM search_profiles WHERE search_id = %s',
+            (search_id,)
+        )
+        profile = cursor.fetchone()
+        conn.close()
+        if profile:
+            profile['allocations'] = json.loads(profile['allocations'])
+        return profile
+
+    def get_stats_counters(self):
+        """Get the aggregate platform counters"""
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute('SELECT name, value FROM stats_counters')
+        counters = {row['name']: int(row['value']) for row in cursor.fetchall()}
+        conn.close()
+        return {
+            'total_searches': counters.get('total_searches', 0),
+            'total_emails_found': counters.get('total_emails_found', 0),
+            'total_pages_crawled': counters.get('total_pages_crawled', 0)
+        }
+
+    def rebuild_stats(self):
+        """Recompute the aggregate counters from the searches table to repair drift"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT COUNT(*), COALESCE(SUM(total_emails), 0), COALESCE(SUM(pages_crawled), 0) FROM searches'
+        )
+        total_searches, total_emails, total_pages = cursor.fetchone()
+        counters = {
+            'total_searches': int(total_searches),
+            'total_emails_found': int(total_emails),
+            'total_pages_crawled': int(total_pages)
+        }
+        cursor.execute('DELETE FROM stats_counters')
+        for name, value in counters.items():
+            cursor.execute('INSERT INTO stats_counters (name, value) VALUES (%s, %s)', (name, value))
         conn.commit()
         conn.close()
+        return counters
@@ -0,0 +1,385 @@
+"""
+Versioned schema migrations for Email Extractor Platform
+Applied once at deploy time (python scripts/migrate_db.py), never on Database() construction
+
+DDL is written in the subset shared by MySQL and SQLite; the few engine
+specific bits (auto-increment keys, column checks) come from db.backend.
+"""
+
+
+def _initial_schema(db, cursor):
+    """Core tables (IF NOT EXISTS so databases created before versioning are adopted)"""
+    pk = db.backend.auto_pk
+
+    # Searches table
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS searches (
+            id {pk},
+            query VARCHAR(255) NOT NULL,
+            status VARCHAR(50) DEFAULT 'pending',
+            total_emails INT DEFAULT 0,
+            pages_crawled INT DEFAULT 0,
+            current_url TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP NULL
+        )
+    ''')
+
+    # Emails table
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS emails (
+            id {pk},
+            search_id INT NOT NULL,
+            email VARCHAR(191) NOT NULL,
+            source_url TEXT,
+            domain VARCHAR(191),
+            found_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE,
+            CONSTRAINT unique_email UNIQUE (search_id, email)
+        )
+    ''')
+
+    # Phones table
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS phones (
+            id {pk},
+            search_id INT NOT NULL,
+            phone VARCHAR(50) NOT NULL,
+            source_url TEXT,
+            found_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE,
+            CONSTRAINT unique_phone UNIQUE (search_id, phone)
+        )
+    ''')
+
+    # Businesses table (for Yelp, Maps, etc.)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS businesses (
+            id {pk},
+            search_id INT NOT NULL,
+            name VARCHAR(255),
+            phone VARCHAR(50),
+            address TEXT,
+            website TEXT,
+            rating DECIMAL(3,2),
+            review_count INT,
+            source VARCHAR(50) DEFAULT 'Yelp',
+            found_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Crawled URLs table (to avoid duplicate crawling)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS crawled_urls (
+            id {pk},
+            search_id INT NOT NULL,
+            url TEXT NOT NULL,
+            crawled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE
+        )
+    ''')
+
+
+def _search_type_and_business_info(db, cursor):
+    """search_type/engine on searches, business info on emails and phones"""
+    columns = [
+        ('searches', 'search_type', "VARCHAR(50) DEFAULT 'web'"),
+        ('searches', 'engine', "VARCHAR(50) DEFAULT 'duckduckgo'"),
+        ('emails', 'business_name', 'VARCHAR(255)'),
+        ('emails', 'website', 'TEXT'),
+        ('emails', 'address', 'TEXT'),
+        ('phones', 'business_name', 'VARCHAR(255)'),
+        ('phones', 'website', 'TEXT'),
+        ('phones', 'address', 'TEXT'),
+    ]
+    for table, column, column_type in columns:
+        # Older databases may already have these from the pre-versioning migrations
+        if not db.backend.column_exists(cursor, table, column):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+            print(f"  ✓ Added {column} to {table}")
+
+
+def _stats_counters(db, cursor):
+    """Aggregate counters served by /api/stats"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            name VARCHAR(64) PRIMARY KEY,
+            value BIGINT NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("SELECT COUNT(*) FROM stats_counters")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(
+            'SELECT COUNT(*), COALESCE(SUM(total_emails), 0), COALESCE(SUM(pages_crawled), 0) FROM searches'
+        )
+        total_searches, total_emails, total_pages = cursor.fetchone()
+        cursor.executemany(
+            'INSERT INTO stats_counters (name, value) VALUES (%s, %s)',
+            [('total_searches', int(total_searches)),
+             ('total_emails_found', int(total_emails)),
+             ('total_pages_crawled', int(total_pages))]
+        )
+
+
+def _contacts_store(db, cursor):
+    """Globally deduplicated contacts plus a narrow search <-> contact link table"""
+    pk = db.backend.auto_pk
+    insert_ignore = db.backend.insert_ignore
+
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS contacts (
+            id {pk},
+            kind VARCHAR(10) NOT NULL,
+            value VARCHAR(191) NOT NULL,
+            domain VARCHAR(191),
+            source_url TEXT,
+            business_name VARCHAR(255),
+            website TEXT,
+            address TEXT,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            hit_count INT NOT NULL DEFAULT 0,
+            CONSTRAINT unique_contact UNIQUE (kind, value)
+        )
+    ''')
+    cursor.execute('CREATE INDEX idx_contacts_kind_last_seen ON contacts (kind, last_seen)')
+
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS search_contacts (
+            id {pk},
+            search_id INT NOT NULL,
+            contact_id INT NOT NULL,
+            found_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE,
+            FOREIGN KEY (contact_id) REFERENCES contacts(id) ON DELETE CASCADE,
+            CONSTRAINT unique_search_contact UNIQUE (search_id, contact_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX idx_search_contacts_contact ON search_contacts (contact_id)')
+
+    # Backfill from the per-search emails/phones tables, which are no longer written
+    for kind, table, domain in (('email', 'emails', 'MIN(domain)'), ('phone', 'phones', 'NULL')):
+        value = kind
+        cursor.execute(f'''
+            {insert_ignore} INTO contacts
+                (kind, value, domain, source_url, business_name, website, address, first_seen, last_seen, hit_count)
+            SELECT '{kind}', {value}, {domain}, MIN(source_url), MAX(business_name), MAX(website), MAX(address),
+                   MIN(found_at), MAX(found_at), COUNT(*)
+            FROM {table}
+            GROUP BY {value}
+        ''')
+        cursor.execute(f'''
+            {insert_ignore} INTO search_contacts (search_id, contact_id, found_at)
+            SELECT t.search_id, c.id, t.found_at
+            FROM {table} t JOIN contacts c ON c.kind = '{kind}' AND c.value = t.{value}
+        ''')
+
+
+def _search_result_cursors(db, cursor):
+    """(search_id, id) indexes so /api/results?since= only scans new rows"""
+    cursor.execute('CREATE INDEX idx_search_contacts_search_id ON search_contacts (search_id, id)')
+    cursor.execute('CREATE INDEX idx_businesses_search_id ON businesses (search_id, id)')
+
+
+def _search_jobs(db, cursor):
+    """Durable queue of searches waiting for / claimed by a worker"""
+    pk = db.backend.auto_pk
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS search_jobs (
+            id {pk},
+            search_id INT NOT NULL,
+            client_id VARCHAR(64) NOT NULL,
+            priority INT NOT NULL DEFAULT 0,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            params TEXT NOT NULL,
+            worker_id VARCHAR(128),
+            stop_requested INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP NULL,
+            heartbeat_at TIMESTAMP NULL,
+            finished_at TIMESTAMP NULL,
+            FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('CREATE INDEX idx_search_jobs_claim ON search_jobs (status, priority, id)')
+    cursor.execute('CREATE INDEX idx_search_jobs_client ON search_jobs (client_id, status)')
+    cursor.execute('CREATE INDEX idx_search_jobs_search ON search_jobs (search_id)')
+
+
+def _search_batches(db, cursor):
+    """Batches of searches submitted together through /api/search/batch"""
+    pk = db.backend.auto_pk
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS search_batches (
+            id {pk},
+            name VARCHAR(255),
+            client_id VARCHAR(64) NOT NULL,
+            total_searches INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    for table in ('searches', 'search_jobs'):
+        if not db.backend.column_exists(cursor, table, 'batch_id'):
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN batch_id INT NULL')
+    cursor.execute('CREATE INDEX idx_searches_batch ON searches (batch_id)')
+    cursor.execute('CREATE INDEX idx_search_jobs_batch ON search_jobs (batch_id, status)')
+
+
+def _search_spans(db, cursor):
+    """Per-search tracing spans served by /api/trace/<id>"""
+    pk = db.backend.auto_pk
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS search_spans (
+            id {pk},
+            search_id INT NOT NULL,
+            name VARCHAR(100) NOT NULL,
+            category VARCHAR(20) NOT NULL,
+            start_ms DOUBLE NOT NULL,
+            duration_ms DOUBLE NOT NULL,
+            thread VARCHAR(64),
+            detail TEXT,
+            FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('CREATE INDEX idx_search_spans_search ON search_spans (search_id, start_ms)')
+
+
+def _search_profiles(db, cursor):
+    """On-demand search profiles served by /api/profile/<id>"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_profiles (
+            search_id INT PRIMARY KEY,
+            samples INT NOT NULL,
+            interval_ms DOUBLE NOT NULL,
+            duration_s DOUBLE NOT NULL,
+            peak_memory_bytes BIGINT NOT NULL,
+            folded LONGTEXT NOT NULL,
+            allocations TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (search_id) REFERENCES searches(id) ON DELETE CASCADE
+        )
+    ''')
+
+
+def _phone_keys(db, cursor):
+    """Phones keyed by their E.164 form, with the display form in its own column"""
+    import re
+    from app.services.phones import normalize_phone, phone_from_parts
+
+    # Page phones were stored as their regex groups joined by '-': [country-]area-prefix-line[-extension]
+    joined_groups = re.compile(r'(?:(\d{1,3})-)?(\d{3})-(\d{3})-(\d{4})(?:-(\d+))?')
+
+    def normalize(value):
+        match = joined_groups.fullmatch(value)
+        if match:
+            country_code, area, prefix, line, extension = match.groups()
+            return phone_from_parts(country_code, area + prefix + line, extension)
+        return normalize_phone(value)
+
+    if not db.backend.column_exists(cursor, 'contacts', 'display'):
+        cursor.execute('ALTER TABLE contacts ADD COLUMN display VARCHAR(64) NULL')
+
+    # Group the stored spellings of each number under its canonical key
+    cursor.execute("SELECT id, value, first_seen, last_seen FROM contacts WHERE kind = 'phone' ORDER BY id")
+    groups = {}
+    for contact_id, value, first_seen, last_seen in cursor.fetchall():
+        phone = normalize(value)
+        if phone:
+            groups.setdefault(phone.e164, []).append((contact_id, phone.display, first_seen, last_seen))
+
+    for e164, rows in groups.items():
+        keep, display = rows[0][:2]
+        for duplicate, *_ in rows[1:]:
+            # Move the duplicate's search links to the kept row, then drop it
+            cursor.execute(f'''
+                {db.backend.insert_ignore} INTO search_contacts (search_id, contact_id, found_at)
+                SELECT search_id, %s, found_at FROM search_contacts WHERE contact_id = %s
+            ''', (keep, duplicate))
+            cursor.execute('DELETE FROM search_contacts WHERE contact_id = %s', (duplicate,))
+            cursor.execute('DELETE FROM contacts WHERE id = %s', (duplicate,))
+        # hit_count counts the searches that found the number under any spelling
+        cursor.execute(
+            'UPDATE contacts SET value = %s, display = %s, first_seen = %s, last_seen = %s, '
+            'hit_count = (SELECT COUNT(*) FROM search_contacts WHERE contact_id = %s) WHERE id = %s',
+            (e164, display, min(row[2] for row in rows), max(row[3] for row in rows), keep, keep)
+        )
+
+
+# (version, description, function) - append only, never renumber
+MIGRATIONS = [
+    (1, 'Initial schema', _initial_schema),
+    (2, 'Search type, engine and business info columns', _search_type_and_business_info),
+    (3, 'Aggregate stats counters', _stats_counters),
+    (4, 'Deduplicated contacts store with search links', _contacts_store),
+    (5, 'Search result cursor indexes', _search_result_cursors),
+    (6, 'Durable search job queue', _search_jobs),
+    (7, 'Search batches', _search_batches),
+    (8, 'Search tracing spans', _search_spans),
+    (9, 'Search profiles', _search_profiles),
+    (10, 'Canonical E.164 phone keys', _phone_keys),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(db):
+    """Return the currently applied schema version (0 for a fresh database)"""
+    conn = db.get_connection()
+    if not conn:
+        return 0
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SELECT MAX(version) FROM schema_version')
+        row = cursor.fetchone()
+        return row[0] or 0
+    except db.backend.Error:
+        # schema_version table doesn't exist yet
+        return 0
+    finally:
+        conn.close()
+
+
+def run_migrations(db):
+    """
+    Apply all pending migrations in order
+
+    Args:
+        db: Database instance used for connections
+
+    Returns:
+        List of versions applied by this run
+    """
+    db.create_database()
+    conn = db.get_connection()
+    if not conn:
+        raise RuntimeError("Could not connect to the database")
+
+    cursor = conn.cursor()
+    applied = []
+    try:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                description VARCHAR(255),
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('SELECT MAX(version) FROM schema_version')
+        current = cursor.fetchone()[0] or 0
+
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            print(f"Applying migration {version}: {description}")
+            migrate(db, cursor)
+            cursor.execute(
+                'INSERT INTO schema_version (version, description) VALUES (%s, %s)',
+                (version, description)
+            )
+            conn.commit()
+            applied.append(version)
+    finally:
+        conn.close()
+
+    return applied
@@ -1,42 +1,25 @@
-from flask import Blueprint, request, jsonify, send_from_directory, make_response
-import threading
+from flask import Blueprint, request, jsonify, send_from_directory, make_response, Response, stream_with_context
 import csv
 import io
 import os
+import json
+import time
 from app.database import Database
-from app.services.crawler import WebCrawler
+from app.services.live_status import live_status
+from app.services.events import event_bus
+from app.services.tracing import tracer
+from app.services.log import get_logger
+from config import (
+    SSE_KEEPALIVE_INTERVAL, SSE_RETRY_MS, SSE_DB_POLL_INTERVAL,
+    MAX_QUEUED_SEARCHES, MAX_SEARCHES_PER_CLIENT, MAX_SEARCH_PRIORITY,
+    MAX_BATCH_SIZE, MAX_BATCHES_PER_CLIENT
+)
 
 main = Blueprint('main', __name__)
 
+log = get_logger(__name__)
+
 db = Database()
-crawler = WebCrawler()
-
-# Store active crawl threads
-active_crawls = {}
-
-def run_crawl(search_id, query, use_google_maps=False, search_type='web', platform=None, engine='duckduckgo', page_count=3, depth=2, max_pages=50, platform_type=None, target_website=None):
-    """Run crawl in background thread"""
-    def progress_callback(sid, message, percent):
-        print(f"[{sid}] {percent}% - {message}")
-    
-    result = crawler.crawl(
-        search_id, 
-        query, 
-        progress_callback, 
-        use_google_maps=use_google_maps,
-        search_type=search_type,
-        platform=platform,
-        engine=engine,
-        page_count=page_count,
-        depth=depth,
-        max_pages=max_pages,
-        platform_type=platform_type,
-        target_website=target_website
-    )
-    
-    # Remove from active crawls when done
-    if search_id in active_crawls:
-        del active_crawls[search_id]
 
 @main.route('/')
 def index():
@@ -148,6 +131,17 @@ def refresh_proxies():
         }), 500
 
 
+def _client_id():
+    """Identify the submitting client for per-client quotas"""
+    return request.headers.get('X-Client-ID') or request.remote_addr or 'anonymous'
+
+def _priority(data):
+    """Requested priority clamped to 0..MAX_SEARCH_PRIORITY (ValueError if not an integer)"""
+    try:
+        return min(max(int(data.get('priority', 0)), 0), MAX_SEARCH_PRIORITY)
+    except (TypeError, ValueError):
+        raise ValueError('Priority must be an integer')
+
 @main.route('/api/search', methods=['POST'])
 def start_search():
     """Start a new email extraction search"""
@@ -170,45 +164,119 @@ def start_search():
     if not query:
         return jsonify({'error': 'Query is required'}), 400
     
-    # Debug logging for Yelp
-    print(f"\n{'='*60}")
-    print(f"DEBUG - Start Search:")
-    print(f"  search_type: {search_type}")
-    print(f"  platform_type: {platform_type}")
-    print(f"  target_website: {target_website}")
-    print(f"  query: {query}")
-    print(f"{'='*60}\n")
-    
-    # Create search record
-    search_id = db.create_search(query, search_type, engine)
-    
-    # Start crawl in background thread
-    thread = threading.Thread(
-        target=run_crawl, 
-        args=(search_id, query),
-        kwargs={
+    log.debug('Start search: %s (search_type: %s, platform_type: %s, target_website: %s)',
+              query, search_type, platform_type, target_website)
+    
+    # Admission control: bursts queue up to a limit instead of all crawling at once
+    client_id = _client_id()
+    try:
+        priority = _priority(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if db.count_active_jobs() >= MAX_QUEUED_SEARCHES:
+        return jsonify({'error': 'Search queue is full, try again later'}), 503
+    if db.count_active_jobs(client_id) >= MAX_SEARCHES_PER_CLIENT:
+        return jsonify({'error': f'Limit of {MAX_SEARCHES_PER_CLIENT} queued or running searches reached'}), 429
+    
+    # Create the search record and its durable job; a worker picks it up
+    search_id = db.create_queued_search(query, search_type, engine, client_id, priority, {
+        'query': query,
+        'use_google_maps': (search_type == 'maps'),
+        'search_type': search_type,
+        'platform': platform,
+        'engine': engine,
+        'page_count': page_count,
+        'depth': depth,
+        'max_pages': max_pages,
+        'platform_type': platform_type,  # NEW: Pass platform type
+        'target_website': target_website,  # NEW: Pass target website
+        'profile': bool(data.get('profile', False))
+    })
+    
+    return jsonify({
+        'search_id': search_id,
+        'query': query,
+        'status': 'queued',
+        'priority': priority
+    })
+
+@main.route('/api/search/batch', methods=['POST'])
+def start_search_batch():
+    """
+    Queue many searches with shared options in one transaction
+    Request: {"queries": [...], "name": "...", "priority": 0, "options": {search_type, engine, ...}}
+    Searches of a batch run up to MAX_RUNNING_PER_BATCH at a time and share fetched pages,
+    so overlapping seed URLs are crawled once per worker.
+    """
+    data = request.get_json() or {}
+    options = data.get('options') or {}
+    search_type = options.get('search_type', 'web')
+    engine = options.get('engine', 'duckduckgo')
+    
+    raw_queries = data.get('queries') or []
+    if not isinstance(raw_queries, list) or not all(isinstance(query, str) for query in raw_queries):
+        return jsonify({'error': 'queries must be a list of strings'}), 400
+    
+    # Drop blank and repeated queries (case and whitespace insensitive)
+    queries = []
+    seen = set()
+    for query in raw_queries:
+        query = ' '.join(query.split())
+        if query and query.lower() not in seen:
+            seen.add(query.lower())
+            queries.append(query)
+    
+    if not queries:
+        return jsonify({'error': 'At least one query is required'}), 400
+    if len(queries) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'A batch is limited to {MAX_BATCH_SIZE} queries'}), 400
+    
+    client_id = _client_id()
+    try:
+        priority = _priority(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if db.count_active_jobs() + len(queries) > MAX_QUEUED_SEARCHES:
+        return jsonify({'error': 'Search queue is full, try again later'}), 503
+    if db.count_active_batches(client_id) >= MAX_BATCHES_PER_CLIENT:
+        return jsonify({'error': f'Limit of {MAX_BATCHES_PER_CLIENT} unfinished batches reached'}), 429
+    
+    searches = []
+    for query in queries:
+        searches.append((query, search_type, engine, {
+            'query': query,
             'use_google_maps': (search_type == 'maps'),
             'search_type': search_type,
-            'platform': platform,
+            'platform': options.get('platform'),
             'engine': engine,
-            'page_count': page_count,
-            'depth': depth,
-            'max_pages': max_pages,
-            'platform_type': platform_type,  # NEW: Pass platform type
-            'target_website': target_website  # NEW: Pass target website
-        }
-    )
-    thread.daemon = True
-    thread.start()
+            'page_count': options.get('page_count', 3),
+            'depth': options.get('depth', 2),
+            'max_pages': options.get('max_pages', 50),
+            'platform_type': options.get('platform_type'),
+            'target_website': options.get('target_website')
+        }))
     
-    active_crawls[search_id] = thread
+    batch_id, search_ids = db.create_search_batch(data.get('name'), client_id, priority, searches)
     
     return jsonify({
-        'search_id': search_id,
-        'query': query,
-        'status': 'started'
+        'batch_id': batch_id,
+        'search_ids': search_ids,
+        'total_searches': len(search_ids),
+        'skipped_queries': len(raw_queries) - len(queries),
+        'status': 'queued',
+        'priority': priority
     })
 
+@main.route('/api/batch/<int:batch_id>', methods=['GET'])
+def get_batch(batch_id):
+    """Get a batch's aggregate progress and the status of each of its searches"""
+    batch = db.get_batch_progress(batch_id)
+    if not batch:
+        return jsonify({'error': 'Batch not found'}), 404
+    return jsonify(batch)
+
 @main.route('/history')
 def history_page():
     """Serve the history page"""
@@ -220,11 +288,14 @@ def history_page():
 def stop_crawl(search_id):
     """Stop an active crawl and return current results"""
     try:
-        # Mark search as stopped in database
-        db.update_search_status(search_id, 'stopped', 0, 0)
+        if search_id in live_status:
+            # Running in this process: the crawl loop checks this flag right away
+            live_status.request_stop(search_id)
         
-        # Note: We can't actually kill the thread, but crawler will check status
-        # and stop on next iteration
+        # Queued jobs are cancelled; running ones are stopped by their worker's next heartbeat
+        if db.request_job_stop(search_id) is None and search_id not in live_status:
+            # No active job - mark search as stopped in database
+            db.update_search_status(search_id, 'stopped', 0, 0)
         
         return jsonify({
             'status': 'stopped',
@@ -234,22 +305,46 @@ def stop_crawl(search_id):
         return jsonify({'error': str(e)}), 500
 
 
+def _parse_cursor(cursor):
+    """Split a '<link_id>.<business_id>' results cursor, or return None if malformed"""
+    parts = cursor.split('.')
+    if len(parts) != 2 or not all(part.isdigit() for part in parts):
+        return None
+    return int(parts[0]), int(parts[1])
+
 @main.route('/api/results/<int:search_id>', methods=['GET'])
 def get_results(search_id):
-    """Get results for a specific search"""
+    """
+    Get results for a specific search
+    With ?since=<cursor> only rows added after the cursor are returned;
+    every response carries the cursor for the next call.
+    """
+    since = request.args.get('since')
+    link_id, business_id = 0, 0
+    if since:
+        parsed = _parse_cursor(since)
+        if parsed is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        link_id, business_id = parsed
+    
     search_info = db.get_search_status(search_id)
     if not search_info:
         return jsonify({'error': 'Search not found'}), 404
         
-    results = db.get_search_results(search_id)
+    results = db.get_search_results(search_id, after_link_id=link_id)
+    link_id = results.pop('last_link_id')
     
     # Add businesses to results
-    businesses = db.get_businesses(search_id)
+    businesses = db.get_businesses(search_id, after_id=business_id)
+    if businesses:
+        business_id = max(business['id'] for business in businesses)
     results['businesses'] = businesses
     
     return jsonify({
         'search': search_info,
-        'results': results
+        'results': results,
+        'cursor': f"{link_id}.{business_id}",
+        'incremental': bool(since)
     })
 
 @main.route('/api/history', methods=['GET'])
@@ -257,7 +352,8 @@ def get_history():
     """Get all past searches"""
     limit = request.args.get('limit', 50, type=int)
     searches = db.get_all_searches(limit)
-    return jsonify({'searches': searches})
+    total = db.get_stats_counters()['total_searches']
+    return jsonify({'searches': searches, 'total': total})
 
 @main.route('/api/export/<int:search_id>', methods=['GET'])
 def export_results(search_id):
@@ -265,6 +361,7 @@ def export_results(search_id):
     format_type = request.args.get('format', 'csv').lower()
     
     results = db.get_search_results(search_id)
+    results.pop('last_link_id')
     if not results:
         return jsonify({'error': 'Search not found'}), 404
         
@@ -309,23 +406,242 @@ def export_results(search_id):
     else:
         return jsonify({'error': 'Invalid format. Use csv or json'}), 400
 
+@main.route('/api/export/bulk/<table>', methods=['GET'])
+def export_bulk(table):
+    """Export a full emails/phones/businesses table as Parquet or Arrow IPC"""
+    import tempfile
+    from flask import send_file
+    from app.services.exporter import ColumnarExporter, EXPORT_TABLES, EXPORT_FORMATS
+    
+    format_type = request.args.get('format', 'parquet').lower()
+    search_id = request.args.get('search_id', type=int)
+    
+    if table not in EXPORT_TABLES:
+        return jsonify({'error': f"Invalid table. Use {', '.join(EXPORT_TABLES)}"}), 400
+    if format_type not in EXPORT_FORMATS:
+        return jsonify({'error': 'Invalid format. Use parquet or arrow'}), 400
+    
+    try:
+        exporter = ColumnarExporter(db)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 501
+    
+    mimetype, extension = EXPORT_FORMATS[format_type]
+    fd, path = tempfile.mkstemp(suffix=f'.{extension}')
+    os.close(fd)
+    
+    try:
+        exporter.export(table, format_type, path, search_id=search_id)
+    except Exception as e:
+        os.remove(path)
+        return jsonify({'error': str(e)}), 500
+    
+    filename = f"{table}_{search_id}.{extension}" if search_id else f"{table}.{extension}"
+    response = send_file(path, mimetype=mimetype, as_attachment=True, download_name=filename)
+    response.call_on_close(lambda: os.remove(path))
+    return response
+
 @main.route('/api/status/<int:search_id>', methods=['GET'])
 def get_status(search_id):
     """Get current status of a search"""
+    # Running searches are answered from memory; the DB holds periodic checkpoints
+    live = live_status.get(search_id)
+    if live:
+        return jsonify({
+            'search_id': search_id,
+            'status': live['status'],
+            'pages_crawled': live['pages_crawled'],
+            'total_emails': live['total_emails'],
+            'current_url': live['current_url'],
+            'message': live['message'],
+            'percent': live['percent'],
+            'is_active': True
+        })
+    
     search = db.get_search_status(search_id)
     
     if not search:
         return jsonify({'error': 'Search not found'}), 404
     
-    return jsonify({
-        'search_id': search_id,
+    # Running in another process (or queued): progress comes from the DB checkpoints
+    return jsonify({'search_id': search_id, **_stored_status(search_id, search)})
+
+def _stored_status(search_id, search):
+    """Status of a search from its last DB checkpoint (and its queue position while queued)"""
+    job = db.get_search_job(search_id)
+    status = {
         'status': search['status'],
         'pages_crawled': search['pages_crawled'],
         'total_emails': search['total_emails'],
         'current_url': search.get('current_url'),
-        'is_active': search_id in active_crawls
+        'is_active': bool(job) and job['status'] in ('queued', 'running')
+    }
+    if job and job['status'] == 'queued':
+        status['queue_position'] = job['queue_position']
+    return status
+
+def _sse(event_type, data, event_id=None):
+    """Format one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+@main.route('/api/stream/<int:search_id>', methods=['GET'])
+def stream_search(search_id):
+    """
+    Server-Sent Events stream of a search: progress, status, newly found
+    emails/phones/businesses and a final 'complete' event.
+    Reconnecting clients resume after the Last-Event-ID header (or ?last_event_id=).
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '')
+    after_id = int(last_event_id) if last_event_id.isdigit() else 0
+    
+    if not event_bus.has(search_id):
+        # Not running in this process (a worker.py process, finished long ago, or unknown):
+        # follow the search's DB checkpoints until it finishes
+        search = db.get_search_status(search_id)
+        if not search:
+            return jsonify({'error': 'Search not found'}), 404
+        
+        def follow(search):
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            sent, sent_at = None, time.monotonic()
+            while True:
+                status = _stored_status(search_id, search)
+                if status != sent:
+                    yield _sse('status', status)
+                    sent, sent_at = status, time.monotonic()
+                elif time.monotonic() - sent_at >= SSE_KEEPALIVE_INTERVAL:
+                    yield ': keep-alive\n\n'
+                    sent_at = time.monotonic()
+                if search['status'] not in ('pending', 'queued', 'running'):
+                    # No result events were sent; the client fetches them from /api/results
+                    yield _sse('reset', {'search_id': search_id})
+                    yield _sse('complete', {'status': search['status']})
+                    return
+                time.sleep(SSE_DB_POLL_INTERVAL)
+                search = db.get_search_status(search_id)
+        
+        return Response(follow(search), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    
+    def generate():
+        last_id = after_id
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            events, closed, gap = event_bus.read(search_id, last_id, SSE_KEEPALIVE_INTERVAL)
+            if gap:
+                # Events were dropped from the buffer; the client must re-fetch /api/results
+                yield _sse('reset', {'search_id': search_id})
+            for event in events:
+                last_id = event['id']
+                yield _sse(event['event'], event['data'], event['id'])
+            if closed:
+                break
+            if not events:
+                # Comment line keeps proxies from closing an idle connection
+                yield ': keep-alive\n\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@main.route('/api/trace/<int:search_id>', methods=['GET'])
+def get_trace(search_id):
+    """
+    A search's tracing spans as a waterfall timeline plus a per-stage breakdown
+
+    Spans come from the in-progress trace while the search runs in this
+    process and from the database once it has finished. Stage totals can
+    exceed the wall time because page fetches run in parallel.
+    """
+    live = tracer.get(search_id)
+    if live is not None:
+        spans, dropped = live.snapshot()
+    else:
+        spans = db.get_trace(search_id)
+        dropped = 0
+        if not spans and not db.get_search_status(search_id):
+            return jsonify({'error': 'Search not found'}), 404
+
+    spans.sort(key=lambda span: span['start_ms'])
+    breakdown = {}
+    for span in spans:
+        stage = breakdown.setdefault(span['category'], {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        stage['count'] += 1
+        stage['total_ms'] += span['duration_ms']
+        stage['max_ms'] = max(stage['max_ms'], span['duration_ms'])
+    for stage in breakdown.values():
+        stage['total_ms'] = round(stage['total_ms'], 3)
+
+    total_ms = max((span['start_ms'] + span['duration_ms'] for span in spans), default=0)
+    return jsonify({
+        'search_id': search_id,
+        'in_progress': live is not None,
+        'total_ms': round(total_ms, 3),
+        'span_count': len(spans),
+        'dropped_spans': dropped,
+        'breakdown': breakdown,
+        'waterfall': spans
     })
 
+@main.route('/api/profile/<int:search_id>', methods=['GET'])
+def get_profile(search_id):
+    """
+    Profile of a search started with "profile": true
+    ?format=folded downloads the folded stacks for a flamegraph tool
+    (flamegraph.pl, speedscope); the default JSON has the summary, the
+    functions with the most samples and the top allocating source lines.
+    The peak memory and allocations are process-wide (memory_scope): they
+    include the other searches that ran in the worker at the same time.
+    """
+    profile = db.get_profile(search_id)
+    if not profile:
+        return jsonify({'error': 'No profile for this search (not profiled or still running)'}), 404
+    
+    if request.args.get('format') == 'folded':
+        return Response(
+            profile['folded'] + '\n',
+            mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename=search_{search_id}.folded'}
+        )
+    
+    # Self samples per function: the leaf frame of each folded stack
+    own_samples = {}
+    for line in profile['folded'].splitlines():
+        stack, _, count = line.rpartition(' ')
+        leaf = stack.rsplit(';', 1)[-1]
+        own_samples[leaf] = own_samples.get(leaf, 0) + int(count)
+    top_functions = sorted(own_samples.items(), key=lambda item: item[1], reverse=True)[:25]
+    
+    return jsonify({
+        'search_id': search_id,
+        'samples': profile['samples'],
+        'interval_ms': profile['interval_ms'],
+        'duration_s': profile['duration_s'],
+        'peak_memory_bytes': profile['peak_memory_bytes'],
+        'memory_scope': 'process',
+        'top_functions': [{'function': name, 'samples': count} for name, count in top_functions],
+        'allocations': profile['allocations'],
+        'created_at': profile['created_at']
+    })
+
+@main.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics of this process (queue gauges are read from the database)"""
+    from app.services import metrics as registry
+    try:
+        jobs = db.count_jobs_by_status()
+        registry.SEARCH_QUEUE_DEPTH.set(jobs['queued'])
+        registry.SEARCH_JOBS_RUNNING.set(jobs['running'])
+    except Exception as e:
+        log.warning('Metrics: could not read queue depth: %s', e)
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 @main.route('/emails')
 def emails_page():
     """Serve the emails page"""
@@ -359,15 +675,8 @@ def delete_search(search_id):
 @main.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get overall platform statistics"""
-    searches = db.get_all_searches(1000)
-    
-    total_searches = len(searches)
-    total_emails = sum(s['total_emails'] for s in searches)
-    total_pages = sum(s['pages_crawled'] for s in searches)
-    
-    return jsonify({
-        'total_searches': total_searches,
-        'total_emails_found': total_emails,
-        'total_pages_crawled': total_pages,
-        'active_searches': len(active_crawls)
-    })
+    stats = db.get_stats_counters()
+    jobs = db.count_jobs_by_status()
+    stats['active_searches'] = jobs['running']
+    stats['queued_searches'] = jobs['queued']
+    return jsonify(stats)
@@ -0,0 +1,64 @@
+"""
+Batch Fetch Cache
+Pages fetched by the searches of one batch, shared between them so seed
+URLs that overlap across the batch are fetched once.
+"""
+
+import threading
+from collections import OrderedDict
+from app.services.metrics import CACHE_REQUESTS
+
+
+class BatchFetchCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_fetch(self, key, fetch, keep=None):
+        """
+        Return the cached value for key, calling fetch() on a miss
+
+        Concurrent misses for the same key wait for the first fetch
+        instead of fetching again.
+
+        keep: Predicate on a fetched value; values it rejects (failed
+            fetches) are returned but not cached, so waiters and later
+            searches fetch again
+        """
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    CACHE_REQUESTS.inc(cache='batch_fetch', result='hit')
+                    return self._entries[key]
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    CACHE_REQUESTS.inc(cache='batch_fetch', result='miss')
+                    break
+            # Another search of the batch is fetching it; use its result
+            pending.wait()
+            with self._lock:
+                if key in self._entries:
+                    self.hits += 1
+                    CACHE_REQUESTS.inc(cache='batch_fetch', result='hit')
+                    return self._entries[key]
+            # That fetch failed or was evicted - try again ourselves
+
+        try:
+            value = fetch()
+            if keep is None or keep(value):
+                with self._lock:
+                    self._entries[key] = value
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
@@ -0,0 +1,329 @@
+"""
+Browser Pool
+Warm Chrome (Selenium) sessions shared by the Selenium scrapers.
+
+Starting Chrome takes seconds, so instead of launching a browser per
+search and quitting it afterwards, WebSearchScraper, MapsScraper and
+YelpScraper check a session out of the process-wide browser_pool and hand
+it back when the search is done. Returned sessions are reset (extra
+windows closed, cookies cleared, about:blank) and kept for the next
+search; a session is replaced after CHROME_POOL_MAX_USES searches, after
+CHROME_POOL_IDLE_TIMEOUT seconds unused, or as soon as a health check
+finds it crashed.
+
+At most CHROME_POOL_SIZE sessions are open at once; scrapers wait up to
+CHROME_POOL_CHECKOUT_TIMEOUT for one beyond that. Sessions differ only in
+headless mode and whether they go through a proxy: each proxied session
+gets its own proxy from the proxy list when it starts and keeps it for
+its lifetime, so proxies rotate as sessions are recycled.
+"""
+
+import atexit
+import random
+import threading
+import time
+from config import (
+    PROXY_LIST_FILE, PROXY_ROTATION_STRATEGY,
+    CHROME_POOL_SIZE, CHROME_POOL_WARM_SESSIONS, CHROME_POOL_MAX_USES,
+    CHROME_POOL_IDLE_TIMEOUT, CHROME_POOL_CHECKOUT_TIMEOUT
+)
+from app.services.metrics import (
+    CHROME_SESSIONS, CHROME_STARTS, CHROME_STARTUP_SECONDS, CHROME_CHECKOUTS, CHROME_RECYCLED
+)
+from app.services.tracing import tracer
+from app.services.log import get_logger
+
+log = get_logger(__name__)
+
+# Randomized per session to mimic different devices/browsers
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15'
+]
+
+
+class BrowserSession:
+    """A Chrome session of the pool and what it was started with"""
+
+    def __init__(self, driver, headless, proxy, scraper):
+        self.driver = driver
+        self.headless = headless
+        self.proxy = proxy
+        self.scraper = scraper  # Metrics label of the scraper (or 'pool') that started it
+        self.uses = 0
+        self.started_at = time.monotonic()
+        self.returned_at = self.started_at
+
+    @property
+    def key(self):
+        return self.headless, self.proxy is not None
+
+
+class BrowserPool:
+    def __init__(self, size=None, max_uses=None, idle_timeout=None, checkout_timeout=None):
+        self.size = size or CHROME_POOL_SIZE
+        self.max_uses = max_uses or CHROME_POOL_MAX_USES
+        self.idle_timeout = idle_timeout if idle_timeout is not None else CHROME_POOL_IDLE_TIMEOUT
+        self.checkout_timeout = checkout_timeout if checkout_timeout is not None else CHROME_POOL_CHECKOUT_TIMEOUT
+        self._idle = []  # BrowserSession, most recently returned last
+        self._open = 0  # Sessions checked out, idle or starting
+        self._available = threading.Condition()
+        self._proxy_manager = None
+        self._proxy_lock = threading.Lock()
+        self._inspected = None  # Session of the last search in debug mode, left open outside the pool
+        self._closed = False
+
+    def checkout(self, scraper, headless=True, use_proxy=False):
+        """
+        A healthy session for a search, started if none is idle
+
+        scraper: Metrics label of the caller ('web_search', 'maps', 'yelp')
+        use_proxy: Route the session through a proxy (ignored when the
+            proxy list has none available)
+
+        Raises TimeoutError if all CHROME_POOL_SIZE sessions stay busy for
+        CHROME_POOL_CHECKOUT_TIMEOUT seconds.
+        """
+        key = self._key(headless, use_proxy)
+        deadline = time.monotonic() + self.checkout_timeout
+        session = evicted = None
+        expired = []
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError('Browser pool is shut down')
+                expired += self._expired_idle()
+                session = self._take_idle(key)
+                if session is not None:
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    break
+                if self._idle:
+                    # Full: an idle session of another kind makes room (its slot passes to the new one)
+                    evicted = self._idle.pop(0)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f'No Chrome session free within {self.checkout_timeout}s')
+                self._available.wait(remaining)
+        for old in expired:
+            self._quit(old, 'idle_timeout')
+        if evicted is not None:
+            self._quit(evicted, 'evicted')
+
+        if session is not None and not self._healthy(session):
+            # Crashed while idle: replaced below, in the same slot
+            log.warning('Idle Chrome session failed its health check, replacing it')
+            self._quit(session, 'crashed')
+            session = None
+        result = 'warm'
+        if session is None:
+            result = 'cold'
+            try:
+                session = self._start(key, scraper)
+            except Exception:
+                self._free_slot()
+                raise
+        CHROME_CHECKOUTS.inc(scraper=scraper, result=result)
+        session.uses += 1
+        return session
+
+    def release(self, session, failed=False, keep_open=False):
+        """
+        Return a checked-out session: reset and kept for the next search,
+        or quit if it is used up or no longer healthy
+
+        failed: The search errored with this session; it is replaced
+            rather than trusted with the next one
+        keep_open: Debug mode; the browser stays open as it is for
+            inspection and leaves the pool (it is not reused by others).
+            Only the last one stays: the one kept before is quit
+        """
+        if keep_open:
+            log.info('Debug mode: browser left open for inspection')
+            with self._available:
+                previous, self._inspected = self._inspected, session
+            if previous is not None:
+                self._quit(previous, 'inspected')
+            self._free_slot()
+            return
+        if failed:
+            self._quit(session, 'failed')
+        elif session.uses >= self.max_uses:
+            self._quit(session, 'max_uses')
+        elif not self._reset(session):
+            self._quit(session, 'crashed')
+        else:
+            with self._available:
+                if not self._closed:
+                    session.returned_at = time.monotonic()
+                    self._idle.append(session)
+                    self._available.notify()
+                    return
+            self._quit(session, 'shutdown')
+        self._free_slot()
+
+    def warm(self, count=None, headless=True, use_proxy=False):
+        """Start sessions in the background so the first searches find them ready"""
+        count = count or CHROME_POOL_WARM_SESSIONS
+
+        def start_sessions():
+            key = self._key(headless, use_proxy)
+            started = 0
+            while started < count:
+                with self._available:
+                    if self._closed or self._open >= self.size:
+                        break
+                    self._open += 1
+                try:
+                    session = self._start(key, 'pool')
+                except Exception as e:
+                    self._free_slot()
+                    log.warning('Could not warm up a Chrome session: %s', e)
+                    break
+                with self._available:
+                    closed = self._closed
+                    if not closed:
+                        self._idle.append(session)
+                        self._available.notify()
+                if closed:
+                    self._quit(session, 'shutdown')
+                    self._free_slot()
+                    break
+                started += 1
+            log.info('Browser pool warmed up (%d Chrome sessions)', started)
+
+        threading.Thread(target=start_sessions, name='browser-pool-warmup', daemon=True).start()
+
+    def shutdown(self):
+        """Quit the idle sessions (and a debug browser left open); sessions still checked out are quit when returned"""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            inspected, self._inspected = self._inspected, None
+            self._available.notify_all()
+        for session in idle:
+            self._quit(session, 'shutdown')
+            self._free_slot()
+        if inspected is not None:
+            self._quit(inspected, 'shutdown')
+
+    def _key(self, headless, use_proxy):
+        """Sessions of the same key are interchangeable"""
+        return bool(headless), bool(use_proxy) and self._proxies() is not None
+
+    def _take_idle(self, key):
+        for index in range(len(self._idle) - 1, -1, -1):
+            if self._idle[index].key == key:
+                return self._idle.pop(index)
+        return None
+
+    def _expired_idle(self):
+        """Pop the sessions idle for longer than idle_timeout (caller holds the lock)"""
+        now = time.monotonic()
+        expired = [session for session in self._idle if now - session.returned_at > self.idle_timeout]
+        if expired:
+            self._idle = [session for session in self._idle if session not in expired]
+            self._open -= len(expired)
+        return expired
+
+    def _free_slot(self):
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    def _proxies(self):
+        """The proxy list's ProxyManager, loaded on first use; None if it has no proxy available"""
+        with self._proxy_lock:
+            if self._proxy_manager is None:
+                from app.services.proxy_manager import ProxyManager
+                self._proxy_manager = ProxyManager(proxy_file=PROXY_LIST_FILE)
+                if self._proxy_manager.get_stats()['available'] == 0:
+                    log.warning('No proxies available, Chrome sessions run without one')
+            if self._proxy_manager.get_stats()['available'] == 0:
+                return None
+            return self._proxy_manager
+
+    def _start(self, key, scraper):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from app.services.settings import SettingsManager
+
+        headless, use_proxy = key
+        options = Options()
+        # INCOGNITO MODE (Private browsing)
+        options.add_argument('--incognito')
+        if headless:
+            options.add_argument('--headless=new')
+
+        # Stability and anti-detection options
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--disable-notifications')
+        options.add_argument('--disable-popup-blocking')
+        options.add_argument('--window-size=1920,1080')
+        options.add_argument('--lang=en-US')
+        options.add_argument(f'--user-agent={random.choice(USER_AGENTS)}')
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        options.add_experimental_option('excludeSwitches', ['enable-automation'])
+        options.add_experimental_option('useAutomationExtension', False)
+
+        proxy = None
+        proxies = self._proxies() if use_proxy else None
+        if proxies:
+            strategy = SettingsManager.get_setting('proxy_rotation_strategy', PROXY_ROTATION_STRATEGY)
+            proxy = proxies.get_proxy(strategy=strategy)
+            if proxy:
+                proxy_string = proxies.get_selenium_proxy_config(proxy)
+                options.add_argument(f'--proxy-server={proxy_string}')
+                log.info('Using proxy: %s', proxy_string)
+
+        # Use Selenium's built-in manager (Selenium 4.6+)
+        with CHROME_STARTUP_SECONDS.time(scraper=scraper), tracer.span('chrome_start', 'selenium'):
+            driver = webdriver.Chrome(options=options)
+        CHROME_STARTS.inc(scraper=scraper)
+        CHROME_SESSIONS.inc(scraper=scraper)
+        log.debug('Chrome session started for %s (incognito, headless: %s, proxy: %s)', scraper, headless, bool(proxy))
+        return BrowserSession(driver, headless, proxy, scraper)
+
+    def _healthy(self, session):
+        """Whether the browser still answers"""
+        try:
+            return session.driver.execute_script('return 1') == 1
+        except Exception as e:
+            log.debug('Chrome health check failed: %s', e)
+            return False
+
+    def _reset(self, session):
+        """Clear what a search left behind; False if the browser doesn't answer"""
+        driver = session.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            log.debug('Chrome session reset failed: %s', e)
+            return False
+
+    def _quit(self, session, reason):
+        CHROME_RECYCLED.inc(reason=reason)
+        try:
+            session.driver.quit()
+        except Exception as e:
+            log.debug('Chrome quit failed: %s', e)
+        CHROME_SESSIONS.dec(scraper=session.scraper)
+        log.debug('Chrome session closed (%s) after %d uses', reason, session.uses)
+
+
+browser_pool = BrowserPool()
+atexit.register(browser_pool.shutdown)
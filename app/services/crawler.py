@@ -5,20 +5,31 @@ Responsible crawling with robots.txt compliance and rate limiting
 
 import requests
 import time
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse, quote_plus
+from urllib.parse import urlparse, quote_plus
 from urllib.robotparser import RobotFileParser
-import validators
 from config import (
     USER_AGENT,
     MAX_PAGES_PER_SEARCH, MAX_CRAWL_DEPTH, 
-    MAX_SEARCH_RESULTS, MAX_EXTERNAL_LINKS
+    MAX_SEARCH_RESULTS, MAX_EXTERNAL_LINKS,
+    STATUS_CHECKPOINT_INTERVAL, EXTRACTION_PROCESSES,
+    STREAM_EXTRACTION_BYTES, STREAM_CHUNK_SIZE
 )
 from app.services.settings import SettingsManager
 from app.services.email_extractor import EmailExtractor
+from app.services.extraction import extract_page, PageStream
+from app.services.phones import PhoneNumber
+from app.services.live_status import live_status
+from app.services.events import event_bus
+from app.services.tracing import tracer
+from app.services.profiling import profiler
+from app.services.metrics import (
+    SERP_SECONDS, PAGE_FETCH_SECONDS, PAGE_FETCH_BYTES, PAGE_FETCH_ERRORS,
+    EXTRACTION_CPU_SECONDS, FETCHES_IN_FLIGHT, SEARCHES_FINISHED
+)
+from app.services.log import get_logger, log_context
 from app.database import Database
-from app.services.scrapers.google_maps import MapsScraper
-from app.services.scrapers.web_search import WebSearchScraper
+
+log = get_logger(__name__)
 
 class WebCrawler:
     def __init__(self):
@@ -27,21 +38,42 @@ class WebCrawler:
         self.email_extractor = EmailExtractor()
         self.db = Database()
         self.robots_cache = {}  # Cache robots.txt parsers
+        self._extraction_pool = None
+    
+    def search_maps(self, query, engine='google', page_count=3):
+        """
+        Extract business cards with the Selenium-backed Maps scraper
+
+        A scraper per search: the crawler is shared by the worker's
+        concurrent searches and each scraper holds its own pool session
+        """
+        from app.services.scrapers.google_maps import MapsScraper
         headless = SettingsManager.get_setting('headless_mode', False)
-        self.maps_scraper = MapsScraper(headless=headless)
+        with SERP_SECONDS.time(engine=engine, search_type='maps'), tracer.span('maps', 'serp', engine):
+            scraper = MapsScraper(headless=headless)
+            return scraper.search_maps(query, page_count=page_count, engine=engine)
+    
+    @property
+    def extraction_pool(self):
+        """Process pool for page extraction, started on first use when EXTRACTION_PROCESSES > 0"""
+        if self._extraction_pool is None:
+            from app.services.extraction import ExtractionPool
+            self._extraction_pool = ExtractionPool()
+        return self._extraction_pool
     
     # ... existing methods ...
 
-    def search_web(self, query, engine='duckduckgo'):
+    def search_web(self, query, engine='duckduckgo', search_type='web'):
         """
         Search the web using Selenium to bypass bot detection
         """
         from app.services.scrapers.web_search import WebSearchScraper
         headless = SettingsManager.get_setting('headless_mode', False)
-        scraper = WebSearchScraper(headless=headless)
-        return scraper.search(query, max_results=MAX_SEARCH_RESULTS, engine=engine)
+        with SERP_SECONDS.time(engine=engine, search_type=search_type), tracer.span('serp', 'serp', engine):
+            scraper = WebSearchScraper(headless=headless)
+            return scraper.search(query, max_results=MAX_SEARCH_RESULTS, engine=engine)
 
-    def fetch_page(self, url):
+    def fetch_page(self, url, search_type='web'):
         """
         Fetch a page and extract emails, phones, and links
         """
@@ -49,41 +81,69 @@ class WebCrawler:
             # Respect robots.txt (simplified for now, just delay)
             delay = SettingsManager.get_setting('request_delay', 2.0)
             timeout = SettingsManager.get_setting('request_timeout', 30)
-            time.sleep(delay)
-            
-            response = self.session.get(url, timeout=timeout)
-            response.raise_for_status()
+            with tracer.span('request_delay', 'sleep'):
+                time.sleep(delay)
             
-            # Extract emails and phones
-            emails, phones = self.email_extractor.extract_from_html(response.text)
+            started = time.perf_counter()
+            with tracer.span('http_get', 'fetch', url):
+                response = self.session.get(url, timeout=timeout, stream=True)
+                response.raise_for_status()
             
-            # Extract links
-            soup = BeautifulSoup(response.text, 'html.parser')
-            links = []
-            
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                full_url = urljoin(url, href)
+            with response:
+                # Read up to STREAM_EXTRACTION_BYTES; a page that ends there is extracted whole
+                chunks = response.iter_content(STREAM_CHUNK_SIZE)
+                head, size = [], 0
+                with tracer.span('http_body', 'fetch', url):
+                    for chunk in chunks:
+                        head.append(chunk)
+                        size += len(chunk)
+                        if size > STREAM_EXTRACTION_BYTES:
+                            break
                 
-                # Basic filtering
-                if validators.url(full_url) and full_url.startswith('http'):
-                    # Avoid same page anchors
-                    if '#' in full_url:
-                        full_url = full_url.split('#')[0]
-                    
-                    if full_url != url:
-                        links.append(full_url)
+                content_type = response.headers.get('Content-Type')
+                if size > STREAM_EXTRACTION_BYTES:
+                    # Larger pages are extracted chunk by chunk as the rest downloads
+                    with tracer.span('stream_page', 'extract', url):
+                        (emails, phones, links), cpu_seconds, size = self._stream_page(url, content_type, head, chunks)
+                    PAGE_FETCH_SECONDS.observe(time.perf_counter() - started, search_type=search_type)
+                else:
+                    PAGE_FETCH_SECONDS.observe(time.perf_counter() - started, search_type=search_type)
+                    body = b''.join(head)
+                    # Emails, phones and links from the raw body, on this thread or in the extraction pool
+                    with tracer.span('extract_page', 'extract', url):
+                        if EXTRACTION_PROCESSES:
+                            (emails, phones, links), cpu_seconds = self.extraction_pool.extract(body, url, content_type)
+                        else:
+                            (emails, phones, links), cpu_seconds = extract_page(body, url, content_type)
             
+            PAGE_FETCH_BYTES.inc(size, search_type=search_type)
+            EXTRACTION_CPU_SECONDS.observe(cpu_seconds, search_type=search_type)
             return emails, phones, links
             
         except Exception as e:
-            print(f"Fetch error for {url}: {e}")
+            PAGE_FETCH_ERRORS.inc(search_type=search_type)
+            log.debug('Fetch error for %s: %s', url, e)
             return [], [], []
 
 
-    def crawl(self, search_id, query, progress_callback=None, use_google_maps=False, search_type='web', platform=None, engine=None, page_count=3, depth=2, max_pages=50, platform_type=None, target_website=None):
+    def _stream_page(self, url, content_type, head, chunks):
+        """Extract a page from the chunks read so far and the rest of the download"""
+        stream = PageStream(url, content_type)
+        while head:
+            stream.feed(head.pop(0))
+        for chunk in chunks:
+            stream.feed(chunk)
+        result, cpu_seconds = stream.close()
+        return result, cpu_seconds, stream.size
+
+
+    def crawl(self, search_id, query, progress_callback=None, use_google_maps=False, search_type='web', platform=None, engine=None, page_count=3, depth=2, max_pages=50, platform_type=None, target_website=None, page_cache=None, profile=False):
         """
         Main crawl function with Parallel Processing
+        
+        page_cache: Optional BatchFetchCache shared by the searches of a batch
+        profile: Sample CPU stacks and allocations for /api/profile/<id>
+                 (also enabled for every search by the profile_searches setting)
         """
         # Use the default search engine from settings if not explicitly provided
         if engine is None:
@@ -97,12 +157,17 @@ class WebCrawler:
             'status': 'running'
         }
         
+        live_status.start(search_id)
+        event_bus.open(search_id)
+        tracer.start(search_id)
+        if profile or SettingsManager.get_setting('profile_searches', False):
+            profiler.start(search_id)
+        
         try:
             # Step 1: Search for relevant URLs
-            print(f"\n{'='*60}")
             max_threads = SettingsManager.get_setting('max_threads', 8)
-            print(f"Starting search for: '{query}' (Type: {search_type}, Engine: {engine.upper()}, Parallel: {max_threads} threads)")
-            print(f"{'='*60}\n")
+            log.info("Starting search for '%s' (type: %s, engine: %s, parallel: %s threads)",
+                     query, search_type, engine, max_threads)
             
             if progress_callback:
                 progress_callback(search_id, 'Searching for relevant websites...', 0)
@@ -116,12 +181,11 @@ class WebCrawler:
                     progress_callback(search_id, f'Extracting business cards from {engine.upper()} Maps...', 10)
                 
                 # NEW: Maps scraper now returns contact data, not URLs
-                business_data = self.maps_scraper.search_maps(query, page_count=page_count, engine=engine)
+                business_data = self.search_maps(query, engine=engine, page_count=page_count)
                 
                 # Save contact data directly to database
                 if business_data and len(business_data) > 0 and isinstance(business_data[0], dict):
-                    print(f"\n✓ Received {len(business_data)} businesses with contact info")
-                    print(f"💾 Saving directly to database (skipping website crawling)...\n")
+                    log.info('Received %d businesses with contact info, saving directly', len(business_data))
                     
                     email_count = 0
                     phone_count = 0
@@ -131,19 +195,21 @@ class WebCrawler:
                         # Save full business record
                         if self.db.add_business(search_id, business, 'Google Maps'):
                             business_count += 1
-                            print(f"  [{idx+1}] 🏢 {business.get('name', 'Unknown')}")
+                            log.debug('Business %d: %s', idx + 1, business.get('name', 'Unknown'))
+                            self._publish_business(search_id, business, 'Google Maps')
                         
                         # Also save phone/email to respective tables for backward compatibility
-                        if business.get('phone'):
+                        if business.get('phone_e164'):
                             if self.db.add_phone(
                                 search_id, 
-                                business['phone'], 
+                                PhoneNumber(business['phone_e164'], business['phone']), 
                                 'Google Maps',
                                 business_name=business.get('name'),
                                 website=business.get('website'),
                                 address=business.get('address')
                             ):
                                 phone_count += 1
+                                self._publish_contact(search_id, 'phone', business['phone'], 'Google Maps', business)
                         
                         if business.get('email'):
                             domain = self.email_extractor.get_domain(business['email'])
@@ -157,6 +223,7 @@ class WebCrawler:
                                 address=business.get('address')
                             ):
                                 email_count += 1
+                                self._publish_contact(search_id, 'email', business['email'], 'Google Maps', business, domain)
                     
                     # Mark search as completed
                     self.db.update_search_status(search_id, 'completed', 0, email_count + phone_count)
@@ -166,7 +233,7 @@ class WebCrawler:
                     results['phones'] = [b['phone'] for b in business_data if b.get('phone')]
                     results['businesses'] = business_data
                     
-                    print(f"\n✓ Saved {business_count} businesses, {email_count} emails, and {phone_count} phones to database")
+                    log.info('Saved %d businesses, %d emails and %d phones', business_count, email_count, phone_count)
                     if progress_callback:
                         progress_callback(search_id, 'Completed!', 100)
                     
@@ -184,15 +251,14 @@ class WebCrawler:
                 }
                 site_operator = site_map.get(platform, '')
                 modified_query = f"{site_operator} {query}"
-                print(f"Social Search Query: {modified_query}")
-                seed_urls = self.search_web(modified_query, engine=engine)
+                log.info('Social search query: %s', modified_query)
+                seed_urls = self.search_web(modified_query, engine=engine, search_type=search_type)
             
             elif search_type == 'platform':
                 # Check if this is a Yelp search using platform_type parameter
                 if platform_type == 'yelp' or (target_website and 'yelp.com' in target_website.lower()):
-                    print(f"🔍 Yelp Search Detected: {query}")
-                    print(f"   platform_type: {platform_type}")
-                    print(f"   target_website: {target_website}")
+                    log.info('Yelp search detected: %s (platform_type: %s, target_website: %s)',
+                             query, platform_type, target_website)
                     
                     try:
                         from app.services.scrapers.yelp import YelpScraper
@@ -200,19 +266,18 @@ class WebCrawler:
                         # Extract actual search query (remove site: operator if present)
                         import re
                         clean_query = re.sub(r'site:\S+\s+', '', query)
-                        print(f"   clean_query: {clean_query}")
+                        log.debug('Yelp query: %s', clean_query)
                         
                         # Use Yelp Scraper
                         headless = SettingsManager.get_setting('headless_mode', False)
-                        print(f"   Initializing YelpScraper (headless={headless})...")
                         
                         yelp_scraper = YelpScraper(headless=headless)
-                        business_data = yelp_scraper.search(clean_query, max_results=20)
+                        with SERP_SECONDS.time(engine='yelp', search_type='platform'), tracer.span('yelp', 'serp'):
+                            business_data = yelp_scraper.search(clean_query, max_results=20)
                         
                         # Save results directly (similar to Maps)
                         if business_data and len(business_data) > 0:
-                            print(f"\n✓ Received {len(business_data)} businesses from Yelp")
-                            print(f"💾 Saving directly to database...\n")
+                            log.info('Received %d businesses from Yelp, saving directly', len(business_data))
                             
                             email_count = 0
                             phone_count = 0
@@ -222,19 +287,21 @@ class WebCrawler:
                                 # Save full business record
                                 if self.db.add_business(search_id, business, 'Yelp'):
                                     business_count += 1
-                                    print(f"  [{idx+1}] 🏢 {business.get('name', 'Unknown')}")
+                                    log.debug('Business %d: %s', idx + 1, business.get('name', 'Unknown'))
+                                    self._publish_business(search_id, business, 'Yelp')
                                 
                                 # Also save phone to phones table for backward compatibility
-                                if business.get('phone'):
+                                if business.get('phone_e164'):
                                     if self.db.add_phone(
                                         search_id, 
-                                        business['phone'], 
+                                        PhoneNumber(business['phone_e164'], business['phone']), 
                                         'Yelp',
                                         business_name=business.get('name'),
                                         website=business.get('website'),
                                         address=business.get('address')
                                     ):
                                         phone_count += 1
+                                        self._publish_contact(search_id, 'phone', business['phone'], 'Yelp', business)
                             
                             # Mark search as completed
                             self.db.update_search_status(search_id, 'completed', 0, email_count + phone_count)
@@ -243,45 +310,43 @@ class WebCrawler:
                             results['phones'] = [b['phone'] for b in business_data if b.get('phone')]
                             results['businesses'] = business_data
                             
-                            print(f"\n✓ Saved {business_count} businesses and {phone_count} phones to database")
+                            log.info('Saved %d businesses and %d phones', business_count, phone_count)
                             if progress_callback:
                                 progress_callback(search_id, 'Completed!', 100)
                             
                             return results
                         else:
-                            print("⚠️  YelpScraper returned 0 businesses")
+                            log.warning('YelpScraper returned 0 businesses')
                             self.db.update_search_status(search_id, 'completed', 0, 0)
                             results['status'] = 'completed'
                             return results
                             
                     except Exception as e:
-                        print(f"❌ YelpScraper Error: {e}")
-                        import traceback
-                        traceback.print_exc()
+                        log.exception('YelpScraper error: %s', e)
                         # Fall through to regular web search
 
                 
                 # Fallback to regular web search with site: operator
-                print(f"Platform Search Query: {query}")
-                seed_urls = self.search_web(query, engine=engine)
+                log.info('Platform search query: %s', query)
+                seed_urls = self.search_web(query, engine=engine, search_type=search_type)
 
             elif search_type == 'crawler':
                 # Direct website crawl
-                print(f"Direct Website Crawl: {query}")
+                log.info('Direct website crawl: %s', query)
                 if not query.startswith('http'):
                     query = 'https://' + query
                 seed_urls = [query]
                 
             else:
-                seed_urls = self.search_web(query, engine=engine)
+                seed_urls = self.search_web(query, engine=engine, search_type=search_type)
             
             
-            print(f"\n✓ Found {len(seed_urls)} URLs from search")
+            log.info('Found %d URLs from search', len(seed_urls))
             
             if not seed_urls:
                 if '.' in query and ' ' not in query:
                     seed_urls = [f"https://{query}" if not query.startswith('http') else query]
-                    print(f"⚠ Trying direct URL: {seed_urls[0]}")
+                    log.info('Trying direct URL: %s', seed_urls[0])
             
             if not seed_urls:
                 results['status'] = 'completed'
@@ -290,9 +355,7 @@ class WebCrawler:
                 return results
             
             # Step 2: Parallel Crawl
-            print(f"\n{'='*60}")
-            print(f"Starting parallel crawl...")
-            print(f"{'='*60}\n")
+            log.info('Starting parallel crawl')
             
             # Queue: (url, depth, source_domain)
             # We use a set for visited URLs to avoid duplicates
@@ -312,6 +375,7 @@ class WebCrawler:
 
             crawled_count = 0
             email_set = set()
+            last_checkpoint = time.monotonic()
             
             import concurrent.futures
             
@@ -331,6 +395,10 @@ class WebCrawler:
                 futures = {}
                 
                 while (url_queue or futures) and crawled_count < max_pages:
+                    if live_status.is_stop_requested(search_id):
+                        log.info('Stop requested, ending crawl after %d pages', crawled_count)
+                        break
+                    
                     # Submit tasks up to max_workers
                     while url_queue and len(futures) < max_workers and crawled_count + len(futures) < max_pages:
                         url, depth, source_domain = url_queue.pop(0)
@@ -339,7 +407,7 @@ class WebCrawler:
                         if self.db.is_url_crawled(search_id, url):
                             continue
                             
-                        future = executor.submit(self.process_single_url, search_id, url)
+                        future = executor.submit(self.process_single_url, search_id, url, page_cache, search_type)
                         futures[future] = (url, depth, source_domain)
                     
                     if not futures:
@@ -358,18 +426,29 @@ class WebCrawler:
                         try:
                             emails, phones, links = future.result()
                             
-                            # Update progress
-                            if emails:
-                                for email in emails:
-                                    domain = self.email_extractor.get_domain(email)
-                                    if self.db.add_email(search_id, email, url, domain):
-                                        email_set.add(email)
-                                        print(f"  ✓ Email: {email}")
-                            
-                            if phones:
-                                for phone in phones:
-                                    if self.db.add_phone(search_id, phone, url):
-                                        print(f"  ✓ Phone: {phone}")
+                            # Save the page's results in one transaction
+                            if emails or phones:
+                                new_emails, new_phones = self.db.add_page_results(
+                                    search_id,
+                                    url,
+                                    [(email, self.email_extractor.get_domain(email)) for email in emails],
+                                    phones
+                                )
+                                for email in new_emails:
+                                    email_set.add(email)
+                                    log.debug('Email: %s', email)
+                                    event_bus.publish(search_id, 'email', {
+                                        'email': email,
+                                        'domain': self.email_extractor.get_domain(email),
+                                        'source_url': url
+                                    })
+                                for phone in new_phones:
+                                    log.debug('Phone: %s', phone.display)
+                                    event_bus.publish(search_id, 'phone', {
+                                        'phone': phone.display,
+                                        'e164': phone.e164,
+                                        'source_url': url
+                                    })
                             
                             # Process new links
                             if depth < max_depth:
@@ -407,27 +486,41 @@ class WebCrawler:
                                         url_queue.append((link, depth + 1, new_domain))
                                         
                         except Exception as e:
-                            print(f"Error processing {url}: {e}")
+                            log.warning('Error processing %s: %s', url, e)
                         
-                        # Update DB status periodically
-                        if crawled_count % 5 == 0:
+                        # Live status on every page; the DB only gets periodic checkpoints
+                        live_status.update(
+                            search_id,
+                            pages_crawled=crawled_count,
+                            total_emails=len(email_set),
+                            current_url=url
+                        )
+                        event_bus.publish(search_id, 'status', {
+                            'pages_crawled': crawled_count,
+                            'total_emails': len(email_set),
+                            'current_url': url
+                        })
+                        if time.monotonic() - last_checkpoint >= STATUS_CHECKPOINT_INTERVAL:
                             self.db.update_search_status(
                                 search_id, 'running', crawled_count, len(email_set), url
                             )
+                            last_checkpoint = time.monotonic()
+                        
+                        if crawled_count % 5 == 0:
                             if progress_callback:
                                 progress = min(int((crawled_count / MAX_PAGES_PER_SEARCH) * 100), 95)
                                 progress_callback(search_id, f"Crawled {crawled_count} pages...", progress)
 
             # Step 3: Complete
-            print(f"\n{'='*60}")
-            print(f"Crawl completed! Pages: {crawled_count}, Emails: {len(email_set)}")
-            print(f"{'='*60}\n")
+            log.info('Crawl completed: %d pages, %d emails', crawled_count, len(email_set))
+            
+            final_status = 'stopped' if live_status.is_stop_requested(search_id) else 'completed'
             
             results['emails'] = list(email_set)
             results['pages_crawled'] = crawled_count
-            results['status'] = 'completed'
+            results['status'] = final_status
             
-            self.db.update_search_status(search_id, 'completed', crawled_count, len(email_set))
+            self.db.update_search_status(search_id, final_status, crawled_count, len(email_set))
             
             if progress_callback:
                 progress_callback(search_id, 'Completed!', 100)
@@ -436,22 +529,74 @@ class WebCrawler:
             results['status'] = 'error'
             results['error'] = str(e)
             self.db.update_search_status(search_id, 'error', results['pages_crawled'], len(results['emails']))
-            print(f"\n✗ Crawl error: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception('Crawl error: %s', e)
+        
+        finally:
+            live_status.finish(search_id)
+            event_bus.close(search_id, results['status'])
+            SEARCHES_FINISHED.inc(search_type=search_type, status=results['status'])
+            trace = tracer.finish(search_id)
+            if trace is not None:
+                try:
+                    self.db.save_trace(search_id, trace.spans)
+                except Exception as e:
+                    log.warning('Could not save trace: %s', e)
+            profile_data = profiler.finish(search_id)
+            if profile_data is not None:
+                try:
+                    self.db.save_profile(search_id, profile_data)
+                except Exception as e:
+                    log.warning('Could not save profile: %s', e)
         
         return results
 
-    def process_single_url(self, search_id, url):
+    def _publish_business(self, search_id, business, source):
+        """Push a saved business card to the search's event stream"""
+        event_bus.publish(search_id, 'business', {
+            'name': business.get('name'),
+            'phone': business.get('phone'),
+            'address': business.get('address'),
+            'website': business.get('website'),
+            'rating': business.get('rating'),
+            'review_count': business.get('review_count'),
+            'source': source
+        })
+
+    def _publish_contact(self, search_id, kind, value, source_url, business, domain=None):
+        """Push a newly linked email/phone (with its business info) to the event stream"""
+        data = {
+            kind: value,
+            'source_url': source_url,
+            'business_name': business.get('name'),
+            'website': business.get('website'),
+            'address': business.get('address')
+        }
+        if kind == 'email':
+            data['domain'] = domain
+        else:
+            data['e164'] = business.get('phone_e164')
+        event_bus.publish(search_id, kind, data)
+
+    def process_single_url(self, search_id, url, page_cache=None, search_type='web'):
         """
         Worker method to process a single URL
         """
-        print(f"Crawling: {url}")
-        
-        # Fetch page
-        emails, phones, links = self.fetch_page(url)
-        
-        # Mark as crawled
-        self.db.add_crawled_url(search_id, url)
+        # Fetch page (once per batch when the search belongs to one)
+        FETCHES_IN_FLIGHT.inc()
+        with tracer.activate(search_id), log_context(search_id=search_id), profiler.attach(search_id):
+            log.debug('Crawling: %s', url)
+            try:
+                if page_cache is not None:
+                    # Failed (or empty) fetches aren't cached; the batch's next search retries them
+                    emails, phones, links = page_cache.get_or_fetch(
+                        url, lambda: self.fetch_page(url, search_type), keep=any
+                    )
+                else:
+                    emails, phones, links = self.fetch_page(url, search_type)
+            finally:
+                FETCHES_IN_FLIGHT.dec()
+            
+            # Mark as crawled
+            self.db.add_crawled_url(search_id, url)
         
         return emails, phones, links
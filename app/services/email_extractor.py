@@ -1,110 +1,276 @@
 """
 Email and Phone Extraction Engine
 Extracts and validates email addresses and phone numbers from text content
+
+Extraction accepts str or bytes. Everything matched is ASCII, so raw page
+bytes in any ASCII-compatible encoding (UTF-8, Latin-1, Windows-125x...)
+are scanned as they are, without decoding the page.
+
+EmailExtractor.stream() does the same for a page that arrives in chunks,
+keeping only a short tail of each chunk.
+
+Addresses hidden from scrapers (Cloudflare email protection, HTML
+entities, "name [at] domain [dot] com", JS string concatenation) are
+decoded by decode_obfuscated(), each decoder running only on pages that
+carry its marker.
 """
 
+import bisect
+import html
 import re
+import threading
 import validators
-from config import MIN_EMAIL_LENGTH, MAX_EMAIL_LENGTH, EXCLUDED_PATTERNS
+from collections import OrderedDict
+from config import MIN_EMAIL_LENGTH, MAX_EMAIL_LENGTH, EXCLUDED_PATTERNS, EMAIL_VERDICT_CACHE_SIZE
+from app.services.metrics import CACHE_REQUESTS
+from app.services.phones import phone_from_parts
+
+# File extensions that mark an asset name (image.jpg@2x.png) rather than an email
+FILE_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.bmp', '.ico',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.zip', '.rar', '.tar', '.gz', '.mp4', '.avi', '.mov', '.mp3',
+    '.wav', '.css', '.js', '.html', '.xml', '.json', '.txt',
+    '.woff', '.woff2', '.ttf', '.eot'
+)
+
+# All excluded placeholders in one pass instead of one substring scan each
+_EXCLUDED = re.compile('|'.join(re.escape(pattern.lower()) for pattern in EXCLUDED_PATTERNS)) if EXCLUDED_PATTERNS else None
+
+
+def _both(pattern, flags=0):
+    """A pattern compiled for str and for bytes input, keyed by type"""
+    return {str: re.compile(pattern, flags), bytes: re.compile(pattern.encode('ascii'), flags)}
+
+
+# Comprehensive email regex pattern
+EMAIL_PATTERNS = _both(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# Phone number patterns (International & US/UK formats)
+# Matches: +1-555-555-5555, (555) 555-5555, 555 555 5555, etc.
+PHONE_PATTERNS = _both(r'''(?:(?:\+|00)([1-9]\d{0,2}))?[-. (]*(\d{3})[-. )]*(\d{3})[-. ]*(\d{4})(?: *x(\d+))?''')
+
+MAILTO_PATTERNS = _both(r'mailto:([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})', re.IGNORECASE)
+SCRIPT_PATTERNS = _both(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+STYLE_PATTERNS = _both(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+
+# Characters the email pattern can match; a match never spans anything else
+_ADDRESS_CHARS = r'[A-Za-z0-9._%+\-@|]'
+_ADDRESS_RUN = _both(_ADDRESS_CHARS + '*')
+_ADDRESS_TAIL = _both(_ADDRESS_CHARS + r'*\Z')
+_AT = {str: '@', bytes: b'@'}
+_EMPTY = {str: '', bytes: b''}
+
+# Characters scanned on each side of an '@' anchor, well above MAX_EMAIL_LENGTH
+EMAIL_WINDOW = 256
+
+# Streaming: characters carried to the next chunk for a match that may be
+# unfinished (longer than any real address or phone number), and the
+# longest unfinished tag carried before it is treated as text
+STREAM_OVERLAP = 2 * EMAIL_WINDOW
+STREAM_MAX_OPEN_TAG = 4096
+
+# Elements strip_scripts removes, opened and closed separately for streaming
+_SKIPPED_OPEN = _both(r'<(script|style)[^>]*>', re.IGNORECASE)
+_SKIPPED_CLOSE = {'script': _both(r'</script>', re.IGNORECASE), 'style': _both(r'</style>', re.IGNORECASE)}
+_LT = {str: '<', bytes: b'<'}
+_GT = {str: '>', bytes: b'>'}
+
+# Obfuscated addresses. Each decoder looks at most OBFUSCATED_CONTEXT
+# characters around its anchor (also the tail carried when streaming).
+OBFUSCATED_CONTEXT = 4 * EMAIL_WINDOW
+
+# Cloudflare: hex of the address XORed with the first byte, in data-cfemail or a protection link
+_CFEMAIL = _both(r'(?:data-cfemail\s*=\s*["\']?|/cdn-cgi/l/email-protection#)([0-9a-fA-F]{4,512})', re.IGNORECASE)
+_CF_MARKERS = ({str: 'data-cfemail', bytes: b'data-cfemail'}, {str: 'email-protection#', bytes: b'email-protection#'})
+
+# HTML entities: an entity '@', within a run of entities and address characters
+_ENTITY_AT = _both(r'&#0*64;|&#[xX]0*40;|&commat;')
+_ENTITY_TOKEN = r'(?:&#\d{1,7};|&#[xX][0-9a-fA-F]{1,6};|&(?:period|commat|lowbar|hyphen|plus);|[A-Za-z0-9._%+\-])'
+_ENTITY_RUN = _both(_ENTITY_TOKEN + '*')
+_ENTITY_TAIL = _both(_ENTITY_TOKEN + r'*\Z')
+_ENTITY_MARKERS = ({str: '&#', bytes: b'&#'}, {str: '&commat;', bytes: b'&commat;'})
+
+# Words: name [at] domain [dot] com, also with (), {} or <> and "@" / "." inside them
+_WORD_AT = _both(r'[\[\(\{<]\s*(?:at|@)\s*[\]\)\}>]', re.IGNORECASE)
+_WORD_DOT = r'(?:\s*[\[\(\{<]\s*(?:dot|\.)\s*[\]\)\}>]\s*|\.)'
+_WORD_LOCAL = _both(r'[A-Za-z0-9._%+\-]+\s*\Z')
+_WORD_DOMAIN = _both(r'\s*[A-Za-z0-9\-]+(?:' + _WORD_DOT + r'[A-Za-z0-9\-]+)+', re.IGNORECASE)
+_WORD_DOTS = _both(_WORD_DOT, re.IGNORECASE)
+
+# JS: a string literal holding '@' joined with others by '+' ('info' + '@' + 'example.com')
+_QUOTES = {str: ('"', "'"), bytes: (b'"', b"'")}
+_JS_CONCAT_TAIL = _both(r'''(?:(["'])[^"'\\\n]{0,100}\1\s*\+\s*)+\Z''')
+_JS_CONCAT_REST = _both(r'''(?:\s*\+\s*(["'])[^"'\\\n]{0,100}\1)+''')
+_JS_JOINT = _both(r'''["']\s*\+\s*(?=["'])''')
+_JS_LITERAL = _both(r'''(["'])([^"'\\\n]*)\1''')
+_PLUS = {str: '+', bytes: b'+'}
+
+
+def _email_matches(text, at, resume):
+    """
+    email_pattern matches in the address run around the '@' at index at (at
+    most EMAIL_WINDOW on each side, starting no earlier than resume), and the
+    end of that run
+    """
+    kind = type(text)
+    start = _ADDRESS_TAIL[kind].search(text, min(max(at - EMAIL_WINDOW, resume), at), at).start()
+    end = _ADDRESS_RUN[kind].match(text, at, at + EMAIL_WINDOW).end()
+    # One character past the run so the closing \b sees the real neighbour
+    matches = list(EMAIL_PATTERNS[kind].finditer(text, max(start, resume), end + 1))
+    if matches and end == at + EMAIL_WINDOW:
+        # The run goes on past the window: findall would take the whole last
+        # match (or none, once \b sees the real neighbour), and the next
+        # window resumes after it
+        whole = EMAIL_PATTERNS[kind].match(text, matches[-1].start())
+        if whole is None:
+            matches.pop()
+        else:
+            matches[-1] = whole
+    return matches, end
+
+
+def _is_valid_email(email):
+    """Verdict for a lowercased candidate, cheapest checks first"""
+    if len(email) < MIN_EMAIL_LENGTH or len(email) > MAX_EMAIL_LENGTH:
+        return False
+    
+    local_part, at, domain_part = email.partition('@')
+    if not at or '@' in domain_part:
+        return False
+    
+    # Suspicious dots
+    if '..' in email or email.startswith('.') or email.endswith('.'):
+        return False
+    
+    # File names like "image.jpg@domain.com" or "user@image.png"
+    if local_part.endswith(FILE_EXTENSIONS) or domain_part.endswith(FILE_EXTENSIONS):
+        return False
+    
+    if _EXCLUDED is not None and _EXCLUDED.search(email):
+        return False
+    
+    # The full RFC check is the expensive one, so it runs last
+    return bool(validators.email(email))
+
+
+class _VerdictCache:
+    """
+    Verdicts of lowercased candidates, kept process-wide (LRU of max_entries):
+    the same addresses (site footers, vendor contacts) turn up on page after
+    page. Lookups count in CACHE_REQUESTS as cache="email_verdict".
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def verdicts(self, emails):
+        """{email: verdict} for distinct lowercased candidates, validating the ones not cached"""
+        verdicts, missing = {}, []
+        with self._lock:
+            for email in emails:
+                if email in self._entries:
+                    self._entries.move_to_end(email)
+                    verdicts[email] = self._entries[email]
+                else:
+                    missing.append(email)
+        if verdicts:
+            CACHE_REQUESTS.inc(len(verdicts), cache='email_verdict', result='hit')
+        if missing:
+            CACHE_REQUESTS.inc(len(missing), cache='email_verdict', result='miss')
+            fresh = {email: _is_valid_email(email) for email in missing}
+            with self._lock:
+                self._entries.update(fresh)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            verdicts.update(fresh)
+        return verdicts
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_verdict_cache = _VerdictCache(EMAIL_VERDICT_CACHE_SIZE)
 
 
 class EmailExtractor:
     def __init__(self):
-        # Comprehensive email regex pattern
-        self.email_pattern = re.compile(
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        )
-        
-        # Phone number patterns (International & US/UK formats)
-        # Matches: +1-555-555-5555, (555) 555-5555, 555 555 5555, etc.
-        self.phone_pattern = re.compile(
-            r'''(?:(?:\+|00)([1-9]\d{0,2}))?[-. (]*(\d{3})[-. )]*(\d{3})[-. ]*(\d{4})(?: *x(\d+))?'''
-        )
+        self.email_pattern = EMAIL_PATTERNS[str]
+        self.phone_pattern = PHONE_PATTERNS[str]
     
     def extract_from_text(self, text):
         """Extract all email addresses from text"""
         if not text:
             return []
         
-        # Find all matches
-        emails = self.email_pattern.findall(text)
-        
-        # Validate and filter
-        valid_emails = []
-        for email in emails:
-            if self.is_valid_email(email):
-                valid_emails.append(email.lower())
-        
-        # Remove duplicates while preserving order
-        return list(dict.fromkeys(valid_emails))
+        return self._valid_unique(self._email_candidates(text))
+    
+    def _email_candidates(self, text):
+        """
+        email_pattern matches, found around '@' anchors only
+
+        str.find locates each '@' and the regex runs on the run of address
+        characters around it (at most EMAIL_WINDOW on each side) instead of
+        walking the whole document; text without '@' costs a single scan.
+        A window never reaches back before the previous window's last match,
+        where a findall over the whole document would resume, so the tail of
+        one address isn't matched again as the start of the next.
+        """
+        anchor = _AT[type(text)]
+        candidates = []
+        resume = 0
+        at = text.find(anchor)
+        while at != -1:
+            matches, end = _email_matches(text, at, resume)
+            if matches:
+                candidates.extend(match.group() for match in matches)
+                resume = matches[-1].end()
+            at = text.find(anchor, end)
+        return candidates
+    
+    def _valid_unique(self, candidates):
+        """Lowercased valid emails in first-seen order, each candidate validated once"""
+        unique = dict.fromkeys(
+            (email if isinstance(email, str) else email.decode('ascii')).lower() for email in candidates
+        )
+        verdicts = _verdict_cache.verdicts(unique)
+        return [email for email in unique if verdicts[email]]
     
     def extract_phones(self, text):
-        """Extract phone numbers from text"""
+        """
+        Extract phone numbers from text as PhoneNumber (e164, display),
+        one per canonical number
+        """
         if not text:
             return []
             
-        matches = self.phone_pattern.findall(text)
+        phones = {}
+        for phone in self._phone_numbers(PHONE_PATTERNS[type(text)].findall(text)):
+            phones.setdefault(phone.e164, phone)
+        return list(phones.values())
+    
+    def _phone_numbers(self, matches):
+        """Normalized phone numbers from phone pattern group tuples, minus impossible ones"""
         phones = []
         
         for match in matches:
-            # Reconstruct phone number from groups
             # Groups: 1=CountryCode, 2=AreaCode, 3=Prefix, 4=Line, 5=Extension
-            parts = [p for p in match if p]
-            if len(parts) >= 3: # At least Area, Prefix, Line
-                phone = "-".join(parts)
-                # Basic length check to avoid false positives like dates
-                if len(re.sub(r'\D', '', phone)) >= 10:
-                    phones.append(phone)
+            country_code, area, prefix, line, extension = (
+                p.decode('ascii') if isinstance(p, bytes) else p for p in match
+            )
+            phone = phone_from_parts(country_code, area + prefix + line, extension)
+            if phone:
+                phones.append(phone)
         
-        return list(dict.fromkeys(phones))
+        return phones
     
     def is_valid_email(self, email):
         """Validate email address"""
-        # Length check
-        if len(email) < MIN_EMAIL_LENGTH or len(email) > MAX_EMAIL_LENGTH:
-            return False
-        
-        # Check for excluded patterns
-        for pattern in EXCLUDED_PATTERNS:
-            if pattern in email.lower():
-                return False
-        
-        # Use validators library for robust validation
-        if not validators.email(email):
-            return False
-        
-        # Additional checks
-        if email.count('@') != 1:
-            return False
-        
-        # Check for suspicious patterns
-        if '..' in email or email.startswith('.') or email.endswith('.'):
-            return False
-        
-        # NEW: Reject emails with file extensions in the local part (before @)
-        # This prevents matching things like "image.jpg@domain.com"
-        local_part = email.split('@')[0].lower()
-        domain_part = email.split('@')[1].lower()
-        
-        file_extensions = [
-            '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.bmp', '.ico',
-            '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-            '.zip', '.rar', '.tar', '.gz', '.mp4', '.avi', '.mov', '.mp3',
-            '.wav', '.css', '.js', '.html', '.xml', '.json', '.txt',
-            '.woff', '.woff2', '.ttf', '.eot'
-        ]
-        
-        # Check local part
-        for ext in file_extensions:
-            if local_part.endswith(ext):
-                return False
-                
-        # Check domain part (e.g. user@image.png)
-        for ext in file_extensions:
-            if domain_part.endswith(ext):
-                return False
-        
-        return True
+        email = email.lower()
+        return _verdict_cache.verdicts((email,))[email]
     
     def get_domain(self, email):
         """Extract domain from email address"""
@@ -113,31 +279,120 @@ class EmailExtractor:
         except:
             return None
     
-    def extract_from_html(self, html_content):
-        """Extract emails and phones from HTML content"""
-        # Remove script and style tags
-        cleaned_text = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-        cleaned_text = re.sub(r'<style[^>]*>.*?</style>', '', cleaned_text, flags=re.DOTALL | re.IGNORECASE)
+    def extract_from_html(self, html_content, cleaned_text=None):
+        """
+        Extract emails and phones from HTML content (str, or bytes in an
+        ASCII-compatible encoding); pass cleaned_text if strip_scripts()
+        already ran on it
+        """
+        if cleaned_text is None:
+            cleaned_text = self.strip_scripts(html_content)
         
-        # Extract from mailto links
-        mailto_pattern = re.compile(r'mailto:([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})', re.IGNORECASE)
-        mailto_emails = mailto_pattern.findall(html_content)
-        
-        # Extract from plain text
-        text_emails = self.extract_from_text(cleaned_text)
+        # Candidates from mailto links, then plain text, then obfuscated addresses
+        if _AT[type(html_content)] in html_content:
+            candidates = MAILTO_PATTERNS[type(html_content)].findall(html_content)
+            candidates.extend(self._email_candidates(cleaned_text))
+        else:
+            candidates = []
+        candidates.extend(self.decode_obfuscated(html_content))
         
         # Extract phones
         phones = self.extract_phones(cleaned_text)
         
-        # Combine and deduplicate
-        all_emails = mailto_emails + text_emails
-        valid_emails = []
+        # Deduplicate, then validate each candidate once
+        return self._valid_unique(candidates), phones
+    
+    def decode_obfuscated(self, html_content, start=0, end=None):
+        """
+        Candidate addresses (str, not validated) decoded from obfuscations
+        in HTML content, for anchors between start and end
+
+        Each decoder first checks the page for its marker, so pages
+        without obfuscation pay a few substring searches.
+        """
+        kind = type(html_content)
+        end = len(html_content) if end is None else end
+        decoded = []
+        
+        if any(marker[kind] in html_content for marker in _CF_MARKERS):
+            for match in _CFEMAIL[kind].finditer(html_content, start):
+                if match.start() >= end:
+                    break
+                decoded.append(_decode_cfemail(match.group(1)))
+        
+        if any(marker[kind] in html_content for marker in _ENTITY_MARKERS):
+            for match in _ENTITY_AT[kind].finditer(html_content, start):
+                if match.start() >= end:
+                    break
+                before = _ENTITY_TAIL[kind].search(html_content, max(match.start() - 3 * EMAIL_WINDOW, 0), match.start())
+                after = _ENTITY_RUN[kind].match(html_content, match.end(), match.end() + 3 * EMAIL_WINDOW)
+                decoded.append(html.unescape(_text(html_content[before.start():after.end()])))
         
-        for email in all_emails:
-            if self.is_valid_email(email):
-                valid_emails.append(email.lower())
+        for match in _WORD_AT[kind].finditer(html_content, start):
+            if match.start() >= end:
+                break
+            local = _WORD_LOCAL[kind].search(html_content, max(match.start() - EMAIL_WINDOW, 0), match.start())
+            domain = _WORD_DOMAIN[kind].match(html_content, match.end(), match.end() + EMAIL_WINDOW)
+            if local and domain:
+                domain = _WORD_DOTS[kind].sub(_text_of(kind, '.'), domain.group().strip())
+                decoded.append(_text(local.group().rstrip()) + '@' + _text(domain))
         
-        return list(dict.fromkeys(valid_emails)), phones
+        if _PLUS[kind] in html_content:
+            decoded.extend(self._js_concatenations(html_content, start, end))
+        
+        return [email for text in decoded for email in self.email_pattern.findall(text)]
+    
+    def _js_concatenations(self, html_content, start, end):
+        """Joined string literals of each '+' concatenation with an '@' in one of its literals"""
+        kind = type(html_content)
+        joined = []
+        # Where one literal is joined to the next: its closing quote and the next opening quote
+        end = len(html_content) if end is None else end
+        joints = list(_JS_JOINT[kind].finditer(html_content, max(start - EMAIL_WINDOW, 0), end + EMAIL_WINDOW))
+        if not joints:
+            return joined
+        closings = [joint.start() for joint in joints]
+        joined_closings, joined_openings = set(closings), {joint.end() for joint in joints}
+        at = html_content.find(_AT[kind], start, end)
+        while at != -1:
+            # Skip ahead to the '@' anchors that a joint is close enough to
+            nearest = bisect.bisect_left(closings, at - EMAIL_WINDOW)
+            if nearest == len(closings):
+                break
+            if closings[nearest] > at + 100:
+                at = html_content.find(_AT[kind], max(closings[nearest] - 100, at + 1), end)
+                continue
+            # The literal around the '@': nearest quote before it, same quote after it
+            opening = max(html_content.rfind(quote, max(at - 100, 0), at) for quote in _QUOTES[kind])
+            if opening != -1:
+                quote = html_content[opening:opening + 1]
+                closing = html_content.find(quote, at, at + 100)
+                # Only a literal joined by '+' to another literal is worth the regexes
+                if closing != -1 and (closing in joined_closings or opening in joined_openings):
+                    before = _JS_CONCAT_TAIL[kind].search(html_content, max(opening - EMAIL_WINDOW, 0), opening)
+                    after = _JS_CONCAT_REST[kind].match(html_content, closing + 1, closing + 1 + EMAIL_WINDOW)
+                    if before or after:
+                        literals = _JS_LITERAL[kind].findall(
+                            html_content, before.start() if before else opening, after.end() if after else closing + 1
+                        )
+                        joined.append(''.join(_text(literal) for _, literal in literals))
+            at = html_content.find(_AT[kind], at + 1, end)
+        return joined
+    
+    def stream(self, text_sink=None):
+        """
+        A ChunkedExtraction: extract_from_html for a page fed in chunks
+
+        text_sink(text, final), if given, receives the page with scripts and
+        styles removed as it is produced, for scanners sharing the stripping.
+        """
+        return ChunkedExtraction(self, text_sink)
+    
+    def strip_scripts(self, html_content):
+        """HTML without its script and style elements"""
+        kind = type(html_content)
+        cleaned_text = SCRIPT_PATTERNS[kind].sub(_EMPTY[kind], html_content)
+        return STYLE_PATTERNS[kind].sub(_EMPTY[kind], cleaned_text)
     
     def filter_emails(self, emails, domain_filter=None):
         """Filter emails by domain"""
@@ -172,3 +427,172 @@ class EmailExtractor:
             'unique_domains': len(domains),
             'domains': domains
         }
+
+
+def _text(value):
+    """str of a str or ASCII bytes slice"""
+    return value if isinstance(value, str) else value.decode('ascii', errors='ignore')
+
+
+def _text_of(kind, value):
+    """value (str) as the given type"""
+    return value if kind is str else value.encode('ascii')
+
+
+def _decode_cfemail(hex_digits):
+    """Cloudflare email protection: every byte XORed with the first"""
+    data = bytes.fromhex(_text(hex_digits)[:len(hex_digits) // 2 * 2])
+    return ''.join(chr(byte ^ data[0]) for byte in data[1:])
+
+
+def _settled_matches(pattern, text, pos, final):
+    """
+    Matches of pattern in text from pos that more input can't change, and
+    the position to resume from once more input is appended
+    """
+    matches = []
+    limit = len(text) - STREAM_OVERLAP
+    for match in pattern.finditer(text, pos):
+        if not final and match.end() > limit:
+            return matches, match.start()
+        matches.append(match)
+        pos = match.end()
+    return matches, pos if final else max(pos, limit)
+
+
+class ChunkedExtraction:
+    """
+    extract_from_html over a page that arrives in chunks
+
+    Each chunk is stripped of scripts and styles and scanned as it is fed.
+    Only short tails are carried to the next chunk (an unfinished tag or
+    match, and the address characters before an '@'), so memory stays
+    bounded however large the page is. Results equal extract_from_html on
+    the whole page unless a single tag or match is longer than the carried
+    tail, or a script or style is never closed (it is dropped to the end).
+    """
+
+    def __init__(self, extractor, text_sink=None):
+        self.extractor = extractor
+        self.text_sink = text_sink
+        self._kind = None
+        self._raw = None  # Unstripped tail: an unfinished tag, or a partial closing tag
+        self._closing = None  # Closing tag pattern while inside a script or style
+        self._mailto = None  # Raw tail not yet scanned for mailto links
+        self._obfuscated = None  # Raw tail: context and anchors not yet decoded
+        self._obfuscated_pos = 0
+        self._text = None  # Stripped tail kept for email and phone scanning
+        self._email_pos = 0
+        self._email_resume = 0  # End of the last email match in _text
+        self._phone_pos = 0
+        # Lowercased candidates in first-seen order, deduplicated as they come
+        self._mailto_candidates = {}
+        self._text_candidates = {}
+        self._obfuscated_candidates = {}
+        self._phones = {}  # e164 -> PhoneNumber
+    
+    def feed(self, chunk):
+        """Extract from the next chunk of the page (str, or bytes as for extract_from_html)"""
+        if not chunk:
+            return
+        if self._kind is None:
+            self._kind = type(chunk)
+            self._raw = self._mailto = self._obfuscated = self._text = _EMPTY[self._kind]
+        self._scan_mailto(self._mailto + chunk, final=False)
+        self._scan_obfuscated(self._obfuscated + chunk, final=False)
+        self._scan_text(self._strip(self._raw + chunk, final=False), final=False)
+    
+    def close(self):
+        """Finish the page; returns (emails, phones) like extract_from_html"""
+        if self._kind is not None:
+            self._scan_mailto(self._mailto, final=True)
+            self._scan_obfuscated(self._obfuscated, final=True)
+            self._scan_text(self._strip(self._raw, final=True), final=True)
+        # Candidates from mailto links, then plain text, then obfuscated addresses
+        candidates = [*self._mailto_candidates, *self._text_candidates, *self._obfuscated_candidates]
+        return self.extractor._valid_unique(candidates), list(self._phones.values())
+    
+    def _strip(self, text, final):
+        """The settled part of text without scripts and styles; keeps the rest in _raw"""
+        kind = self._kind
+        pieces = []
+        pos = 0
+        while True:
+            if self._closing is not None:
+                match = self._closing.search(text, pos)
+                if match is None:
+                    # Still inside: only a partial closing tag is worth keeping
+                    pos = len(text) if final else max(pos, len(text) - len('</script>') + 1)
+                    break
+                pos = match.end()
+                self._closing = None
+            
+            match = _SKIPPED_OPEN[kind].search(text, pos)
+            if match is None:
+                end = len(text)
+                if not final:
+                    # Hold back a tag whose '>' hasn't arrived yet; it may open a script
+                    lt = text.find(_LT[kind], max(text.rfind(_GT[kind], pos) + 1, pos))
+                    if lt != -1 and len(text) - lt < STREAM_MAX_OPEN_TAG:
+                        end = lt
+                pieces.append(text[pos:end])
+                pos = end
+                break
+            
+            pieces.append(text[pos:match.start()])
+            name = match.group(1).lower()
+            self._closing = _SKIPPED_CLOSE[name if kind is str else name.decode('ascii')][kind]
+            pos = match.end()
+        
+        self._raw = text[pos:]
+        cleaned = _EMPTY[kind].join(pieces)
+        if self.text_sink is not None:
+            self.text_sink(cleaned, final)
+        return cleaned
+    
+    def _scan_mailto(self, text, final):
+        matches, resume = _settled_matches(MAILTO_PATTERNS[self._kind], text, 0, final)
+        self._mailto_candidates.update(dict.fromkeys(self._lowercased(match.group(1) for match in matches)))
+        self._mailto = text[resume:]
+    
+    def _scan_obfuscated(self, text, final):
+        """Decode anchors with OBFUSCATED_CONTEXT on both sides, carrying that much context"""
+        end = len(text) if final else max(len(text) - OBFUSCATED_CONTEXT, self._obfuscated_pos)
+        candidates = self.extractor.decode_obfuscated(text, self._obfuscated_pos, end)
+        self._obfuscated_candidates.update(dict.fromkeys(email.lower() for email in candidates))
+        keep = max(end - OBFUSCATED_CONTEXT, 0)
+        self._obfuscated = text[keep:]
+        self._obfuscated_pos = end - keep
+    
+    def _lowercased(self, candidates):
+        return (email.lower() if self._kind is str else email.decode('ascii').lower() for email in candidates)
+    
+    def _scan_text(self, cleaned, final):
+        """Emails and phones from the stripped text, carrying what later text may still extend"""
+        kind = self._kind
+        text = self._text + cleaned
+        
+        # Same anchored scan as _email_candidates, stopping at an '@' whose window isn't complete
+        anchor = _AT[kind]
+        resume = self._email_resume
+        at = text.find(anchor, self._email_pos)
+        while at != -1 and (final or at + EMAIL_WINDOW + 1 < len(text)):
+            if not final and _ADDRESS_RUN[kind].match(text, at).end() == len(text):
+                break  # A run past the window that the next chunk may extend
+            matches, end = _email_matches(text, at, resume)
+            if matches:
+                self._text_candidates.update(dict.fromkeys(self._lowercased(match.group() for match in matches)))
+                resume = matches[-1].end()
+            at = text.find(anchor, end)
+        email_resume = len(text) if at == -1 else at
+        
+        matches, phone_resume = _settled_matches(PHONE_PATTERNS[kind], text, self._phone_pos, final)
+        for phone in self.extractor._phone_numbers(match.groups() for match in matches):
+            self._phones.setdefault(phone.e164, phone)
+        
+        # Keep the window before the next '@', and one character of context for each scan
+        keep = max(min(email_resume - EMAIL_WINDOW - 1, phone_resume - 1), 0)
+        self._text = text[keep:]
+        self._email_pos = email_resume - keep
+        self._email_resume = max(resume - keep, 0)
+        self._phone_pos = phone_resume - keep
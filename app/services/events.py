@@ -0,0 +1,96 @@
+"""
+Search Event Bus
+Per-search, in-process event log backing the Server-Sent Events stream.
+Each search keeps a bounded buffer of numbered events so a reconnecting
+client can resume from its Last-Event-ID.
+"""
+
+import threading
+import time
+from collections import deque
+from config import EVENT_HISTORY_SIZE, EVENT_RETENTION
+
+
+class SearchEventBus:
+    def __init__(self, history_size=None, retention=None):
+        self.history_size = history_size or EVENT_HISTORY_SIZE
+        self.retention = retention if retention is not None else EVENT_RETENTION
+        self._cond = threading.Condition()
+        self._streams = {}
+
+    def _purge(self):
+        """Forget finished streams once their retention window has passed"""
+        now = time.time()
+        expired = [
+            sid for sid, stream in self._streams.items()
+            if stream['closed_at'] and now - stream['closed_at'] > self.retention
+        ]
+        for sid in expired:
+            del self._streams[sid]
+
+    def open(self, search_id):
+        """Create the event stream for a search (no-op if it already exists)"""
+        with self._cond:
+            self._purge()
+            if search_id not in self._streams:
+                self._streams[search_id] = {
+                    'events': deque(maxlen=self.history_size),
+                    'last_id': 0,
+                    'closed_at': None
+                }
+
+    def has(self, search_id):
+        with self._cond:
+            return search_id in self._streams
+
+    def publish(self, search_id, event_type, data):
+        """Append an event and wake up any waiting readers"""
+        with self._cond:
+            stream = self._streams.get(search_id)
+            if stream is None or stream['closed_at']:
+                return None
+            stream['last_id'] += 1
+            stream['events'].append({'id': stream['last_id'], 'event': event_type, 'data': data})
+            self._cond.notify_all()
+            return stream['last_id']
+
+    def close(self, search_id, status):
+        """Publish the final 'complete' event and mark the stream finished"""
+        self.publish(search_id, 'complete', {'status': status})
+        with self._cond:
+            stream = self._streams.get(search_id)
+            if stream is not None:
+                stream['closed_at'] = time.time()
+            self._cond.notify_all()
+
+    def read(self, search_id, after_id, timeout):
+        """
+        Wait for events newer than after_id
+
+        Returns:
+            (events, closed, gap) - gap is True when events after after_id
+            have already been dropped from the buffer
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                stream = self._streams.get(search_id)
+                if stream is None:
+                    return [], True, False
+
+                events = [e for e in stream['events'] if e['id'] > after_id]
+                oldest = stream['events'][0]['id'] if stream['events'] else stream['last_id'] + 1
+                gap = after_id + 1 < oldest and after_id < stream['last_id']
+                closed = stream['closed_at'] is not None
+
+                if events or closed:
+                    return events, closed, gap
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], False, False
+                self._cond.wait(remaining)
+
+
+# Shared by the crawler threads and the SSE handlers of this process
+event_bus = SearchEventBus()
@@ -0,0 +1,131 @@
+"""
+Columnar Exporter
+Writes email/phone/business tables to Parquet or Arrow IPC in row-group batches
+"""
+
+from config import EXPORT_BATCH_SIZE, EXPORT_COMPRESSION
+
+# Column layout per exportable table: (column, kind)
+# 'dict' columns are repetitive strings (many rows share a value) stored dictionary-encoded
+EXPORT_TABLES = {
+    'emails': [
+        ('email', 'string'),
+        ('domain', 'dict'),
+        ('source_url', 'dict'),
+        ('business_name', 'string'),
+        ('website', 'string'),
+        ('address', 'string'),
+        ('first_seen', 'timestamp'),
+        ('last_seen', 'timestamp'),
+        ('hit_count', 'int'),
+    ],
+    'phones': [
+        ('phone', 'string'),
+        ('e164', 'string'),
+        ('source_url', 'dict'),
+        ('business_name', 'string'),
+        ('website', 'string'),
+        ('address', 'string'),
+        ('first_seen', 'timestamp'),
+        ('last_seen', 'timestamp'),
+        ('hit_count', 'int'),
+    ],
+    'businesses': [
+        ('search_id', 'int'),
+        ('name', 'string'),
+        ('phone', 'string'),
+        ('address', 'string'),
+        ('website', 'string'),
+        ('rating', 'float'),
+        ('review_count', 'int'),
+        ('source', 'dict'),
+        ('found_at', 'timestamp'),
+    ],
+}
+
+EXPORT_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+class ColumnarExporter:
+    def __init__(self, db, batch_size=None):
+        # pyarrow is an optional dependency, only needed for bulk exports
+        try:
+            import pyarrow
+        except ImportError:
+            raise RuntimeError("pyarrow is required for Parquet/Arrow exports (pip install pyarrow)")
+
+        self.pa = pyarrow
+        self.db = db
+        self.batch_size = batch_size or EXPORT_BATCH_SIZE
+
+    def build_schema(self, table):
+        """Build the Arrow schema for an export table"""
+        pa = self.pa
+        types = {
+            'int': pa.int64(),
+            'string': pa.string(),
+            'dict': pa.dictionary(pa.int32(), pa.string()),
+            'float': pa.float64(),
+            'timestamp': pa.timestamp('s'),
+        }
+        return pa.schema([(name, types[kind]) for name, kind in EXPORT_TABLES[table]])
+
+    def _to_record_batch(self, rows, table, schema):
+        """Convert a batch of DB rows (dicts) to an Arrow record batch"""
+        pa = self.pa
+        arrays = []
+        for name, kind in EXPORT_TABLES[table]:
+            values = [row.get(name) for row in rows]
+            if kind == 'dict':
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+            elif kind == 'float':
+                # MySQL returns DECIMAL columns as Decimal
+                arrays.append(pa.array([float(v) if v is not None else None for v in values], type=pa.float64()))
+            else:
+                arrays.append(pa.array(values, type=schema.field(name).type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def export(self, table, fmt, path, search_id=None):
+        """
+        Export a table to a file, one row group / record batch per DB fetch
+
+        Args:
+            table: 'emails', 'phones' or 'businesses'
+            fmt: 'parquet' or 'arrow'
+            path: Output file path
+            search_id: Optional search to restrict the export to
+
+        Returns:
+            Number of rows written
+        """
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unsupported export table: {table}")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        schema = self.build_schema(table)
+        columns = [name for name, _ in EXPORT_TABLES[table]]
+        batches = self.db.iter_export_batches(table, columns, search_id=search_id, batch_size=self.batch_size)
+
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            dict_columns = [name for name, kind in EXPORT_TABLES[table] if kind == 'dict']
+            writer = pq.ParquetWriter(path, schema, compression=EXPORT_COMPRESSION, use_dictionary=dict_columns)
+            write = writer.write_batch
+        else:
+            # The IPC stream format allows each batch to carry its own dictionary
+            writer = self.pa.ipc.new_stream(path, schema)
+            write = writer.write_batch
+
+        total = 0
+        try:
+            for rows in batches:
+                write(self._to_record_batch(rows, table, schema))
+                total += len(rows)
+        finally:
+            writer.close()
+
+        return total
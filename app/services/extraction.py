@@ -0,0 +1,328 @@
+"""
+Page Extraction
+Turns a fetched page into its emails, phones and outgoing links.
+
+Pages are processed as the raw bytes received: emails, phones and link
+markup are ASCII, so for ASCII-compatible encodings nothing is decoded
+except the matched hrefs. The charset comes from a BOM, the Content-Type
+header or a <meta> tag in the first PAGE_SNIFF_BYTES; UTF-16/32 pages (and
+other encodings that aren't ASCII-compatible) are re-encoded to UTF-8
+first.
+
+PageStream extracts from a body fed chunk by chunk as it downloads, so
+large pages are never held in memory whole.
+
+Extraction is pure CPU work (regexes and HTML parsing), so on crawl threads
+it is serialized by the GIL. With EXTRACTION_PROCESSES > 0 the crawler
+sends page bodies to a process pool instead, grouped into batches of up to
+EXTRACTION_BATCH_SIZE pages to amortize the inter-process round trip.
+"""
+
+import codecs
+import concurrent.futures
+import html
+import multiprocessing
+import re
+import threading
+import time
+from functools import lru_cache
+from urllib.parse import urljoin
+import validators
+from config import EXTRACTION_PROCESSES, EXTRACTION_BATCH_SIZE, EXTRACTION_BATCH_WAIT, PAGE_SNIFF_BYTES
+from app.services.email_extractor import EmailExtractor, STREAM_MAX_OPEN_TAG
+
+_extractor = EmailExtractor()
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'), (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16-le'), (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+# Comments are matched (and skipped) so commented-out links aren't followed
+_ANCHOR_HREF = re.compile(
+    rb'<!--.*?-->|<a\s[^>]*?\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))',
+    re.IGNORECASE | re.DOTALL
+)
+# The same, split for streaming: where a comment or anchor starts, then the anchor itself
+_COMMENT_OR_ANCHOR = re.compile(rb'<!--|<a\s', re.IGNORECASE)
+_ANCHOR_HREF_AT = re.compile(_ANCHOR_HREF.pattern.split(b'|', 1)[1], re.IGNORECASE | re.DOTALL)
+
+
+@lru_cache(maxsize=64)
+def _codec(name):
+    """Normalized codec name, or None if Python doesn't know it"""
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+@lru_cache(maxsize=64)
+def is_ascii_compatible(encoding):
+    """Whether ASCII text (tags, emails, URLs) keeps its bytes in this encoding"""
+    sample = '<a href="mailto:x@y.com">'
+    try:
+        return sample.encode(encoding) == sample.encode('ascii')
+    except (LookupError, UnicodeError):
+        return False
+
+
+def sniff_encoding(body, content_type=None):
+    """
+    Charset of a page from its BOM, Content-Type header, <meta> tag or
+    UTF-16 byte pattern (in that order), looking at the head only
+    """
+    for bom, encoding in _BOMS:
+        if body.startswith(bom):
+            return encoding
+    if content_type:
+        match = _HEADER_CHARSET.search(content_type)
+        if match and _codec(match.group(1)):
+            return _codec(match.group(1))
+    head = body[:PAGE_SNIFF_BYTES]
+    match = _META_CHARSET.search(head)
+    if match and _codec(match.group(1).decode('ascii')):
+        encoding = _codec(match.group(1).decode('ascii'))
+        # A UTF-16 page can't declare itself in ASCII; the declaration is wrong
+        return 'utf-8' if encoding.startswith('utf-16') else encoding
+    # No BOM or declaration: ASCII markup in UTF-16 leaves every other byte NUL
+    if head.count(b'\x00') > len(head) // 4:
+        return 'utf-16-le' if head[1:2] == b'\x00' else 'utf-16-be'
+    return 'utf-8'
+
+
+def extract_links(body, url, encoding='utf-8'):
+    """Absolute http(s) links of a page (bytes), without fragments or self-links"""
+    links = []
+
+    for match in _ANCHOR_HREF.finditer(body):
+        link = _absolute_link(match, url, encoding)
+        if link:
+            links.append(link)
+
+    return links
+
+
+def _absolute_link(match, url, encoding):
+    """The followable URL of an anchor (or comment) match, or None"""
+    raw = match.group(1) or match.group(2) or match.group(3)
+    if raw is None:
+        return None  # a comment
+    href = html.unescape(raw.decode(encoding, errors='replace')).strip()
+    full_url = urljoin(url, href)
+
+    # Basic filtering
+    if validators.url(full_url) and full_url.startswith('http'):
+        # Avoid same page anchors
+        if '#' in full_url:
+            full_url = full_url.split('#')[0]
+
+        if full_url != url:
+            return full_url
+    return None
+
+
+def extract_page(body, url, content_type=None):
+    """
+    Extract (emails, phones, links) from a page body (bytes, or str)
+
+    Also returns the CPU seconds it took, measured in whichever thread or
+    process ran it.
+    """
+    cpu_started = time.thread_time()
+    if isinstance(body, str):
+        body, encoding = body.encode('utf-8'), 'utf-8'
+    else:
+        encoding = sniff_encoding(body, content_type)
+        if not is_ascii_compatible(encoding):
+            # UTF-16 and friends: the one case that decodes the whole page
+            body, encoding = body.decode(encoding, errors='replace').encode('utf-8'), 'utf-8'
+
+    cleaned = _extractor.strip_scripts(body)
+    emails, phones = _extractor.extract_from_html(body, cleaned)
+    links = extract_links(cleaned, url, encoding)
+    return (emails, phones, links), time.thread_time() - cpu_started
+
+
+class PageStream:
+    """
+    extract_page over a body (bytes) fed in chunks as it downloads
+
+    The first PAGE_SNIFF_BYTES are held back to find the charset; after
+    that each chunk is extracted when fed and only short tails are carried
+    over (see ChunkedExtraction), so memory stays bounded and extraction
+    overlaps the download.
+    """
+
+    def __init__(self, url, content_type=None):
+        self.url = url
+        self.content_type = content_type
+        self.size = 0
+        self.cpu_seconds = 0.0
+        self._head = []  # Chunks held until the charset is known
+        self._encoding = None
+        self._decoder = None
+        self._text = _extractor.stream(text_sink=self._scan_links)
+        self._link_tail = b''
+        self._in_comment = False
+        self._links = []
+
+    def feed(self, chunk):
+        cpu_started = time.thread_time()
+        self.size += len(chunk)
+        if self._encoding is None:
+            self._head.append(chunk)
+            if self.size >= PAGE_SNIFF_BYTES:
+                self._start()
+        else:
+            self._feed_body(chunk)
+        self.cpu_seconds += time.thread_time() - cpu_started
+
+    def close(self):
+        """Same result as extract_page on the whole body"""
+        cpu_started = time.thread_time()
+        if self._encoding is None:
+            self._start()
+        if self._decoder is not None:
+            self._text.feed(self._decoder.decode(b'', final=True).encode('utf-8'))
+        emails, phones = self._text.close()
+        self.cpu_seconds += time.thread_time() - cpu_started
+        return (emails, phones, self._links), self.cpu_seconds
+
+    def _start(self):
+        head = b''.join(self._head)
+        self._head = None
+        self._encoding = sniff_encoding(head, self.content_type)
+        if not is_ascii_compatible(self._encoding):
+            self._decoder = codecs.getincrementaldecoder(self._encoding)(errors='replace')
+            self._encoding = 'utf-8'
+        self._feed_body(head)
+
+    def _feed_body(self, chunk):
+        if self._decoder is not None:
+            chunk = self._decoder.decode(chunk).encode('utf-8')
+        self._text.feed(chunk)
+
+    def _scan_links(self, text, final):
+        """extract_links over the stripped text as ChunkedExtraction produces it"""
+        text = self._link_tail + text
+        pos = 0
+        while True:
+            if self._in_comment:
+                end = text.find(b'-->', pos)
+                if end == -1:
+                    # Keep what could be the start of '-->'
+                    pos = len(text) if final else max(pos, len(text) - 2)
+                    break
+                pos = end + 3
+                self._in_comment = False
+
+            start = _COMMENT_OR_ANCHOR.search(text, pos)
+            if start is None:
+                # Keep what could be the start of '<!--' or '<a '
+                pos = len(text) if final else max(pos, len(text) - 3)
+                break
+            if start.group(0) == b'<!--':
+                self._in_comment = True
+                pos = start.end()
+                continue
+
+            anchor = _ANCHOR_HREF_AT.match(text, start.start())
+            if not final and (anchor.end() == len(text) if anchor else text.find(b'>', start.start()) == -1):
+                # The tag (or an unquoted href) may continue in the next chunk
+                if len(text) - start.start() < STREAM_MAX_OPEN_TAG:
+                    pos = start.start()
+                    break
+            if anchor is None:
+                pos = start.start() + 1
+                continue
+            link = _absolute_link(anchor, self.url, self._encoding)
+            if link:
+                self._links.append(link)
+            pos = anchor.end()
+        self._link_tail = text[pos:]
+
+
+def _extract_batch(pages):
+    """Pool task: extract a batch of (body, url, content_type) pages, failing pages individually"""
+    results = []
+    for body, url, content_type in pages:
+        try:
+            results.append((True, extract_page(body, url, content_type)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+class ExtractionPool:
+    def __init__(self, processes=None, batch_size=None, batch_wait=None):
+        self.processes = processes or EXTRACTION_PROCESSES
+        self.batch_size = batch_size or EXTRACTION_BATCH_SIZE
+        self.batch_wait = batch_wait if batch_wait is not None else EXTRACTION_BATCH_WAIT
+        # Spawned rather than forked: the crawl process is full of threads and locks
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=multiprocessing.get_context('spawn')
+        )
+        self._pending = []  # (body, url, content_type, Future)
+        self._ready = threading.Condition()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='extraction-dispatch', daemon=True)
+        self._dispatcher.start()
+
+    def extract(self, body, url, content_type=None):
+        """Same result as extract_page, computed in a pool process"""
+        future = concurrent.futures.Future()
+        with self._ready:
+            if self._closed:
+                raise RuntimeError('Extraction pool is shut down')
+            self._pending.append((body, url, content_type, future))
+            self._ready.notify()
+        return future.result()
+
+    def _dispatch_loop(self):
+        """Send pending pages as batches: full, or after waiting batch_wait for more"""
+        while True:
+            with self._ready:
+                while not self._pending and not self._closed:
+                    self._ready.wait()
+                if not self._pending:
+                    return
+                deadline = time.monotonic() + self.batch_wait
+                while len(self._pending) < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+
+            try:
+                task = self._executor.submit(_extract_batch, [page[:3] for page in batch])
+            except Exception as e:
+                for *_, future in batch:
+                    future.set_exception(e)
+                continue
+            task.add_done_callback(lambda task, batch=batch: self._deliver(task, batch))
+
+    def _deliver(self, task, batch):
+        try:
+            results = task.result()
+        except Exception as e:
+            # The pool itself failed (e.g. a worker process died)
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+        for (*_, future), (ok, value) in zip(batch, results):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def shutdown(self):
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        self._dispatcher.join()
+        self._executor.shutdown()
@@ -0,0 +1,66 @@
+"""
+Live Status Registry
+In-process progress of running searches, updated by the crawler on every
+page and read by /api/status without touching the database
+"""
+
+import threading
+import time
+
+
+class LiveStatusRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._searches = {}
+
+    def start(self, search_id, status='running'):
+        """Register a search as running in this process"""
+        with self._lock:
+            self._searches[search_id] = {
+                'search_id': search_id,
+                'status': status,
+                'pages_crawled': 0,
+                'total_emails': 0,
+                'current_url': None,
+                'message': None,
+                'percent': 0,
+                'stop_requested': False,
+                'updated_at': time.time()
+            }
+
+    def update(self, search_id, **fields):
+        """Update fields of a running search (ignored if it isn't registered)"""
+        with self._lock:
+            entry = self._searches.get(search_id)
+            if entry is None:
+                return
+            entry.update(fields)
+            entry['updated_at'] = time.time()
+
+    def get(self, search_id):
+        """Snapshot of a running search, or None if it isn't running here"""
+        with self._lock:
+            entry = self._searches.get(search_id)
+            return dict(entry) if entry else None
+
+    def request_stop(self, search_id):
+        """Ask the crawl loop to stop after the pages already in flight"""
+        self.update(search_id, stop_requested=True, status='stopping')
+
+    def is_stop_requested(self, search_id):
+        with self._lock:
+            entry = self._searches.get(search_id)
+            return bool(entry and entry['stop_requested'])
+
+    def finish(self, search_id):
+        """Drop a search once its final status has been written to the database"""
+        with self._lock:
+            self._searches.pop(search_id, None)
+
+    def __contains__(self, search_id):
+        with self._lock:
+            return search_id in self._searches
+
+
+# Shared by the crawler threads and the request handlers of this process
+live_status = LiveStatusRegistry()
@@ -0,0 +1,101 @@
+"""
+Logging
+Structured logging for the crawler, scrapers, workers and storage.
+
+Records are handed to a queue in the calling thread and written by a
+single listener thread, so crawl threads never block on stdout. Fields set
+with log_context() (search_id, worker, ...) are attached to every record
+emitted by that thread inside the block.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from config import LOG_LEVEL, LOG_FORMAT
+
+_context = threading.local()
+_listener = None
+_configure_lock = threading.Lock()
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'context'}
+
+
+def get_logger(name):
+    """Logger for a module (pass __name__)"""
+    return logging.getLogger(name)
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields to every record logged by the calling thread in this block"""
+    previous = getattr(_context, 'fields', {})
+    _context.fields = {**previous, **fields}
+    try:
+        yield
+    finally:
+        _context.fields = previous
+
+
+class _ContextFilter(logging.Filter):
+    """Captures the emitting thread's context before the record is queued"""
+
+    def filter(self, record):
+        record.context = getattr(_context, 'fields', {})
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    def __init__(self, fmt='text'):
+        super().__init__()
+        self.json = fmt == 'json'
+
+    def format(self, record):
+        fields = dict(getattr(record, 'context', {}))
+        fields.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        timestamp = self.formatTime(record, '%Y-%m-%d %H:%M:%S')
+        if self.json:
+            return json.dumps({
+                'time': timestamp,
+                'level': record.levelname,
+                'logger': record.name,
+                'thread': record.threadName,
+                'message': record.getMessage(),
+                **fields
+            }, default=str)
+        line = f"{timestamp} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def configure_logging(level=None, fmt=None):
+    """
+    Route the app's loggers through a background writer thread
+
+    Safe to call more than once; only the first call installs handlers.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(StructuredFormatter(fmt or LOG_FORMAT))
+
+        records = queue.SimpleQueue()
+        handler = logging.handlers.QueueHandler(records)
+        handler.addFilter(_ContextFilter())
+
+        root = logging.getLogger('app')
+        root.setLevel(level or LOG_LEVEL)
+        root.addHandler(handler)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
@@ -0,0 +1,197 @@
+"""
+Metrics
+Minimal in-process counters, gauges and histograms rendered in the
+Prometheus text exposition format by /metrics (and by worker.py's
+metrics port). Recording is a dict update under a lock, cheap enough for
+the crawl hot path.
+"""
+
+import bisect
+import functools
+import threading
+import time
+
+# Latency buckets in seconds, from cache-hit fast to Selenium slow
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        """Context manager observing the wall time of its block"""
+        return _Timer(self, labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        lines = self._header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+def timed(histogram, **labels):
+    """Decorator observing a function's wall time in histogram"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+
+def render():
+    """All registered metrics in the Prometheus text format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# --- Crawl pipeline ----------------------------------------------------------
+
+SERP_SECONDS = Histogram(
+    'serp_scrape_seconds', 'Search engine / maps / Yelp result scrape time', ['engine', 'search_type'])
+PAGE_FETCH_SECONDS = Histogram(
+    'page_fetch_seconds', 'HTTP page fetch latency (excluding the politeness delay)', ['search_type'])
+PAGE_FETCH_BYTES = Counter(
+    'page_fetch_bytes_total', 'Bytes downloaded by page fetches', ['search_type'])
+PAGE_FETCH_ERRORS = Counter(
+    'page_fetch_errors_total', 'Page fetches that failed', ['search_type'])
+EXTRACTION_CPU_SECONDS = Histogram(
+    'extraction_cpu_seconds', 'CPU time spent extracting contacts and links from a page', ['search_type'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+FETCHES_IN_FLIGHT = Gauge(
+    'crawl_fetches_in_flight', 'Pages being fetched by crawl worker threads')
+SEARCHES_FINISHED = Counter(
+    'searches_finished_total', 'Searches finished by this process', ['search_type', 'status'])
+
+# --- Storage -----------------------------------------------------------------
+
+DB_WRITE_SECONDS = Histogram(
+    'db_write_seconds', 'Database write transaction latency', ['operation'])
+
+# --- Queue and workers -------------------------------------------------------
+
+SEARCH_QUEUE_DEPTH = Gauge('search_queue_depth', 'Searches waiting in the job queue')
+SEARCH_JOBS_RUNNING = Gauge('search_jobs_running', 'Searches claimed by a worker (all processes)')
+WORKER_ACTIVE_SEARCHES = Gauge('worker_active_searches', 'Searches running in this worker process')
+
+# --- Browsers and caches -----------------------------------------------------
+
+CHROME_SESSIONS = Gauge('chrome_sessions_active', 'Open Chrome (Selenium) sessions', ['scraper'])
+CHROME_STARTS = Counter('chrome_sessions_started_total', 'Chrome sessions started', ['scraper'])
+CHROME_STARTUP_SECONDS = Histogram('chrome_startup_seconds', 'Chrome session startup time', ['scraper'])
+CHROME_CHECKOUTS = Counter(
+    'chrome_pool_checkouts_total', 'Browser pool checkouts by result (warm: reused, cold: started)', ['scraper', 'result'])
+CHROME_RECYCLED = Counter('chrome_sessions_closed_total', 'Chrome sessions quit by the browser pool', ['reason'])
+SELENIUM_WAIT_SECONDS = Histogram(
+    'selenium_wait_seconds', 'Selenium scraper waits for page conditions by result (met/timeout)', ['condition', 'result'])
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups by result (hit/miss)', ['cache', 'result'])
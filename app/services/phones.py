@@ -0,0 +1,125 @@
+"""
+Phone Number Normalization
+Turns the phone numbers found by the extractor and the scrapers into a
+canonical E.164 key (+15555555555) for deduplication and a display form.
+
+Numbers without a country code are read in the region PHONE_DEFAULT_REGION
+(its country code and trunk prefix). Extensions are kept in the display
+form only, so a number with and without an extension is one contact.
+"""
+
+import re
+from collections import namedtuple
+from config import PHONE_DEFAULT_REGION
+
+PhoneNumber = namedtuple('PhoneNumber', ['e164', 'display'])
+
+# Region -> (country code, national trunk prefix)
+REGIONS = {
+    'US': ('1', ''), 'CA': ('1', ''),
+    'GB': ('44', '0'), 'IE': ('353', '0'),
+    'AU': ('61', '0'), 'NZ': ('64', '0'),
+    'IN': ('91', '0'), 'PK': ('92', '0'),
+    'DE': ('49', '0'), 'AT': ('43', '0'), 'CH': ('41', '0'),
+    'FR': ('33', '0'), 'BE': ('32', '0'), 'NL': ('31', '0'),
+    'ES': ('34', ''), 'IT': ('39', ''), 'PT': ('351', ''),
+    'SE': ('46', '0'), 'NO': ('47', ''), 'DK': ('45', ''), 'PL': ('48', ''),
+    'RU': ('7', '8'), 'UA': ('380', '0'), 'TR': ('90', '0'),
+    'BR': ('55', '0'), 'MX': ('52', ''), 'AR': ('54', '0'),
+    'ZA': ('27', '0'), 'NG': ('234', '0'), 'AE': ('971', '0'),
+    'SG': ('65', ''), 'JP': ('81', '0'), 'PH': ('63', '0'),
+}
+
+# Every country code is 3 digits except 1, 7 and these
+_TWO_DIGIT_CODES = frozenset(
+    '20 27 30 31 32 33 34 36 39 40 41 43 44 45 46 47 48 49 51 52 53 54 55 56 57 58 '
+    '60 61 62 63 64 65 66 81 82 84 86 90 91 92 93 94 95 98'.split()
+)
+
+_EXTENSION = re.compile(r'\s*(?:ext\.?|extension|x|#)\s*(\d{1,6})\s*$', re.IGNORECASE)
+_NON_DIGITS = re.compile(r'\D')
+
+
+def split_country_code(digits):
+    """(country code, national number) of an international number's digits"""
+    if digits[:1] in ('1', '7'):
+        return digits[:1], digits[1:]
+    if digits[:2] in _TWO_DIGIT_CODES:
+        return digits[:2], digits[2:]
+    return digits[:3], digits[3:]
+
+
+def _group(digits):
+    """Generic grouping: the last four digits, then threes"""
+    groups = [digits[-4:]]
+    digits = digits[:-4]
+    while digits:
+        groups.insert(0, digits[-3:])
+        digits = digits[:-3]
+    return ' '.join(groups)
+
+
+def phone_from_parts(country_code, national, extension=None, region=None):
+    """
+    PhoneNumber from an already split number, or None if it can't be one
+
+    country_code: Digits of the country code, or None for a national number
+    national: Digits of the number without the country code
+    """
+    region_code, trunk = REGIONS.get((region or PHONE_DEFAULT_REGION).upper(), REGIONS['US'])
+    if not country_code:
+        country_code = region_code
+        if country_code == '1' and len(national) == 11 and national.startswith('1'):
+            national = national[1:]
+        elif trunk and national.startswith(trunk):
+            national = national[len(trunk):]
+    elif country_code not in ('1', '39') and national.startswith('0'):
+        # "+44 (0)20 ..." style: the trunk prefix written after the country code
+        # (Italian numbers keep their leading 0)
+        national = national[1:]
+
+    if country_code == '1':
+        # NANP: 10 digits, area code and exchange never start with 0 or 1
+        if len(national) != 10 or national[0] in '01' or national[3] in '01':
+            return None
+    elif not 6 <= len(national) <= 15 - len(country_code):
+        return None
+
+    if country_code == '1':
+        area, exchange, line = national[:3], national[3:6], national[6:]
+        display = f'({area}) {exchange}-{line}' if region_code == '1' else f'+1 {area}-{exchange}-{line}'
+    elif country_code == region_code:
+        display = f'{trunk}{_group(national)}'
+    else:
+        display = f'+{country_code} {_group(national)}'
+    if extension:
+        display += f' x{extension}'
+    return PhoneNumber(f'+{country_code}{national}', display)
+
+
+def normalize_phone(text, region=None):
+    """
+    PhoneNumber for a phone number written any common way ("(555) 555-5555",
+    "+1 555.555.5555 ext 12", "tel:+15555555555", "0044 20 7946 0958"), or
+    None if text isn't one
+    """
+    if not text:
+        return None
+    text = text.strip()
+    if text.lower().startswith('tel:'):
+        text = text[4:]
+
+    extension = None
+    match = _EXTENSION.search(text)
+    if match:
+        extension = match.group(1)
+        text = text[:match.start()]
+
+    digits = _NON_DIGITS.sub('', text)
+    if text.lstrip().startswith('+'):
+        country_code, national = split_country_code(digits)
+    elif digits.startswith('00'):
+        country_code, national = split_country_code(digits[2:])
+    else:
+        country_code, national = None, digits
+    return phone_from_parts(country_code, national, extension, region)
@@ -0,0 +1,175 @@
+"""
+Search Profiling
+On-demand profiling of a single search while it runs in production.
+
+A sampler thread records the stacks of the threads working for the search
+(the crawl thread, which also drives the Selenium scrapers, and the fetch
+threads while they process one of its URLs) as folded stacks, the input
+format of flamegraph.pl, speedscope and most flamegraph viewers.
+tracemalloc runs alongside and reports the source lines holding the most
+memory that was allocated during the search and the peak traced size.
+
+tracemalloc is process-wide: while other searches run in the same worker,
+the peak and the allocations include theirs too (the stack samples don't,
+they cover only the search's threads).
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from config import PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_ALLOCATIONS
+
+# tracemalloc is process-wide; it runs while any profiled search does
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0:
+            if tracemalloc.is_tracing():
+                # Already on (e.g. PYTHONTRACEMALLOC); no other profile's peak to keep
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                _tracemalloc_started = True
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        # Leave it running if it was already on (e.g. PYTHONTRACEMALLOC)
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SearchProfiler:
+    def __init__(self, search_id, interval=PROFILE_SAMPLE_INTERVAL):
+        self.search_id = search_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._threads = {}  # thread ident -> nesting depth of attach()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._sampler = None
+        self._baseline = None
+        self._started = None
+
+    def start(self):
+        _start_tracemalloc()
+        self._baseline = tracemalloc.take_snapshot()
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(
+            target=self._sample_loop, name=f'profiler-{self.search_id}', daemon=True
+        )
+        self._sampler.start()
+
+    def add_thread(self, ident):
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def remove_thread(self, ident):
+        with self._lock:
+            if self._threads.get(ident, 0) > 1:
+                self._threads[ident] -= 1
+            else:
+                self._threads.pop(ident, None)
+
+    def _sample_loop(self):
+        while not self._stopping.wait(self.interval):
+            with self._lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        """Stop sampling and return the profile as a dict"""
+        self._stopping.set()
+        self._sampler.join()
+        duration = time.perf_counter() - self._started
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+        _, peak = tracemalloc.get_traced_memory()
+        _stop_tracemalloc()
+
+        allocations = []
+        for stat in snapshot.compare_to(self._baseline, 'lineno')[:PROFILE_TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            allocations.append({
+                'location': f"{frame.filename}:{frame.lineno}",
+                'size_bytes': stat.size_diff,
+                'blocks': stat.count_diff
+            })
+
+        return {
+            'samples': self.samples,
+            'interval_ms': self.interval * 1000,
+            'duration_s': round(duration, 3),
+            'peak_memory_bytes': peak,
+            'folded': '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common()),
+            'allocations': allocations
+        }
+
+
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles = {}
+
+    def start(self, search_id):
+        """Start profiling a search from its crawl thread"""
+        profile = SearchProfiler(search_id)
+        profile.add_thread(threading.get_ident())
+        with self._lock:
+            self._profiles[search_id] = profile
+        profile.start()
+
+    def finish(self, search_id):
+        """Stop profiling a search and return its profile (None if it wasn't profiled)"""
+        with self._lock:
+            profile = self._profiles.pop(search_id, None)
+        return profile.stop() if profile else None
+
+    @contextmanager
+    def attach(self, search_id):
+        """Sample the calling thread while it works for a profiled search"""
+        with self._lock:
+            profile = self._profiles.get(search_id)
+        if profile is None:
+            yield
+            return
+        ident = threading.get_ident()
+        profile.add_thread(ident)
+        try:
+            yield
+        finally:
+            profile.remove_thread(ident)
+
+
+profiler = Profiler()
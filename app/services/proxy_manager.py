@@ -8,6 +8,9 @@ import requests
 from typing import List, Optional, Dict
 import threading
 import time
+from app.services.log import get_logger
+
+log = get_logger(__name__)
 
 class ProxyManager:
     def __init__(self, proxy_file: str = None, proxy_list: List[str] = None):
@@ -48,11 +51,11 @@ class ProxyManager:
                         lines.append(line)
                 
                 self.load_from_list(lines)
-            print(f"[OK] Loaded {len(self.proxies)} proxies from {filepath}")
+            log.info('Loaded %d proxies from %s', len(self.proxies), filepath)
         except FileNotFoundError:
-            print(f"[WARNING] Proxy file not found: {filepath}")
+            log.warning('Proxy file not found: %s', filepath)
         except Exception as e:
-            print(f"[ERROR] Error loading proxies: {e}")
+            log.error('Error loading proxies: %s', e)
     
     def load_from_list(self, proxy_list: List[str]):
         """
@@ -87,10 +90,10 @@ class ProxyManager:
                     'https': f'http://{username}:{password}@{ip}:{port}'
                 }
             else:
-                print(f"[WARNING] Invalid proxy format: {proxy_str}")
+                log.warning('Invalid proxy format: %s', proxy_str)
                 return None
         except Exception as e:
-            print(f"[ERROR] Error parsing proxy {proxy_str}: {e}")
+            log.error('Error parsing proxy %s: %s', proxy_str, e)
             return None
     
     def get_proxy(self, strategy: str = 'random') -> Optional[Dict[str, str]]:
@@ -107,7 +110,7 @@ class ProxyManager:
             available_proxies = [p for i, p in enumerate(self.proxies) if i not in self.failed_proxies]
             
             if not available_proxies:
-                print("[WARNING] No available proxies")
+                log.warning('No available proxies')
                 return None
             
             if strategy == 'random':
@@ -122,7 +125,7 @@ class ProxyManager:
             try:
                 index = self.proxies.index(proxy)
                 self.failed_proxies.add(index)
-                print(f"[FAIL] Marked proxy as failed: {proxy.get('http', 'unknown')}")
+                log.info('Marked proxy as failed: %s', proxy.get('http', 'unknown'))
             except ValueError:
                 pass
     
@@ -145,11 +148,11 @@ class ProxyManager:
             )
             if response.status_code == 200:
                 ip = response.json().get('origin', 'unknown')
-                print(f"[OK] Proxy validated: {ip}")
+                log.debug('Proxy validated: %s', ip)
                 return True
             return False
         except Exception as e:
-            print(f"[ERROR] Proxy validation failed: {e}")
+            log.debug('Proxy validation failed: %s', e)
             return False
     
     def get_selenium_proxy_config(self, proxy: Dict[str, str]) -> str:
@@ -5,63 +5,45 @@ Uses Selenium browser automation - NO API KEY REQUIRED
 Supports: Google Maps, Bing Maps, and fallback web search for other engines
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-import time
 import validators
-from config import USE_PROXIES, PROXY_LIST_FILE, PROXY_ROTATION_STRATEGY, HEADLESS_MODE
-from app.services.proxy_manager import ProxyManager
+from config import USE_PROXIES, HEADLESS_MODE
+from app.services.phones import normalize_phone
+from app.services.browser_pool import browser_pool
+from app.services.waits import until_present, until_settled, until_text_changes
+from app.services.tracing import tracer
+from app.services.log import get_logger
+
+log = get_logger(__name__)
 
 class MapsScraper:
     def __init__(self, headless=None, use_proxy=None):
-        """Initialize Chrome browser with Selenium"""
+        """Maps scraper driving a Chrome session from the shared browser pool"""
         self.headless = headless if headless is not None else HEADLESS_MODE
         self.use_proxy = use_proxy if use_proxy is not None else USE_PROXIES
         self.driver = None
-        self.proxy_manager = None
+        self.session = None
         self.current_proxy = None
-        
-        # Initialize proxy manager if enabled
-        if self.use_proxy:
-            self.proxy_manager = ProxyManager(proxy_file=PROXY_LIST_FILE)
-            if self.proxy_manager.get_stats()['available'] == 0:
-                print("⚠ No proxies available, disabling proxy support")
-                self.use_proxy = False
     
     def setup_driver(self):
-        """Setup Chrome driver with incognito mode"""
-        chrome_options = Options()
-        
-        # INCOGNITO MODE (Private browsing)
-        chrome_options.add_argument('--incognito')
-        
-        if self.headless:
-            chrome_options.add_argument('--headless')
-        
-        # Additional options for stability
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        # Configure proxy if enabled
-        if self.use_proxy and self.proxy_manager:
-            self.current_proxy = self.proxy_manager.get_proxy(strategy=PROXY_ROTATION_STRATEGY)
-            if self.current_proxy:
-                proxy_string = self.proxy_manager.get_selenium_proxy_config(self.current_proxy)
-                chrome_options.add_argument(f'--proxy-server={proxy_string}')
-                print(f"🔒 Using proxy: {proxy_string}")
-        
-        # Use Selenium's built-in manager (Selenium 4.6+)
-        self.driver = webdriver.Chrome(options=chrome_options)
-        
-        print("✓ Chrome browser initialized (incognito)")
+        """Check out a warm Chrome session (incognito, proxied if enabled) from the browser pool"""
+        self.session = browser_pool.checkout('maps', headless=self.headless, use_proxy=self.use_proxy)
+        self.driver = self.session.driver
+        self.current_proxy = self.session.proxy
+        log.debug('Chrome session checked out for maps (use %d)', self.session.uses)
+    
+    def release_driver(self, failed=False):
+        """Hand the Chrome session back to the pool; in debug mode it stays open until a later search's replaces it"""
+        if self.session:
+            from app.services.settings import SettingsManager
+            debug_mode = SettingsManager.get_setting('debug_mode', False)
+            browser_pool.release(self.session, failed=failed, keep_open=debug_mode)
+            self.session = None
+            if not debug_mode:
+                self.driver = None
     
     def search_maps(self, query, page_count=3, engine='google'):
         """Search maps using the specified engine and extract contact data from business cards"""
-        print(f"\n🗺️  Maps Search Engine: {engine.upper()}")
         
         # Route to appropriate search method based on engine
         if engine.lower() == 'google':
@@ -78,33 +60,31 @@ class MapsScraper:
             self.setup_driver()
         
         results = []  # List of {name, phone, email, source}
+        failed = False
         
         try:
-            print(f"\n{'='*60}")
-            print(f"🗺️  Scraping Google Maps business cards: '{query}'")
-            print(f"📄 Pages to load: {page_count} (~{page_count * 20} businesses)")
-            print(f"{'='*60}\n")
+            log.info("Scraping Google Maps business cards for '%s' (%d pages, ~%d businesses)",
+                     query, page_count, page_count * 20)
             
             # Navigate to Google Maps search (with proper URL encoding)
             from urllib.parse import quote_plus
             encoded_query = quote_plus(query)
             maps_url = f"https://www.google.com/maps/search/{encoded_query}"
-            print(f"🔗 URL: {maps_url}\n")
-            self.driver.get(maps_url)
+            log.debug('URL: %s', maps_url)
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(maps_url)
             
             # Wait for results to load
-            print("⏳ Waiting for results to load...")
-            time.sleep(5)
+            until_present(self.driver, "div[role='feed']", jitter=True)
             
             # Find the scrollable results panel
             try:
                 scrollable_div = self.driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
             except:
-                print("✗ Could not find results panel")
+                log.warning('Could not find the Google Maps results panel')
                 return results
             
             # Scroll to load more businesses based on page_count
-            print(f"\n📜 Scrolling to load {page_count} pages of results...")
             scrolls_per_page = 3
             total_scrolls = page_count * scrolls_per_page
             
@@ -113,17 +93,17 @@ class MapsScraper:
                     'arguments[0].scrollTop = arguments[0].scrollHeight', 
                     scrollable_div
                 )
-                time.sleep(2)  # Wait for new results to load
+                until_settled(self.driver, "a[href*='/maps/place/']")  # Until new results have loaded
                 if (i + 1) % scrolls_per_page == 0:
-                    print(f"  ✓ Loaded page {(i + 1) // scrolls_per_page}/{page_count}")
+                    log.debug('Loaded page %d/%d', (i + 1) // scrolls_per_page, page_count)
             
             # Find all business cards
-            print(f"\n🔍 Finding business cards...")
             business_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/maps/place/']")
-            print(f"✓ Found {len(business_links)} business cards\n")
+            log.info('Found %d business cards', len(business_links))
             
             # Extract contact info from each business card
             processed = 0
+            panel_title = None
             for idx, link in enumerate(business_links):
                 try:
                     # Extract business name from the link first (more reliable)
@@ -141,7 +121,9 @@ class MapsScraper:
                     
                     # Click the business card to open details panel
                     self.driver.execute_script("arguments[0].click();", link)
-                    time.sleep(2)  # Wait for details to load
+                    # Wait for the details panel to show this business, then for its details to load
+                    panel_title = until_text_changes(self.driver, "h1.fontHeadlineLarge, h1.DUwDvf", panel_title) or panel_title
+                    until_settled(self.driver)
                     
                     # If we didn't get name from card, try the details panel
                     if not business_name:
@@ -191,12 +173,9 @@ class MapsScraper:
                                 phone_element = self.driver.find_element(By.CSS_SELECTOR, selector)
                                 phone_text = phone_element.get_attribute('aria-label') or phone_element.text
                                 
-                                # Extract phone using EmailExtractor
-                                from app.services.email_extractor import EmailExtractor
-                                extractor = EmailExtractor()
-                                phones = extractor.extract_phones(phone_text)
-                                if phones:
-                                    phone = phones[0]
+                                # Normalized like the phones found on pages (E.164 key + display form)
+                                phone = normalize_phone(phone_text)
+                                if phone:
                                     break
                             except:
                                 continue
@@ -242,7 +221,8 @@ class MapsScraper:
                     if business_name != f"Business {idx + 1}":  # Only if we got a real name
                         results.append({
                             'name': business_name,
-                            'phone': phone,
+                            'phone': phone.display if phone else None,
+                            'phone_e164': phone.e164 if phone else None,
                             'email': email,
                             'address': address,
                             'website': website,
@@ -250,46 +230,25 @@ class MapsScraper:
                         })
                         processed += 1
                         
-                        status = []
-                        if phone:
-                            status.append(f"📞 {phone}")
-                        if email:
-                            status.append(f"📧 {email}")
-                        if website:
-                            status.append(f"🌐 Website")
-                        if address:
-                            status.append(f"📍 Address")
-                        
-                        print(f"  [{processed}] ✓ {business_name[:40]}")
-                        if status:
-                            print(f"      {' | '.join(status)}")
+                        log.debug('[%d] %s (phone: %s, email: %s, website: %s, address: %s)',
+                                  processed, business_name[:40], phone and phone.display, email, bool(website), bool(address))
                     else:
-                        print(f"  [{idx+1}] ⚠ Skipped - couldn't identify business")
+                        log.debug("[%d] Skipped - couldn't identify business", idx + 1)
 
                 
                 except Exception as e:
-                    print(f"  [{idx+1}] ✗ Error: {str(e)[:50]}")
+                    log.debug('[%d] Error: %s', idx + 1, str(e)[:50])
                     continue
             
-            print(f"\n{'='*60}")
-            print(f"✓ Extracted {len(results)} businesses with contact info")
-            print(f"📞 Phones: {sum(1 for r in results if r['phone'])}")
-            print(f"📧 Emails: {sum(1 for r in results if r['email'])}")
-            print(f"{'='*60}\n")
+            log.info('Extracted %d businesses with contact info (phones: %d, emails: %d)',
+                     len(results), sum(1 for r in results if r['phone']), sum(1 for r in results if r['email']))
         
         except Exception as e:
-            print(f"\n✗ Google Maps scraping error: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception('Google Maps scraping error: %s', e)
+            failed = True
         
         finally:
-            from app.services.settings import SettingsManager
-            debug_mode = SettingsManager.get_setting('debug_mode', False)
-            
-            if self.driver and not debug_mode:
-                self.driver.quit()
-                self.driver = None
-                print("✓ Browser closed\n")
+            self.release_driver(failed)
         
         return results
     
@@ -300,25 +259,22 @@ class MapsScraper:
             self.setup_driver()
         
         websites = []
+        failed = False
         
         try:
-            print(f"\n{'='*60}")
-            print(f"🗺️  Searching Bing Maps for: '{query}'")
-            print(f"{'='*60}\n")
+            log.info("Searching Bing Maps for '%s'", query)
             
             # Navigate to Bing Maps search
             bing_url = f"https://www.bing.com/maps?q={query.replace(' ', '+')}"
-            self.driver.get(bing_url)
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(bing_url)
             
-            print("⏳ Waiting for results to load...")
-            time.sleep(5)
+            until_present(self.driver, ".taskCard, .businessCard", jitter=True)
             
             # Find business listings
-            print("\n🔍 Looking for businesses...")
-            
             # Bing Maps uses different selectors
             business_cards = self.driver.find_elements(By.CSS_SELECTOR, ".taskCard, .businessCard")
-            print(f"✓ Found {len(business_cards)} businesses\n")
+            log.info('Found %d businesses', len(business_cards))
             
             processed = 0
             for idx, card in enumerate(business_cards[:max_results]):
@@ -328,7 +284,7 @@ class MapsScraper:
                 try:
                     # Click business card
                     self.driver.execute_script("arguments[0].click();", card)
-                    time.sleep(2)
+                    until_settled(self.driver)
                     
                     # Look for website link
                     try:
@@ -342,40 +298,28 @@ class MapsScraper:
                                 
                                 from urllib.parse import urlparse
                                 domain = urlparse(website_url).netloc.replace('www.', '')
-                                print(f"  [{processed}/{max_results}] ✓ {domain}")
+                                log.debug('[%d/%d] %s', processed, max_results, domain)
                     except:
-                        print(f"  [{idx+1}] ✗ No website found")
+                        log.debug('[%d] No website found', idx + 1)
                     
                 except Exception as e:
-                    print(f"  [{idx+1}] ✗ Error: {str(e)[:50]}")
+                    log.debug('[%d] Error: %s', idx + 1, str(e)[:50])
                     continue
             
-            print(f"\n{'='*60}")
-            print(f"✓ Extracted {len(websites)} websites from Bing Maps")
-            print(f"{'='*60}\n")
+            log.info('Extracted %d websites from Bing Maps', len(websites))
             
         except Exception as e:
-            print(f"\n✗ Bing Maps scraping error: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception('Bing Maps scraping error: %s', e)
+            failed = True
         
         finally:
-            from app.services.settings import SettingsManager
-            debug_mode = SettingsManager.get_setting('debug_mode', False)
-            
-            if self.driver and not debug_mode:
-                self.driver.quit()
-                self.driver = None
-                print("✓ Browser closed\n")
+            self.release_driver(failed)
         
         return websites
     
     def _search_web_fallback(self, query, max_results=15, engine='duckduckgo'):
         """Fallback to web search for engines without dedicated maps interface"""
-        print(f"\n{'='*60}")
-        print(f"ℹ️  {engine.upper()} doesn't have dedicated maps scraping")
-        print(f"Using web search with location-based query instead")
-        print(f"{'='*60}\n")
+        log.info("%s doesn't have dedicated maps scraping, using web search with the location query", engine)
         
         # Use the existing WebSearchScraper
         try:
@@ -385,19 +329,17 @@ class MapsScraper:
             # Perform web search with the query (already contains location)
             urls = web_scraper.search(query, max_results, engine)
             
-            print(f"\n✓ Found {len(urls)} URLs from {engine.upper()} web search\n")
+            log.info('Found %d URLs from %s web search', len(urls), engine)
             return urls
             
         except Exception as e:
-            print(f"✗ Web fallback error: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception('Web fallback error: %s', e)
             return []
     
     def __del__(self):
-        """Cleanup driver on deletion"""
-        if self.driver:
+        """Return a session still checked out on deletion"""
+        if self.session:
             try:
-                self.driver.quit()
+                browser_pool.release(self.session)
             except:
                 pass
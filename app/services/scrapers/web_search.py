@@ -3,78 +3,42 @@ Web Search Scraper
 Extracts organic search results using Selenium to bypass bot detection
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-import time
 import validators
-import random
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from config import PROXY_LIST_FILE
 from app.services.settings import SettingsManager
-from app.services.proxy_manager import ProxyManager
+from app.services.browser_pool import browser_pool
+from app.services.waits import until_present, until_settled
+from app.services.tracing import tracer
+from app.services.log import get_logger
+
+log = get_logger(__name__)
 
 class WebSearchScraper:
     def __init__(self, headless=None, use_proxy=None):
-        """Initialize Chrome browser with Selenium"""
+        """Search scraper driving a Chrome session from the shared browser pool"""
         settings = SettingsManager.get_all()
         
         self.headless = headless if headless is not None else settings.get('headless_mode', True)
         self.use_proxy = use_proxy if use_proxy is not None else settings.get('use_proxies', True)
         self.driver = None
-        self.proxy_manager = None
+        self.session = None
         self.current_proxy = None
-        
-        # Initialize proxy manager if enabled
-        if self.use_proxy:
-            self.proxy_manager = ProxyManager(proxy_file=PROXY_LIST_FILE)
-            if self.proxy_manager.get_stats()['available'] == 0:
-                print("⚠ No proxies available, disabling proxy support")
-                self.use_proxy = False
     
     def setup_driver(self):
-        """Setup Chrome driver with incognito mode"""
-        chrome_options = Options()
-        
-        # INCOGNITO MODE (Private browsing)
-        chrome_options.add_argument('--incognito')
-        
-        if self.headless:
-            chrome_options.add_argument('--headless')
-        
-        # Anti-detection options
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        
-        # Randomize User-Agent to mimic different devices/browsers
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15'
-        ]
-        user_agent = random.choice(user_agents)
-        chrome_options.add_argument(f'--user-agent={user_agent}')
-        
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        
-        # Configure proxy if enabled
-        if self.use_proxy and self.proxy_manager:
-            strategy = SettingsManager.get_setting('proxy_rotation_strategy', 'random')
-            self.current_proxy = self.proxy_manager.get_proxy(strategy=strategy)
-            if self.current_proxy:
-                proxy_string = self.proxy_manager.get_selenium_proxy_config(self.current_proxy)
-                chrome_options.add_argument(f'--proxy-server={proxy_string}')
-                print(f"🔒 Using proxy: {proxy_string}")
-        
-        # Use Selenium's built-in manager (Selenium 4.6+)
-        self.driver = webdriver.Chrome(options=chrome_options)
-        
-        print("✓ Chrome browser initialized for Web Search (incognito)")
+        """Check out a warm Chrome session (incognito, proxied if enabled) from the browser pool"""
+        self.session = browser_pool.checkout('web_search', headless=self.headless, use_proxy=self.use_proxy)
+        self.driver = self.session.driver
+        self.current_proxy = self.session.proxy
+        log.debug('Chrome session checked out for web search (use %d)', self.session.uses)
+    
+    def release_driver(self, failed=False):
+        """Hand the Chrome session back to the pool; in debug mode it stays open until a later search's replaces it"""
+        if self.session:
+            debug_mode = SettingsManager.get_setting('debug_mode', False)
+            browser_pool.release(self.session, failed=failed, keep_open=debug_mode)
+            self.session = None
+            if not debug_mode:
+                self.driver = None
     
     def search(self, query, max_results=20, engine='duckduckgo'):
         """Main search method - dispatches to specific engine"""
@@ -100,30 +64,26 @@ class WebSearchScraper:
             self.setup_driver()
         
         links = []
+        failed = False
         
         try:
-            print(f"\n{'='*60}")
-            print(f"🦆 Searching DuckDuckGo for: '{query}'")
-            print(f"{'='*60}\n")
+            log.info("Searching DuckDuckGo for '%s'", query)
             
             # Navigate to DuckDuckGo
-            self.driver.get(f"https://duckduckgo.com/?q={query.replace(' ', '+')}&t=h_&ia=web")
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(f"https://duckduckgo.com/?q={query.replace(' ', '+')}&t=h_&ia=web")
             
-            # Wait for results to load (up to 15 seconds)
-            print("⏳ Waiting for results to load...")
-            try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.react-results--main, div#links, div.results"))
-                )
-                print("✓ Results container loaded")
-            except Exception as e:
-                print(f"⚠ Timeout waiting for results: {e}")
+            # Wait for results to load (up to SELENIUM_WAIT_TIMEOUT seconds)
+            if until_present(self.driver, "div.react-results--main, div#links, div.results", jitter=True):
+                log.debug('Results container loaded')
+            else:
+                log.warning('Timeout waiting for results')
             
             # Scroll to load more results
             last_height = self.driver.execute_script("return document.body.scrollHeight")
             for i in range(3):
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2) # Allow time for dynamic content to load
+                until_settled(self.driver)  # Until dynamic content has loaded
                 new_height = self.driver.execute_script("return document.body.scrollHeight")
                 if new_height == last_height:
                     break
@@ -143,10 +103,10 @@ class WebSearchScraper:
                 try:
                     elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     if elements:
-                        print(f"Found {len(elements)} elements with selector: {selector}")
+                        log.debug('Found %d elements with selector: %s', len(elements), selector)
                         results.extend(elements)
                 except Exception as e:
-                    print(f"Selector {selector} failed: {e}")
+                    log.debug('Selector %s failed: %s', selector, e)
             
             # Deduplicate elements based on href
             unique_results = []
@@ -160,7 +120,7 @@ class WebSearchScraper:
                 except:
                     pass
             
-            print(f"Found {len(unique_results)} unique potential results...")
+            log.debug('Found %d unique potential results', len(unique_results))
             
             for a in unique_results:
                 try:
@@ -179,7 +139,7 @@ class WebSearchScraper:
                     if validators.url(href) and href.startswith('http'):
                         if href not in links:
                             links.append(href)
-                            print(f"  [OK] Found: {href[:80]}")
+                            log.debug('Found: %s', href[:80])
                             
                     if len(links) >= max_results:
                         break
@@ -187,19 +147,14 @@ class WebSearchScraper:
                 except Exception as e:
                     continue
             
-            print(f"\n[OK] Extracted {len(links)} organic results from DuckDuckGo")
+            log.info('Extracted %d organic results from DuckDuckGo', len(links))
             
         except Exception as e:
-            print(f"DuckDuckGo search error: {e}")
+            log.error('DuckDuckGo search error: %s', e)
+            failed = True
         
         finally:
-            if self.driver:
-                debug_mode = SettingsManager.get_setting('debug_mode', False)
-                if not debug_mode:
-                    self.driver.quit()
-                    self.driver = None
-                else:
-                    print("Debug Mode: Browser left open. Close manually.")
+            self.release_driver(failed)
                 
         return links
 
@@ -209,37 +164,33 @@ class WebSearchScraper:
             self.setup_driver()
         
         links = []
+        failed = False
         
         try:
-            print(f"\n{'='*60}")
-            print(f"🔍 Searching Google for: '{query}'")
-            print(f"{'='*60}\n")
+            log.info("Searching Google for '%s'", query)
             
             # Navigate to Google
-            self.driver.get(f"https://www.google.com/search?q={query.replace(' ', '+')}&num={max_results+10}")
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(f"https://www.google.com/search?q={query.replace(' ', '+')}&num={max_results+10}")
             
             # Wait for results
-            print("⏳ Waiting for results to load...")
-            try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div#search, div#rso"))
-                )
-                print("✓ Results container loaded")
-            except Exception as e:
-                print(f"⚠ Timeout waiting for results: {e}")
+            if until_present(self.driver, "div#search, div#rso", jitter=True):
+                log.debug('Results container loaded')
+            else:
+                log.warning('Timeout waiting for results')
             
             # Handle cookie consent if present (basic attempt)
             try:
                 consent_buttons = self.driver.find_elements(By.XPATH, "//button[contains(text(), 'Accept all') or contains(text(), 'I agree')]")
                 if consent_buttons:
                     consent_buttons[0].click()
-                    time.sleep(2)
+                    until_settled(self.driver)
             except:
                 pass
             
             # Scroll a bit
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(1)
+            until_settled(self.driver, "div.g")
             
             # Find results - Google selectors
             # Google changes selectors often, so we try multiple common ones
@@ -255,7 +206,7 @@ class WebSearchScraper:
             for selector in selectors:
                 elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                 if elements:
-                    print(f"Found {len(elements)} elements with selector: {selector}")
+                    log.debug('Found %d elements with selector: %s', len(elements), selector)
                     # Filter elements that have h3 child (usually the title) to avoid random links
                     valid_elements = []
                     for el in elements:
@@ -267,7 +218,7 @@ class WebSearchScraper:
                     
                     results.extend(valid_elements)
             
-            print(f"Found {len(results)} potential results...")
+            log.debug('Found %d potential results', len(results))
             
             for a in results:
                 try:
@@ -284,7 +235,7 @@ class WebSearchScraper:
                     if validators.url(href) and href.startswith('http'):
                         if href not in links:
                             links.append(href)
-                            print(f"  ✓ Found: {href}")
+                            log.debug('Found: %s', href)
                             
                     if len(links) >= max_results:
                         break
@@ -292,19 +243,14 @@ class WebSearchScraper:
                 except Exception as e:
                     continue
             
-            print(f"\n✓ Extracted {len(links)} organic results from Google")
+            log.info('Extracted %d organic results from Google', len(links))
             
         except Exception as e:
-            print(f"Google search error: {e}")
+            log.error('Google search error: %s', e)
+            failed = True
         
         finally:
-            if self.driver:
-                debug_mode = SettingsManager.get_setting('debug_mode', False)
-                if not debug_mode:
-                    self.driver.quit()
-                    self.driver = None
-                else:
-                    print("Debug Mode: Browser left open. Close manually.")
+            self.release_driver(failed)
                 
         return links
 
@@ -314,21 +260,21 @@ class WebSearchScraper:
             self.setup_driver()
         
         links = []
+        failed = False
         
         try:
-            print(f"\n{'='*60}")
-            print(f"🅱️ Searching Bing for: '{query}'")
-            print(f"{'='*60}\n")
+            log.info("Searching Bing for '%s'", query)
             
             # Navigate to Bing
-            self.driver.get(f"https://www.bing.com/search?q={query.replace(' ', '+')}")
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(f"https://www.bing.com/search?q={query.replace(' ', '+')}")
             
             # Wait for results
-            time.sleep(random.uniform(3, 5))
+            until_present(self.driver, "li.b_algo", jitter=True)
             
             # Scroll
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            until_settled(self.driver, "li.b_algo")
             
             # Find results - Bing selectors
             selectors = [
@@ -340,12 +286,12 @@ class WebSearchScraper:
             for selector in selectors:
                 elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                 if elements:
-                    print(f"Found {len(elements)} elements with selector: {selector}")
+                    log.debug('Found %d elements with selector: %s', len(elements), selector)
                     results.extend(elements)
                     if len(results) >= max_results:
                         break
             
-            print(f"Found {len(results)} potential results...")
+            log.debug('Found %d potential results', len(results))
             
             for a in results:
                 try:
@@ -362,7 +308,7 @@ class WebSearchScraper:
                     if validators.url(href) and href.startswith('http'):
                         if href not in links:
                             links.append(href)
-                            print(f"  ✓ Found: {href}")
+                            log.debug('Found: %s', href)
                             
                     if len(links) >= max_results:
                         break
@@ -370,19 +316,14 @@ class WebSearchScraper:
                 except Exception as e:
                     continue
             
-            print(f"\n✓ Extracted {len(links)} organic results from Bing")
+            log.info('Extracted %d organic results from Bing', len(links))
             
         except Exception as e:
-            print(f"Bing search error: {e}")
+            log.error('Bing search error: %s', e)
+            failed = True
         
         finally:
-            if self.driver:
-                debug_mode = SettingsManager.get_setting('debug_mode', False)
-                if not debug_mode:
-                    self.driver.quit()
-                    self.driver = None
-                else:
-                    print("Debug Mode: Browser left open. Close manually.")
+            self.release_driver(failed)
                 
         return links
 
@@ -392,17 +333,17 @@ class WebSearchScraper:
             self.setup_driver()
         
         links = []
+        failed = False
         
         try:
-            print(f"\n{'='*60}")
-            print(f"🟣 Searching Yahoo for: '{query}'")
-            print(f"{'='*60}\n")
+            log.info("Searching Yahoo for '%s'", query)
             
-            self.driver.get(f"https://search.yahoo.com/search?p={query.replace(' ', '+')}")
-            time.sleep(random.uniform(3, 5))
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(f"https://search.yahoo.com/search?p={query.replace(' ', '+')}")
+            until_present(self.driver, "div.dd.algo", jitter=True)
             
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            until_settled(self.driver, "div.dd.algo")
             
             # Yahoo uses different selectors
             results = self.driver.find_elements(By.CSS_SELECTOR, "div.dd.algo a")
@@ -417,19 +358,14 @@ class WebSearchScraper:
                 except:
                     continue
             
-            print(f"\n✓ Extracted {len(links)} organic results from Yahoo")
+            log.info('Extracted %d organic results from Yahoo', len(links))
             
         except Exception as e:
-            print(f"Yahoo search error: {e}")
+            log.error('Yahoo search error: %s', e)
+            failed = True
         
         finally:
-            if self.driver:
-                debug_mode = SettingsManager.get_setting('debug_mode', False)
-                if not debug_mode:
-                    self.driver.quit()
-                    self.driver = None
-                else:
-                    print("🐞 Debug Mode: Browser left open for inspection")
+            self.release_driver(failed)
                 
         return links
 
@@ -439,17 +375,17 @@ class WebSearchScraper:
             self.setup_driver()
         
         links = []
+        failed = False
         
         try:
-            print(f"\n{'='*60}")
-            print(f"🟥 Searching Yandex for: '{query}'")
-            print(f"{'='*60}\n")
+            log.info("Searching Yandex for '%s'", query)
             
-            self.driver.get(f"https://yandex.com/search/?text={query.replace(' ', '+')}")
-            time.sleep(random.uniform(3, 5))
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(f"https://yandex.com/search/?text={query.replace(' ', '+')}")
+            until_present(self.driver, "li.serp-item", jitter=True)
             
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            until_settled(self.driver, "li.serp-item")
             
             results = self.driver.find_elements(By.CSS_SELECTOR, "li.serp-item a.OrganicTitle-Link")
             
@@ -463,19 +399,14 @@ class WebSearchScraper:
                 except:
                     continue
             
-            print(f"\n✓ Extracted {len(links)} organic results from Yandex")
+            log.info('Extracted %d organic results from Yandex', len(links))
             
         except Exception as e:
-            print(f"Yandex search error: {e}")
+            log.error('Yandex search error: %s', e)
+            failed = True
         
         finally:
-            if self.driver:
-                debug_mode = SettingsManager.get_setting('debug_mode', False)
-                if not debug_mode:
-                    self.driver.quit()
-                    self.driver = None
-                else:
-                    print("🐞 Debug Mode: Browser left open for inspection")
+            self.release_driver(failed)
                 
         return links
 
@@ -485,17 +416,17 @@ class WebSearchScraper:
             self.setup_driver()
         
         links = []
+        failed = False
         
         try:
-            print(f"\n{'='*60}")
-            print(f"🦁 Searching Brave for: '{query}'")
-            print(f"{'='*60}\n")
+            log.info("Searching Brave for '%s'", query)
             
-            self.driver.get(f"https://search.brave.com/search?q={query.replace(' ', '+')}")
-            time.sleep(random.uniform(3, 5))
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(f"https://search.brave.com/search?q={query.replace(' ', '+')}")
+            until_present(self.driver, "div.snippet", jitter=True)
             
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            until_settled(self.driver, "div.snippet")
             
             results = self.driver.find_elements(By.CSS_SELECTOR, "div.snippet a")
             
@@ -509,19 +440,14 @@ class WebSearchScraper:
                 except:
                     continue
             
-            print(f"\n✓ Extracted {len(links)} organic results from Brave")
+            log.info('Extracted %d organic results from Brave', len(links))
             
         except Exception as e:
-            print(f"Brave search error: {e}")
+            log.error('Brave search error: %s', e)
+            failed = True
         
         finally:
-            if self.driver:
-                debug_mode = SettingsManager.get_setting('debug_mode', False)
-                if not debug_mode:
-                    self.driver.quit()
-                    self.driver = None
-                else:
-                    print("🐞 Debug Mode: Browser left open for inspection")
+            self.release_driver(failed)
                 
         return links
 
@@ -531,17 +457,17 @@ class WebSearchScraper:
             self.setup_driver()
         
         links = []
+        failed = False
         
         try:
-            print(f"\n{'='*60}")
-            print(f"🌱 Searching Ecosia for: '{query}'")
-            print(f"{'='*60}\n")
+            log.info("Searching Ecosia for '%s'", query)
             
-            self.driver.get(f"https://www.ecosia.org/search?q={query.replace(' ', '+')}")
-            time.sleep(random.uniform(3, 5))
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(f"https://www.ecosia.org/search?q={query.replace(' ', '+')}")
+            until_present(self.driver, "a.result__link", jitter=True)
             
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            until_settled(self.driver, "a.result__link")
             
             results = self.driver.find_elements(By.CSS_SELECTOR, "a.result__link")
             
@@ -555,18 +481,13 @@ class WebSearchScraper:
                 except:
                     continue
             
-            print(f"\n✓ Extracted {len(links)} organic results from Ecosia")
+            log.info('Extracted %d organic results from Ecosia', len(links))
             
         except Exception as e:
-            print(f"Ecosia search error: {e}")
+            log.error('Ecosia search error: %s', e)
+            failed = True
         
         finally:
-            if self.driver:
-                debug_mode = SettingsManager.get_setting('debug_mode', False)
-                if not debug_mode:
-                    self.driver.quit()
-                    self.driver = None
-                else:
-                    print("🐞 Debug Mode: Browser left open for inspection")
+            self.release_driver(failed)
                 
         return links
@@ -3,58 +3,31 @@ Yelp Scraper for Email Extractor Pro
 Extracts structured business data from Yelp search results
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from bs4 import BeautifulSoup
-import time
-import re
 import os
+import random
 from urllib.parse import quote_plus
+from app.services.phones import normalize_phone
+from app.services.browser_pool import browser_pool
+from app.services.waits import until_present, until_settled
+from app.services.tracing import tracer
+from app.services.log import get_logger
+
+log = get_logger(__name__)
 
 
 class YelpScraper:
     def __init__(self, headless=True):
         self.headless = headless
         self.driver = None
+        self.session = None
         
     def _init_driver(self):
-        """Initialize Chrome with incognito mode"""
-        options = Options()
-        
-        # INCOGNITO MODE (Private browsing)
-        options.add_argument('--incognito')
-        
-        # Anti-detection settings
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        # Privacy & stealth
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-notifications')
-        options.add_argument('--disable-popup-blocking')
-        options.add_argument('--start-maximized')
-        options.add_argument('--lang=en-US')
-        
-        # User agent
-        from config import USER_AGENT
-        options.add_argument(f'user-agent={USER_AGENT}')
-        
-        if self.headless:
-            options.add_argument('--headless=new')
-        
-        print("🔓 Initializing Chrome in INCOGNITO mode...")
-        
-        # Use Selenium's built-in driver manager (Selenium 4.6+)
-        try:
-            self.driver = webdriver.Chrome(options=options)
-            print("✅ Chrome initialized successfully (incognito)")
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            raise
+        """Check out a warm Chrome session (incognito) from the browser pool"""
+        self.session = browser_pool.checkout('yelp', headless=self.headless)
+        self.driver = self.session.driver
+        log.debug('Chrome session checked out for Yelp (use %d)', self.session.uses)
 
         
     def search(self, query, max_results=20):
@@ -68,6 +41,7 @@ class YelpScraper:
         Returns:
             List of dictionaries with business data
         """
+        failed = False
         try:
             if not self.driver:
                 self._init_driver()
@@ -86,20 +60,20 @@ class YelpScraper:
             encoded_location = quote_plus(location)
             url = f"https://www.yelp.com/search?find_desc={encoded_query}&find_loc={encoded_location}"
             
-            print(f"🔍 Yelp URL: {url}")
-            self.driver.get(url)
+            log.info('Yelp URL: %s', url)
+            with tracer.span('selenium_get', 'selenium'):
+                self.driver.get(url)
             
-            # Random delay to appear human
-            import random
-            time.sleep(random.uniform(3, 6))
+            # Wait for the results (at least a random delay, to appear human)
+            until_present(self.driver, 'a[href*="/biz/"]', jitter=True)
             
-            # Scroll to load more results (with human-like pauses)
+            # Scroll to load more results
             for i in range(3):
                 # Random scroll amount (not always to bottom)
                 scroll_amount = random.randint(800, 1200)
                 self.driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
-                time.sleep(random.uniform(1.5, 3.5))
-                print(f"   Scrolled {i+1}/3 times...")
+                until_settled(self.driver, 'a[href*="/biz/"]')
+                log.debug('Scrolled %d/3 times', i + 1)
 
             
             # Find all business links
@@ -120,23 +94,26 @@ class YelpScraper:
                             if len(business_links) >= max_results:
                                 break
                 
-                print(f"✓ Found {len(business_links)} unique business links")
+                log.info('Found %d unique business links', len(business_links))
             except Exception as e:
-                print(f"Error finding business links: {e}")
+                log.warning('Error finding business links: %s', e)
             
             # Visit each business page and extract data
             results = []
             for idx, business_url in enumerate(business_links[:max_results]):
                 try:
-                    print(f"\n[{idx+1}/{len(business_links)}] Visiting: {business_url}")
-                    self.driver.get(business_url)
+                    log.debug('[%d/%d] Visiting: %s', idx + 1, len(business_links), business_url)
+                    with tracer.span('selenium_get', 'selenium'):
+                        self.driver.get(business_url)
                     
-                    # Human-like delay
-                    time.sleep(random.uniform(2, 4))
+                    # Wait for the page (at least a human-like delay) and its contact details
+                    until_present(self.driver, 'h1', jitter=True)
+                    until_settled(self.driver)
                     
                     business_data = {
                         'name': None,
                         'phone': None,
+                        'phone_e164': None,
                         'address': None,
                         'website': None
                     }
@@ -151,10 +128,10 @@ class YelpScraper:
                     # Extract Phone
                     try:
                         phone_elem = self.driver.find_element(By.CSS_SELECTOR, '[href^="tel:"]')
-                        phone_text = phone_elem.text or phone_elem.get_attribute('href').replace('tel:', '')
-                        phone_match = re.search(r'\(?\d{3}\)?\s*-?\s*\d{3}\s*-?\s*\d{4}', phone_text)
-                        if phone_match:
-                            business_data['phone'] = phone_match.group()
+                        phone = normalize_phone(phone_elem.text) or normalize_phone(phone_elem.get_attribute('href'))
+                        if phone:
+                            business_data['phone'] = phone.display
+                            business_data['phone_e164'] = phone.e164
                     except:
                         pass
                     
@@ -191,24 +168,21 @@ class YelpScraper:
                         pass
                     
                     results.append(business_data)
-                    print(f"   ✓ {business_data['name']}")
-                    print(f"     📞 {business_data['phone']}")
-                    print(f"     📍 {business_data['address']}")
-                    print(f"     🌐 {business_data['website']}")
+                    log.debug('%s (phone: %s, address: %s, website: %s)', business_data['name'],
+                              business_data['phone'], business_data['address'], business_data['website'])
                     
                 except Exception as e:
-                    print(f"   ✗ Error extracting business #{idx+1}: {e}")
+                    log.debug('Error extracting business #%d: %s', idx + 1, e)
                     continue
             
             return results
             
         except Exception as e:
-            print(f"Yelp scraper error: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception('Yelp scraper error: %s', e)
+            failed = True
             return []
         finally:
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
+            if self.session:
+                browser_pool.release(self.session, failed=failed)
+                self.session = self.driver = None
 
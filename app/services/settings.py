@@ -1,5 +1,8 @@
 import json
 import os
+from app.services.log import get_logger
+
+log = get_logger(__name__)
 
 SETTINGS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'settings.json')
 
@@ -14,7 +17,7 @@ class SettingsManager:
             with open(SETTINGS_FILE, 'r') as f:
                 cls._settings = json.load(f)
         except Exception as e:
-            print(f"Error loading settings: {e}")
+            log.error('Error loading settings: %s', e)
             cls._settings = {}
         return cls._settings
 
@@ -37,7 +40,7 @@ class SettingsManager:
             with open(SETTINGS_FILE, 'w') as f:
                 json.dump(cls._settings, f, indent=4)
         except Exception as e:
-            print(f"Error saving settings: {e}")
+            log.error('Error saving settings: %s', e)
 
     @classmethod
     def get_all(cls):
@@ -0,0 +1,121 @@
+"""
+Search Tracing
+Lightweight per-search spans (SERP, fetches, sleeps, extraction, database
+calls, Selenium navigation). Spans are buffered in memory while a search
+runs and stored with it when it finishes, for /api/trace/<id>.
+
+A thread records into a search's trace only while that search is active
+on it (tracer.start in the crawl thread, tracer.activate in fetch
+workers); everywhere else span() is a no-op.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from config import TRACING_ENABLED, TRACE_MAX_SPANS
+
+
+class SearchTrace:
+    def __init__(self, search_id):
+        self.search_id = search_id
+        self.started = time.perf_counter()
+        self.spans = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, name, category, start, end, detail=None):
+        span = {
+            'name': name,
+            'category': category,
+            'start_ms': round((start - self.started) * 1000, 3),
+            'duration_ms': round((end - start) * 1000, 3),
+            'thread': threading.current_thread().name,
+            'detail': detail
+        }
+        with self._lock:
+            if len(self.spans) < TRACE_MAX_SPANS:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    def snapshot(self):
+        """A copy of the spans recorded so far and the count of dropped ones"""
+        with self._lock:
+            return list(self.spans), self.dropped
+
+
+class Tracer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._traces = {}
+        self._local = threading.local()
+
+    def start(self, search_id):
+        """Begin a search's trace and activate it on the calling thread"""
+        if not TRACING_ENABLED:
+            return
+        with self._lock:
+            self._traces[search_id] = SearchTrace(search_id)
+        self._local.trace = self._traces[search_id]
+
+    def finish(self, search_id):
+        """End a search's trace and return it (None if it wasn't traced)"""
+        with self._lock:
+            trace = self._traces.pop(search_id, None)
+        if getattr(self._local, 'trace', None) is trace:
+            self._local.trace = None
+        return trace
+
+    def get(self, search_id):
+        """The in-progress trace of a search running in this process"""
+        with self._lock:
+            return self._traces.get(search_id)
+
+    @contextmanager
+    def activate(self, search_id):
+        """Record spans of the calling thread into a search's trace"""
+        with self._lock:
+            trace = self._traces.get(search_id)
+        previous = getattr(self._local, 'trace', None)
+        self._local.trace = trace
+        try:
+            yield
+        finally:
+            self._local.trace = previous
+
+    @contextmanager
+    def span(self, name, category, detail=None):
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            trace.add(name, category, start, time.perf_counter(), detail)
+
+
+tracer = Tracer()
+
+
+def trace_methods(category, exclude=()):
+    """Class decorator recording a span around every public method"""
+    def decorate(cls):
+        for name, func in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not callable(func):
+                continue
+            setattr(cls, name, _traced(func, f"{cls.__name__}.{name}", category))
+        return cls
+    return decorate
+
+
+def _traced(func, span_name, category):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(tracer._local, 'trace', None) is None:
+            return func(*args, **kwargs)
+        with tracer.span(span_name, category):
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,152 @@
+"""
+Selenium Waits
+Condition-based waits for the Selenium scrapers, in place of fixed sleeps.
+
+A scraper waits for what it needs next - its results present, a clicked
+panel showing the new business, the page settled after a scroll (no DOM
+changes and no requests in flight) - and goes on as soon as that holds. A
+wait that times out is not an error: the scraper carries on with what the
+page has, as it did after a fixed sleep.
+
+Page loads can take a jitter floor (SELENIUM_JITTER_FLOOR): the wait lasts
+at least a random minimum even when the page is ready sooner, so request
+timing doesn't look scripted. The condition is still checked meanwhile; the
+floor only keeps the wait from ending earlier.
+"""
+
+import random
+import time
+from selenium.webdriver.common.by import By
+from config import (
+    SELENIUM_WAIT_TIMEOUT, SELENIUM_SETTLE_TIMEOUT, SELENIUM_SETTLE_TIME,
+    SELENIUM_POLL_INTERVAL, SELENIUM_JITTER_FLOOR
+)
+from app.services.metrics import SELENIUM_WAIT_SECONDS
+from app.services.tracing import tracer
+from app.services.log import get_logger
+
+log = get_logger(__name__)
+
+# Counts the page's fetch/XHR requests in flight (installed once per document)
+# and returns what settled() compares between polls:
+# [loaded, requests in flight, resources loaded, DOM nodes, matches of the selector]
+_SNAPSHOT = """
+if (window.__pendingRequests === undefined) {
+    window.__pendingRequests = 0;
+    const done = () => { window.__pendingRequests = Math.max(0, window.__pendingRequests - 1); };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            window.__pendingRequests++;
+            return fetch.apply(this, arguments).finally(done);
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+    if (performance.setResourceTimingBufferSize) {
+        performance.setResourceTimingBufferSize(100000);
+    }
+}
+const selector = arguments[0];
+return [document.readyState === 'complete', window.__pendingRequests,
+        performance.getEntriesByType('resource').length,
+        document.getElementsByTagName('*').length,
+        selector ? document.querySelectorAll(selector).length : 0];
+"""
+
+# A page whose requests never stop (analytics, long polling) counts as
+# settled once its DOM has been quiet this many times SELENIUM_SETTLE_TIME
+BUSY_SETTLE_FACTOR = 3
+
+
+def wait_for(driver, condition, timeout=None, jitter=False, name='condition'):
+    """
+    Poll condition(driver) until it returns something other than None and
+    return that; None if it still hasn't after timeout seconds
+
+    jitter: Last at least a random time of SELENIUM_JITTER_FLOOR even if
+        the condition holds sooner (for page loads)
+    name: Metrics and trace label of the condition
+    """
+    timeout = timeout if timeout is not None else SELENIUM_WAIT_TIMEOUT
+    floor = random.uniform(*SELENIUM_JITTER_FLOOR) if jitter and SELENIUM_JITTER_FLOOR else 0
+    start = time.monotonic()
+    result = None
+    with tracer.span('selenium_wait', 'selenium', detail=name):
+        while True:
+            try:
+                result = condition(driver)
+            except Exception as e:
+                # Stale elements, a page still navigating: not there yet
+                log.debug('Wait for %s: %s', name, e)
+            elapsed = time.monotonic() - start
+            if result is not None or elapsed >= timeout:
+                break
+            time.sleep(min(SELENIUM_POLL_INTERVAL, timeout - elapsed))
+        if floor > elapsed:
+            time.sleep(floor - elapsed)
+    SELENIUM_WAIT_SECONDS.observe(time.monotonic() - start, condition=name,
+                                  result='timeout' if result is None else 'met')
+    if result is None:
+        log.debug('Gave up waiting for %s after %ss', name, timeout)
+    return result
+
+
+def present(selector):
+    """Condition: the elements matching a CSS selector, once there are any"""
+    def condition(driver):
+        return driver.find_elements(By.CSS_SELECTOR, selector) or None
+    return condition
+
+
+def text_changed(selector, previous):
+    """Condition: the text of the first element matching selector, once it is set and differs from previous"""
+    def condition(driver):
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        text = elements[0].text.strip() if elements else ''
+        return text if text and text != previous else None
+    return condition
+
+
+def settled(selector=None, settle=None):
+    """
+    Condition: the page has stopped changing - loaded, no DOM changes and
+    no fetch/XHR in flight for settle seconds (SELENIUM_SETTLE_TIME) - and
+    then the number of elements matching selector (0 without one)
+    """
+    settle = settle if settle is not None else SELENIUM_SETTLE_TIME
+    state = {'dom': None, 'resources': None, 'changed': 0.0, 'requested': 0.0}
+
+    def condition(driver):
+        loaded, pending, resources, nodes, count = driver.execute_script(_SNAPSHOT, selector)
+        now = time.monotonic()
+        if not loaded or (nodes, count) != state['dom']:
+            state['dom'], state['changed'] = (nodes, count), now
+        if pending or resources != state['resources']:
+            state['resources'], state['requested'] = resources, now
+        quiet = now - state['changed']
+        if quiet >= settle and (now - state['requested'] >= settle or quiet >= settle * BUSY_SETTLE_FACTOR):
+            return count
+        return None
+    return condition
+
+
+def until_present(driver, selector, timeout=None, jitter=False):
+    """The elements matching a CSS selector once any appear ([] on timeout)"""
+    return wait_for(driver, present(selector), timeout, jitter, 'present') or []
+
+
+def until_text_changes(driver, selector, previous, timeout=None):
+    """The new text of the element matching selector (None on timeout)"""
+    timeout = timeout if timeout is not None else SELENIUM_SETTLE_TIMEOUT
+    return wait_for(driver, text_changed(selector, previous), timeout, name='text_changed')
+
+
+def until_settled(driver, selector=None, timeout=None):
+    """Wait for the page to settle after a scroll or click; the matches of selector then (None on timeout)"""
+    timeout = timeout if timeout is not None else SELENIUM_SETTLE_TIMEOUT
+    return wait_for(driver, settled(selector), timeout, name='settled')
@@ -0,0 +1,161 @@
+"""
+Search Worker
+Claims queued searches from the search_jobs table and runs them with a
+bounded number of concurrent crawls. Runs as its own process (worker.py)
+or embedded in the development server (run.py).
+"""
+
+import os
+import socket
+import threading
+import time
+import concurrent.futures
+from collections import OrderedDict
+from config import (
+    MAX_CONCURRENT_SEARCHES, MAX_RUNNING_PER_CLIENT, MAX_RUNNING_PER_BATCH,
+    JOB_POLL_INTERVAL, JOB_HEARTBEAT_INTERVAL, JOB_STALE_AFTER, JOB_REQUEUE_INTERVAL,
+    BATCH_PAGE_CACHE_SIZE, BATCH_CACHES_PER_WORKER, CHROME_POOL_WARM_SESSIONS
+)
+from app.database import Database
+from app.services.batch import BatchFetchCache
+from app.services.live_status import live_status
+from app.services.events import event_bus
+from app.services.metrics import WORKER_ACTIVE_SEARCHES
+from app.services.log import get_logger, log_context
+
+log = get_logger(__name__)
+
+
+class SearchWorker:
+    def __init__(self, concurrency=None, worker_id=None, db=None, crawler=None):
+        self.concurrency = concurrency or MAX_CONCURRENT_SEARCHES
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.db = db or Database()
+        self._crawler = crawler
+        self._running = {}  # job_id -> (search_id, future)
+        self._batch_caches = OrderedDict()  # batch_id -> BatchFetchCache
+        self._batch_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    @property
+    def crawler(self):
+        if self._crawler is None:
+            # Built on first job: WebCrawler sets up the Selenium-backed scrapers
+            from app.services.crawler import WebCrawler
+            self._crawler = WebCrawler()
+        return self._crawler
+
+    def run(self):
+        """Claim and run jobs until stop() is called"""
+        self._requeue_stale()
+        log.info('Search worker %s started (concurrency: %d)', self.worker_id, self.concurrency)
+        if CHROME_POOL_WARM_SESSIONS:
+            self._warm_browsers()
+
+        last_heartbeat = last_requeue = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while not self._stopping.is_set():
+                self._reap()
+
+                while len(self._running) < self.concurrency:
+                    job = self.db.claim_search_job(self.worker_id, MAX_RUNNING_PER_CLIENT, MAX_RUNNING_PER_BATCH)
+                    if not job:
+                        break
+                    future = executor.submit(self._run_job, job)
+                    self._running[job['id']] = (job['search_id'], future)
+                WORKER_ACTIVE_SEARCHES.set(len(self._running))
+
+                if time.monotonic() - last_heartbeat >= JOB_HEARTBEAT_INTERVAL:
+                    self._heartbeat()
+                    last_heartbeat = time.monotonic()
+
+                # Jobs of a worker that died while others keep running
+                if time.monotonic() - last_requeue >= JOB_REQUEUE_INTERVAL:
+                    self._requeue_stale()
+                    last_requeue = time.monotonic()
+
+                # Woken early when a job finishes so the next one starts right away
+                self._wake.wait(JOB_POLL_INTERVAL)
+                self._wake.clear()
+
+        log.info('Search worker %s stopped', self.worker_id)
+
+    def start_in_background(self):
+        """Run the worker loop in a daemon thread (embedded mode)"""
+        thread = threading.Thread(target=self.run, name='search-worker', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """Stop claiming jobs; running searches are finished first"""
+        self._stopping.set()
+        self._wake.set()
+
+    def _warm_browsers(self):
+        """Start Chrome sessions in the background, set up as the search scrapers use them by default"""
+        from app.services.browser_pool import browser_pool
+        from app.services.settings import SettingsManager
+        browser_pool.warm(
+            headless=SettingsManager.get_setting('headless_mode', False),
+            use_proxy=SettingsManager.get_setting('use_proxies', True)
+        )
+
+    def _reap(self):
+        for job_id, (_, future) in list(self._running.items()):
+            if future.done():
+                del self._running[job_id]
+
+    def _heartbeat(self):
+        """Keep claimed jobs alive and forward stop requests made through any web worker"""
+        try:
+            for search_id in self.db.heartbeat_search_jobs(list(self._running)):
+                live_status.request_stop(search_id)
+        except self.db.backend.Error as e:
+            log.error('Heartbeat error: %s', e)
+
+    def _requeue_stale(self):
+        """Put back in the queue the running jobs whose worker stopped heartbeating"""
+        try:
+            requeued = self.db.requeue_stale_jobs(JOB_STALE_AFTER)
+        except self.db.backend.Error as e:
+            log.error('Stale job check error: %s', e)
+            return
+        if requeued:
+            log.warning('Requeued %d stale search job(s)', requeued)
+
+    def _batch_cache(self, batch_id):
+        """Fetch cache shared by this worker's searches of one batch"""
+        with self._batch_lock:
+            cache = self._batch_caches.get(batch_id)
+            if cache is None:
+                cache = self._batch_caches[batch_id] = BatchFetchCache(BATCH_PAGE_CACHE_SIZE)
+                while len(self._batch_caches) > BATCH_CACHES_PER_WORKER:
+                    self._batch_caches.popitem(last=False)
+            else:
+                self._batch_caches.move_to_end(batch_id)
+            return cache
+
+    def _run_job(self, job):
+        search_id = job['search_id']
+        params = job['params']
+
+        def progress_callback(sid, message, percent):
+            log.info('%d%% - %s', percent, message)
+            live_status.update(sid, message=message, percent=percent)
+            event_bus.publish(sid, 'progress', {'message': message, 'percent': percent})
+
+        if job['batch_id'] is not None:
+            params['page_cache'] = self._batch_cache(job['batch_id'])
+
+        status = 'failed'
+        with log_context(search_id=search_id, job_id=job['id']):
+            try:
+                result = self.crawler.crawl(search_id, params.pop('query'), progress_callback, **params)
+                if result.get('status') != 'error':
+                    status = 'done'
+            except Exception as e:
+                log.exception('Search job failed: %s', e)
+            finally:
+                self.db.finish_search_job(job['id'], status)
+                self._wake.set()
@@ -8,6 +8,8 @@ const POLL_INTERVAL = 2000;
 
 let currentSearchId = null;
 let pollInterval = null;
+let eventSource = null;
+let liveResults = null;
 
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
@@ -208,7 +210,7 @@ function startSearch(type) {
 
             currentSearchId = data.search_id;
             showStatusSection();
-            startPolling();
+            startStreaming();
 
             btn.disabled = false;
             btn.innerHTML = originalContent;
@@ -227,6 +229,47 @@ function showStatusSection() {
     document.getElementById('statusSection').scrollIntoView({ behavior: 'smooth' });
 }
 
+// Progress stream (Server-Sent Events); falls back to polling without EventSource
+function startStreaming() {
+    stopStreaming();
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    // Results arrive incrementally, so the full list is only fetched after a reset
+    liveResults = { emails: [], phones: [], businesses: [] };
+    let stale = false;
+
+    // EventSource reconnects on its own and sends Last-Event-ID to resume
+    eventSource = new EventSource(`${API_BASE}/stream/${currentSearchId}`);
+
+    eventSource.addEventListener('status', e => updateStatus(JSON.parse(e.data)));
+    eventSource.addEventListener('email', e => liveResults.emails.push(JSON.parse(e.data)));
+    eventSource.addEventListener('phone', e => liveResults.phones.push(JSON.parse(e.data)));
+    eventSource.addEventListener('business', e => liveResults.businesses.push(JSON.parse(e.data)));
+    eventSource.addEventListener('progress', e => {
+        const data = JSON.parse(e.data);
+        if (data.message) document.getElementById('statusText').textContent = data.message;
+    });
+    eventSource.addEventListener('reset', () => { stale = true; });
+    eventSource.addEventListener('complete', () => {
+        stopStreaming();
+        if (stale) {
+            loadResults();
+        } else {
+            showResults(liveResults);
+        }
+    });
+}
+
+function stopStreaming() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
 function startPolling() {
     if (pollInterval) clearInterval(pollInterval);
 
@@ -236,7 +279,7 @@ function startPolling() {
             .then(data => {
                 updateStatus(data);
 
-                if (data.status === 'completed' || data.status === 'error') {
+                if (data.status === 'completed' || data.status === 'error' || data.status === 'stopped') {
                     stopPolling();
                     loadResults();
                 }
@@ -261,7 +304,9 @@ function updateStatus(data) {
     document.getElementById('emailsFound').textContent = data.total_emails;
 
     let statusText = `Crawling...`;
-    if (data.current_url) {
+    if (data.status === 'queued') {
+        statusText = data.queue_position ? `Queued (position ${data.queue_position})...` : 'Queued...';
+    } else if (data.current_url) {
         try {
             const url = new URL(data.current_url);
             statusText = `Scanning: ${url.hostname}`;
@@ -274,15 +319,17 @@ function updateStatus(data) {
 function loadResults() {
     fetch(`${API_BASE}/results/${currentSearchId}`)
         .then(res => res.json())
-        .then(data => {
-            displayResults(data.results);
-            document.getElementById('statusSection').style.display = 'none';
-            document.getElementById('resultsSection').style.display = 'block';
-            document.getElementById('progressFill').style.width = '100%';
-        })
+        .then(data => showResults(data.results))
         .catch(error => alert('Error loading results: ' + error.message));
 }
 
+function showResults(results) {
+    displayResults(results);
+    document.getElementById('statusSection').style.display = 'none';
+    document.getElementById('resultsSection').style.display = 'block';
+    document.getElementById('progressFill').style.width = '100%';
+}
+
 function displayResults(results) {
     const tbody = document.getElementById('resultsBody');
     tbody.innerHTML = '';
@@ -457,6 +504,11 @@ function stopCrawl() {
         .then(res => res.json())
         .then(data => {
             console.log('Stop requested:', data);
+            if (eventSource) {
+                // The stream delivers the remaining results and a final 'complete' event
+                document.getElementById('statusText').textContent = 'Stopping...';
+                return;
+            }
             stopPolling();
             loadResults();
         })
@@ -467,6 +519,7 @@ function stopCrawl() {
 }
 
 function loadHistoryItem(id) {
+    stopStreaming();
     currentSearchId = id;
     loadResults();
     document.getElementById('resultsSection').scrollIntoView({ behavior: 'smooth' });
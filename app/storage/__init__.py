@@ -0,0 +1,18 @@
+"""
+Storage backends for Email Extractor Platform
+Database talks to a backend for connections and dialect-specific SQL
+"""
+
+
+def get_backend(name=None):
+    """Create the configured storage backend ('mysql' or 'sqlite')"""
+    from config import DB_BACKEND
+
+    name = (name or DB_BACKEND).lower()
+    if name == 'sqlite':
+        from app.storage.sqlite_backend import SQLiteBackend
+        return SQLiteBackend()
+    if name == 'mysql':
+        from app.storage.mysql_backend import MySQLBackend
+        return MySQLBackend()
+    raise ValueError(f"Unknown storage backend: {name}")
@@ -0,0 +1,52 @@
+"""
+Storage backend interface
+"""
+
+
+class StorageBackend:
+    """
+    Connection factory plus the few SQL fragments that differ between engines.
+
+    Queries are written with %s placeholders; connections returned by
+    connect() accept them and expose cursor(dictionary=True) like
+    mysql.connector does.
+    """
+
+    name = None
+
+    # Exception base class raised by the driver
+    Error = Exception
+
+    # Column definition for an auto-incrementing integer primary key
+    auto_pk = None
+
+    # INSERT variant that skips rows violating a unique key
+    insert_ignore = None
+
+    # Suffix that locks selected rows for the rest of the transaction
+    lock_rows = ''
+
+    def connect(self):
+        """Open (or reuse) a connection, or return None if unavailable"""
+        raise NotImplementedError
+
+    def write_cursor(self, conn):
+        """Cursor for write transactions that mix SELECTs and INSERTs"""
+        return conn.cursor()
+
+    def create_database(self):
+        """Create the database itself if the engine needs it"""
+
+    def on_conflict(self, keys, assignments):
+        """Upsert suffix updating `assignments` when `keys` collide"""
+        raise NotImplementedError
+
+    def excluded(self, column):
+        """Reference to the value an upsert tried to insert"""
+        raise NotImplementedError
+
+    def column_exists(self, cursor, table, column):
+        raise NotImplementedError
+
+    def list_tables(self, cursor):
+        raise NotImplementedError
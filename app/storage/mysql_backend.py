@@ -0,0 +1,66 @@
+"""
+MySQL storage backend (mysql-connector-python)
+"""
+
+import mysql.connector
+from mysql.connector import Error
+from config import MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB
+from app.storage.base import StorageBackend
+from app.services.log import get_logger
+
+log = get_logger(__name__)
+
+
+class MySQLBackend(StorageBackend):
+    name = 'mysql'
+    Error = Error
+    auto_pk = 'INT AUTO_INCREMENT PRIMARY KEY'
+    insert_ignore = 'INSERT IGNORE'
+    lock_rows = ' FOR UPDATE'
+
+    def connect(self):
+        """Create database connection"""
+        try:
+            return mysql.connector.connect(
+                host=MYSQL_HOST,
+                user=MYSQL_USER,
+                password=MYSQL_PASSWORD,
+                database=MYSQL_DB
+            )
+        except Error as e:
+            log.error('Error connecting to MySQL: %s', e)
+            if "Unknown database" in str(e):
+                log.error('Database missing - run: python scripts/migrate_db.py')
+            return None
+
+    def write_cursor(self, conn):
+        # Buffered so a SELECT can be followed by more statements on the same cursor
+        return conn.cursor(buffered=True)
+
+    def create_database(self):
+        """Create the database if it doesn't exist"""
+        try:
+            conn = mysql.connector.connect(
+                host=MYSQL_HOST,
+                user=MYSQL_USER,
+                password=MYSQL_PASSWORD
+            )
+            cursor = conn.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {MYSQL_DB}")
+            conn.close()
+        except Error as e:
+            log.error('Error creating database: %s', e)
+
+    def on_conflict(self, keys, assignments):
+        return f"ON DUPLICATE KEY UPDATE {assignments}"
+
+    def excluded(self, column):
+        return f"VALUES({column})"
+
+    def column_exists(self, cursor, table, column):
+        cursor.execute(f"SHOW COLUMNS FROM {table} LIKE %s", (column,))
+        return cursor.fetchone() is not None
+
+    def list_tables(self, cursor):
+        cursor.execute("SHOW TABLES")
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,132 @@
+"""
+Embedded SQLite storage backend (WAL mode)
+For single-node deployments and benchmark runs without a MySQL server
+"""
+
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from config import SQLITE_DB_PATH, SQLITE_BUSY_TIMEOUT
+from app.storage.base import StorageBackend
+
+
+@lru_cache(maxsize=512)
+def _translate(query):
+    """Convert %s placeholders to sqlite's qmark style"""
+    return query.replace('%s', '?')
+
+
+class SQLiteCursor:
+    """Cursor wrapper matching the mysql.connector API used by Database"""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, query, params=()):
+        self._cursor.execute(_translate(query), params)
+        return self
+
+    def executemany(self, query, seq_of_params):
+        self._cursor.executemany(_translate(query), seq_of_params)
+        return self
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        columns = [col[0] for col in self._cursor.description]
+        return dict(zip(columns, row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Per-thread connection handle. close() releases it back to the thread
+    instead of closing, so the compiled statement cache survives between calls.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, dictionary=False):
+        return SQLiteCursor(self._conn.cursor(), dictionary=dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        # Match the semantics of closing a MySQL connection: uncommitted work is discarded
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+
+class SQLiteBackend(StorageBackend):
+    name = 'sqlite'
+    Error = sqlite3.Error
+    auto_pk = 'INTEGER PRIMARY KEY AUTOINCREMENT'
+    insert_ignore = 'INSERT OR IGNORE'
+    lock_rows = ''
+
+    def __init__(self, path=None):
+        self.path = path or SQLITE_DB_PATH
+        self._local = threading.local()
+
+    def connect(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            raw = sqlite3.connect(
+                self.path,
+                timeout=SQLITE_BUSY_TIMEOUT,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                cached_statements=256
+            )
+            raw.execute('PRAGMA journal_mode=WAL')
+            raw.execute('PRAGMA synchronous=NORMAL')
+            raw.execute('PRAGMA foreign_keys=ON')
+            conn = SQLiteConnection(raw)
+            self._local.conn = conn
+        return conn
+
+    def create_database(self):
+        """SQLite creates the file on connect; just make sure its directory exists"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def on_conflict(self, keys, assignments):
+        return f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET {assignments}"
+
+    def excluded(self, column):
+        return f"excluded.{column}"
+
+    def column_exists(self, cursor, table, column):
+        cursor.execute(f"PRAGMA table_info({table})")
+        return any(row[1] == column for row in cursor.fetchall())
+
+    def list_tables(self, cursor):
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,81 @@
+"""
+Browser Pool Benchmark
+Runs a sequence of simulated Selenium searches (load a page, read its
+links) the way the scrapers did before the browser pool - a new Chrome per
+search, quit afterwards - and through the pool, reporting per-search
+latency and how many Chrome sessions each way started. Needs Chrome and
+Selenium installed.
+
+Usage:
+    python benchmarks/bench_browser_pool.py --searches 20 --pool-size 2
+    python benchmarks/bench_browser_pool.py --url https://duckduckgo.com/?q=plumbers --searches 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.browser_pool import BrowserPool
+
+PAGE = 'data:text/html,' + ''.join(f'<a href="https://example.org/{n}">Result {n}</a>' for n in range(50))
+
+
+def search(driver, url):
+    driver.get(url)
+    return driver.execute_script("return Array.from(document.links, a => a.href)")
+
+
+def per_search_cold(url, searches, headless):
+    """A pool of one session used once: start Chrome, search, quit"""
+    timings = []
+    for _ in range(searches):
+        pool = BrowserPool(size=1, max_uses=1)
+        start = time.perf_counter()
+        session = pool.checkout('bench', headless=headless)
+        search(session.driver, url)
+        pool.release(session)
+        timings.append(time.perf_counter() - start)
+        pool.shutdown()
+    return timings, searches
+
+
+def per_search_pooled(url, searches, headless, pool_size, max_uses):
+    pool = BrowserPool(size=pool_size, max_uses=max_uses)
+    timings, starts = [], 0
+    for _ in range(searches):
+        start = time.perf_counter()
+        session = pool.checkout('bench', headless=headless)
+        starts += session.uses == 1
+        search(session.driver, url)
+        pool.release(session)
+        timings.append(time.perf_counter() - start)
+    pool.shutdown()
+    return timings, starts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chrome per search vs the warm browser pool')
+    parser.add_argument('--searches', type=int, default=20)
+    parser.add_argument('--url', default=PAGE, help='Page each search loads (default: a local page of links)')
+    parser.add_argument('--pool-size', type=int, default=2)
+    parser.add_argument('--max-uses', type=int, default=25, help='Searches per pooled session before it is replaced')
+    parser.add_argument('--show', action='store_true', help='Run Chrome with a window instead of headless')
+    args = parser.parse_args()
+
+    headless = not args.show
+    print(f"{'mode':<18} {'searches':>8} {'chrome starts':>14} {'mean s':>8} {'p50 s':>8} {'max s':>8} {'total s':>8}")
+    for label, (timings, starts) in (
+        ('chrome per search', per_search_cold(args.url, args.searches, headless)),
+        ('browser pool', per_search_pooled(args.url, args.searches, headless, args.pool_size, args.max_uses)),
+    ):
+        print(f"{label:<18} {len(timings):>8} {starts:>14} {statistics.mean(timings):>8.2f} "
+              f"{statistics.median(timings):>8.2f} {max(timings):>8.2f} {sum(timings):>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Email Scan Benchmark
+Compares whole-document email regex matching with the '@'-anchored scan
+used by EmailExtractor on large HTML pages, and checks both find the same
+candidates.
+
+Pass a directory of saved pages (e.g. "Save page as" of real directory and
+listing sites) with --fixtures; without it, synthetic pages of the
+configured size are generated (no '@', a few contacts, a dense listing).
+
+Usage:
+    python benchmarks/bench_email_scan.py --fixtures path/to/html --repeat 5
+    python benchmarks/bench_email_scan.py --size-mb 2
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.email_extractor import EmailExtractor
+
+
+def synthetic_pages(size_mb, seed=3):
+    rng = random.Random(seed)
+    filler = ('<div class="card"><a href="/listing/{n}">Listing {n}</a>'
+              '<p>Open 9am-5pm, call (555) 010-{n:04d} or visit our office.</p></div>\n')
+    script = '<script>var cfg = {{"id": {n}, "items": [1, 2, 3], "path": "/static/app.{n}.js"}};</script>\n'
+    target = int(size_mb * 1024 * 1024)
+
+    def build(contact_every):
+        parts, size, n = [], 0, 0
+        while size < target:
+            chunk = (script if n % 7 == 0 else filler).format(n=n % 10000)
+            if contact_every and n % contact_every == 0:
+                chunk += f'<a href="mailto:office{n}@firm{rng.randint(1, 500)}.com">Email us</a>\n'
+            parts.append(chunk)
+            size += len(chunk)
+            n += 1
+        return ''.join(parts)
+
+    return {
+        'synthetic-no-at': build(0),
+        'synthetic-few-contacts': build(2000),
+        'synthetic-dense-listing': build(5),
+    }
+
+
+def load_fixtures(path):
+    pages = {}
+    for filename in sorted(glob.glob(os.path.join(path, '*.htm*'))):
+        with open(filename, 'rb') as f:
+            pages[os.path.basename(filename)] = f.read().decode('utf-8', errors='replace')
+    return pages
+
+
+def best_of(func, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Whole-document vs anchored email scanning')
+    parser.add_argument('--fixtures', help='Directory of .html files to scan')
+    parser.add_argument('--size-mb', type=float, default=2.0, help='Size of each synthetic page')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per page (best is reported)')
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures) if args.fixtures else synthetic_pages(args.size_mb)
+    if not pages:
+        sys.exit(f"No .html files in {args.fixtures}")
+
+    extractor = EmailExtractor()
+    print(f"{'page':<32} {'MB':>6} {'@':>7} {'regex MB/s':>11} {'anchored MB/s':>14} {'speedup':>8} {'same':>5}")
+    for name, html in pages.items():
+        text = extractor.strip_scripts(html)
+        mb = len(text.encode('utf-8')) / (1024 * 1024)
+        whole, expected = best_of(extractor.email_pattern.findall, text, args.repeat)
+        anchored, found = best_of(extractor._email_candidates, text, args.repeat)
+        print(f"{name[:32]:<32} {mb:>6.2f} {text.count('@'):>7} {mb / whole:>11.1f} "
+              f"{mb / anchored:>14.1f} {whole / anchored:>7.1f}x {'yes' if found == expected else 'NO':>5}")
+
+
+if __name__ == '__main__':
+    main()
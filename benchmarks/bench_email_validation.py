@@ -0,0 +1,114 @@
+"""
+Email Validation Benchmark
+Measures EmailExtractor candidate validation throughput against the
+previous per-call implementation (kept below as the reference), with the
+verdict cache cold and warm, and checks both agree on every candidate.
+
+Usage:
+    python benchmarks/bench_email_validation.py --candidates 50000 --unique 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import validators
+from config import MIN_EMAIL_LENGTH, MAX_EMAIL_LENGTH, EXCLUDED_PATTERNS
+from app.services import email_extractor
+from app.services.email_extractor import EmailExtractor
+
+LEGACY_FILE_EXTENSIONS = [
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.bmp', '.ico',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.zip', '.rar', '.tar', '.gz', '.mp4', '.avi', '.mov', '.mp3',
+    '.wav', '.css', '.js', '.html', '.xml', '.json', '.txt',
+    '.woff', '.woff2', '.ttf', '.eot'
+]
+
+
+def legacy_is_valid_email(email):
+    """EmailExtractor.is_valid_email before the fast path (reference)"""
+    if len(email) < MIN_EMAIL_LENGTH or len(email) > MAX_EMAIL_LENGTH:
+        return False
+    for pattern in EXCLUDED_PATTERNS:
+        if pattern in email.lower():
+            return False
+    if not validators.email(email):
+        return False
+    if email.count('@') != 1:
+        return False
+    if '..' in email or email.startswith('.') or email.endswith('.'):
+        return False
+    local_part = email.split('@')[0].lower()
+    domain_part = email.split('@')[1].lower()
+    for ext in LEGACY_FILE_EXTENSIONS:
+        if local_part.endswith(ext):
+            return False
+    for ext in LEGACY_FILE_EXTENSIONS:
+        if domain_part.endswith(ext):
+            return False
+    return True
+
+
+def make_candidates(total, unique, seed=7):
+    """A crawl-like mix: real addresses, placeholders, asset names, repeats"""
+    rng = random.Random(seed)
+    pool = []
+    for i in range(unique):
+        kind = i % 10
+        if kind < 6:
+            pool.append(f"{rng.choice(['info', 'sales', 'contact', 'j.smith', 'office'])}{i}@company{i % 400}.com")
+        elif kind == 6:
+            pool.append(f"user{i}@example.com")
+        elif kind == 7:
+            pool.append(f"logo{i}@2x.png")
+        elif kind == 8:
+            pool.append(f"noreply@mailer{i}.net")
+        else:
+            pool.append(f"Team.Lead{i}@Agency{i % 50}.CO.UK")
+    return [rng.choice(pool) for _ in range(total)]
+
+
+def rate(func, candidates):
+    start = time.perf_counter()
+    for email in candidates:
+        func(email)
+    elapsed = time.perf_counter() - start
+    return len(candidates) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare email validation throughput before/after the fast path')
+    parser.add_argument('--candidates', type=int, default=50000, help='Candidates validated per run')
+    parser.add_argument('--unique', type=int, default=5000, help='Distinct addresses among them')
+    args = parser.parse_args()
+
+    candidates = make_candidates(args.candidates, args.unique)
+    extractor = EmailExtractor()
+
+    mismatches = [email for email in set(candidates)
+                  if legacy_is_valid_email(email) != extractor.is_valid_email(email)]
+
+    legacy = rate(legacy_is_valid_email, candidates)
+    uncached = rate(email_extractor._is_valid_email, [email.lower() for email in candidates])
+    email_extractor._verdict_cache.clear()
+    cold = rate(extractor.is_valid_email, candidates)
+    warm = rate(extractor.is_valid_email, candidates)
+
+    print(f"{args.candidates} candidates, {args.unique} distinct")
+    print(f"{'pipeline':<28} {'candidates/sec':>15} {'speedup':>8}")
+    for name, value in (('before (per-call checks)', legacy), ('fast path, no cache', uncached),
+                        ('fast path, cold cache', cold), ('fast path, warm cache', warm)):
+        print(f"{name:<28} {value:>15,.0f} {value / legacy:>7.1f}x")
+    print(f"\nVerdict mismatches vs. before: {len(mismatches)}")
+    for email in mismatches[:10]:
+        print(f"  {email}")
+
+
+if __name__ == '__main__':
+    main()
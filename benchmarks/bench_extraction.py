@@ -0,0 +1,236 @@
+"""
+Extraction Benchmark
+Runs each stage of page extraction over the checked-in corpus and reports,
+per corpus category and stage: pages/sec, MB/sec, peak allocated memory
+(tracemalloc) and precision/recall against the expected contacts.
+
+The corpus is a directory of categories (tiny pages, huge listings,
+script-heavy SPAs, obfuscated contacts), each holding pages and an
+expected.json:
+
+    {"page.html": {"url": ..., "emails": [...], "phones": ["+1..."], "links": [...]}}
+
+Stages follow extract_page: decode (charset sniffing, re-encoding), strip
+(scripts and styles), the mailto, text and obfuscated email candidates,
+validate (the final emails), phones, links, then extract_page and PageStream
+end to end (scored on emails, phones and links together). Timings vary
+between runs; the scores don't, so --json results of two commits can be
+diffed, or compared directly with --baseline.
+
+Usage:
+    python benchmarks/bench_extraction.py --repeat 5 --json results.json
+    python benchmarks/bench_extraction.py --category listings spa --baseline results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import STREAM_CHUNK_SIZE
+from app.services.email_extractor import EmailExtractor, MAILTO_PATTERNS
+from app.services.extraction import PageStream, extract_links, extract_page, is_ascii_compatible, sniff_encoding
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+STAGES = ('decode', 'strip', 'mailto', 'text', 'obfuscated', 'validate', 'phones', 'links', 'extract_page', 'stream')
+
+_extractor = EmailExtractor()
+
+
+def load_corpus(path, categories=None):
+    """{category: {name: (body, expected)}} for the categories under path"""
+    corpus = {}
+    for category in sorted(os.listdir(path)):
+        manifest = os.path.join(path, category, 'expected.json')
+        if not os.path.isfile(manifest) or (categories and category not in categories):
+            continue
+        with open(manifest, encoding='utf-8') as f:
+            expected = json.load(f)
+        corpus[category] = {}
+        for name in sorted(expected):
+            with open(os.path.join(path, category, name), 'rb') as f:
+                corpus[category][name] = (f.read(), expected[name])
+    return corpus
+
+
+def decode(body):
+    """The body and charset as extract_page scans them"""
+    encoding = sniff_encoding(body)
+    if not is_ascii_compatible(encoding):
+        return body.decode(encoding, errors='replace').encode('utf-8'), 'utf-8'
+    return body, encoding
+
+
+def streamed(body, url):
+    stream = PageStream(url)
+    for start in range(0, len(body), STREAM_CHUNK_SIZE):
+        stream.feed(body[start:start + STREAM_CHUNK_SIZE])
+    return stream.close()[0]
+
+
+def contacts(result):
+    """Tagged emails, phones and links of an (emails, phones, links) result"""
+    emails, phones, links = result
+    return ([('email', email) for email in emails] + [('phone', phone.e164) for phone in phones]
+            + [('link', link) for link in links])
+
+
+def _text(value):
+    return value if isinstance(value, str) else value.decode('ascii', errors='replace')
+
+
+def stages(body, url):
+    """
+    {stage: (run, score)} for a page: run() performs the stage on the
+    previous stages' output, score(output) gives the items to compare with
+    the expected ones (None for stages that aren't scored)
+    """
+    text, encoding = decode(body)
+    cleaned = _extractor.strip_scripts(text)
+    mailto = MAILTO_PATTERNS[bytes].findall(text) if b'@' in text else []
+    candidates = _extractor._email_candidates(cleaned) if b'@' in text else []
+    obfuscated = _extractor.decode_obfuscated(text)
+    emails = lambda found: [('email', _text(email).lower()) for email in found]
+    return {
+        'decode': (lambda: decode(body), None),
+        'strip': (lambda: _extractor.strip_scripts(text), None),
+        'mailto': (lambda: MAILTO_PATTERNS[bytes].findall(text) if b'@' in text else [], emails),
+        'text': (lambda: _extractor._email_candidates(cleaned) if b'@' in text else [], emails),
+        'obfuscated': (lambda: _extractor.decode_obfuscated(text), emails),
+        'validate': (lambda: _extractor._valid_unique(mailto + candidates + obfuscated), emails),
+        'phones': (lambda: _extractor.extract_phones(cleaned), lambda found: [('phone', phone.e164) for phone in found]),
+        'links': (lambda: extract_links(cleaned, url, encoding), lambda found: [('link', link) for link in found]),
+        'extract_page': (lambda: extract_page(body, url)[0], contacts),
+        'stream': (lambda: streamed(body, url), contacts),
+    }
+
+
+def expected_items(stage, expected):
+    """The expected items a stage's output is scored against"""
+    items = []
+    if stage in ('mailto', 'text', 'obfuscated', 'validate', 'extract_page', 'stream'):
+        items += [('email', email) for email in expected['emails']]
+    if stage in ('phones', 'extract_page', 'stream'):
+        items += [('phone', phone) for phone in expected['phones']]
+    if stage in ('links', 'extract_page', 'stream'):
+        items += [('link', link) for link in expected['links']]
+    return items
+
+
+def best_time(run, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(run):
+    tracemalloc.start()
+    output = run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, output
+
+
+def measure(pages, repeat):
+    """{stage: summary} over pages: throughput and peak memory, and scores summed over pages"""
+    totals = {stage: {'pages': 0, 'bytes': 0, 'seconds': 0.0, 'peak_bytes': 0, 'hits': 0,
+                      'false_positives': 0, 'misses': 0} for stage in STAGES}
+    for body, expected in pages.values():
+        for stage, (run, score) in stages(body, expected['url']).items():
+            total = totals[stage]
+            peak, output = peak_memory(run)
+            total['pages'] += 1
+            total['bytes'] += len(body)
+            total['seconds'] += best_time(run, repeat)
+            total['peak_bytes'] = max(total['peak_bytes'], peak)
+            if score is not None:
+                found, wanted = set(score(output)), set(expected_items(stage, expected))
+                total['hits'] += len(found & wanted)
+                total['false_positives'] += len(found - wanted)
+                total['misses'] += len(wanted - found)
+    return {stage: summarize(total, scored=stage not in ('decode', 'strip')) for stage, total in totals.items()}
+
+
+def summarize(total, scored):
+    hits, false_positives, misses = total['hits'], total['false_positives'], total['misses']
+    seconds = total['seconds'] or 1e-9
+    return {
+        'pages_per_sec': round(total['pages'] / seconds, 1),
+        'mb_per_sec': round(total['bytes'] / (1024 * 1024) / seconds, 2),
+        'peak_kb': round(total['peak_bytes'] / 1024),
+        # Nothing expected and nothing found counts as perfect
+        'precision': (round(hits / (hits + false_positives), 4) if hits + false_positives else 1.0) if scored else None,
+        'recall': (round(hits / (hits + misses), 4) if hits + misses else 1.0) if scored else None,
+    }
+
+
+def _rate(new, old):
+    """A measurement and its relative change from the baseline"""
+    change = f" ({(new - old) / old:+.0%})" if old and new != old else ''
+    return f"{new:g}{change}"
+
+
+def _score(new, old):
+    """A precision or recall and its change from the baseline in points"""
+    if new is None:
+        return '-'
+    change = f" ({(new - old) * 100:+.1f}pt)" if old is not None and new != old else ''
+    return f"{new:.1%}{change}"
+
+
+def report(results, baseline=None):
+    for category, by_stage in results['categories'].items():
+        info = results['corpus'][category]
+        print(f"{category}: {info['pages']} pages, {info['mb']:.2f} MB")
+        print(f"  {'stage':<13} {'pages/s':>16} {'MB/s':>16} {'peak KB':>14} {'precision':>16} {'recall':>16}")
+        for stage, row in by_stage.items():
+            old = (baseline or {}).get('categories', {}).get(category, {}).get(stage, {})
+            cells = [_rate(row[key], old.get(key)) for key in ('pages_per_sec', 'mb_per_sec', 'peak_kb')]
+            cells += [_score(row[key], old.get(key)) for key in ('precision', 'recall')]
+            print(f"  {stage:<13} {cells[0]:>16} {cells[1]:>16} {cells[2]:>14} {cells[3]:>16} {cells[4]:>16}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-stage extraction throughput, memory and accuracy')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='Directory of categories with expected.json')
+    parser.add_argument('--category', nargs='+', help='Only these categories')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per page and stage (best is reported)')
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--baseline', help='Results (--json) of an earlier run to show changes against')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.category)
+    if not corpus:
+        sys.exit(f"No categories with an expected.json in {args.corpus}")
+
+    results = {
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'corpus': {category: {'pages': len(pages), 'mb': round(sum(len(body) for body, _ in pages.values()) / (1024 * 1024), 3)}
+                   for category, pages in corpus.items()},
+        'categories': {category: measure(pages, args.repeat) for category, pages in corpus.items()},
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Extraction Pool Benchmark
+Runs page extraction (emails, phones, links) from a crawl-sized thread
+pool, once on the threads themselves and once through ExtractionPool with
+each process count given, and reports pages/sec. Run it on the multi-core
+machine the workers use; the pool only pays off with spare cores.
+
+Usage:
+    python benchmarks/bench_extraction_pool.py --pages 400 --threads 8 --processes 2 4 8
+"""
+
+import argparse
+import concurrent.futures
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.extraction import ExtractionPool, extract_page
+
+
+def make_pages(count, links_per_page, seed=11):
+    rng = random.Random(seed)
+    pages = []
+    for n in range(count):
+        body = []
+        for i in range(links_per_page):
+            body.append(f'<li><a href="/company/{n}-{i}">Company {i}</a> - call (555) {rng.randint(100, 999)}-{i:04d}'
+                        f' or email sales{i}@company{n}.com<span class="tag">{rng.random():.6f}</span></li>')
+        html = (f"<html><head><style>li {{ margin: 0 }}</style></head><body><ul>{''.join(body)}</ul>"
+                f"<a href='https://partner{n}.org/'>Partner</a></body></html>")
+        # Raw bytes, as fetch_page passes response.content
+        pages.append((html.encode('utf-8'), f"https://directory{n}.example.org/list"))
+    return pages
+
+
+def run(pages, threads, extract):
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda page: extract(*page), pages))
+    elapsed = time.perf_counter() - start
+    return len(pages) / elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Thread-only vs process-pool page extraction')
+    parser.add_argument('--pages', type=int, default=400)
+    parser.add_argument('--links-per-page', type=int, default=150, help='Listing entries per page')
+    parser.add_argument('--threads', type=int, default=8, help='Crawl threads (MAX_WORKERS)')
+    parser.add_argument('--processes', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--batch-size', type=int, default=8)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.links_per_page)
+    print(f"{args.pages} pages, {args.threads} crawl threads, {os.cpu_count()} CPUs")
+    print(f"{'extraction':<24} {'pages/sec':>10} {'speedup':>8}")
+
+    baseline, expected = run(pages, args.threads, extract_page)
+    expected = [result for result, _ in expected]
+    print(f"{'threads only':<24} {baseline:>10.1f} {1:>7.1f}x")
+
+    for processes in args.processes:
+        pool = ExtractionPool(processes=processes, batch_size=args.batch_size)
+        try:
+            # Start the worker processes before timing
+            pool.extract(*pages[0])
+            throughput, results = run(pages, args.threads, pool.extract)
+        finally:
+            pool.shutdown()
+        same = [result for result, _ in results] == expected
+        print(f"{f'pool, {processes} processes':<24} {throughput:>10.1f} {throughput / baseline:>7.1f}x"
+              f"{'' if same else '  (results differ!)'}")
+
+
+if __name__ == '__main__':
+    main()
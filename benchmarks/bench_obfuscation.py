@@ -0,0 +1,79 @@
+"""
+Obfuscated Email Benchmark
+Runs extract_from_html with and without the obfuscation decoders over a
+fixture corpus (pages plus an expected.json of the contacts each one
+holds, see bench_extraction.py) and reports recall, precision and time per page for both, so the
+yield gained can be weighed against the decoding cost.
+
+Usage:
+    python benchmarks/bench_obfuscation.py --corpus benchmarks/corpus/obfuscated --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.email_extractor import EmailExtractor
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus', 'obfuscated')
+
+
+def load_corpus(path):
+    with open(os.path.join(path, 'expected.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+    pages = {}
+    for name in sorted(expected):
+        with open(os.path.join(path, name), 'rb') as f:
+            pages[name] = f.read()
+    return pages, {name: page['emails'] for name, page in expected.items()}
+
+
+def per_page_ms(extractor, body, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extractor.extract_from_html(body)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def score(found, expected):
+    found, expected = set(found), set(expected)
+    return len(found & expected), len(found - expected), len(expected - found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Obfuscated email decoding: yield and cost')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='Directory with pages and expected.json')
+    parser.add_argument('--repeat', type=int, default=200, help='Extractions per page for timing')
+    args = parser.parse_args()
+
+    pages, expected = load_corpus(args.corpus)
+    decoding = EmailExtractor()
+    plain = EmailExtractor()
+    plain.decode_obfuscated = lambda html_content, start=0, end=None: []
+
+    totals = {'plain': [0, 0, 0], 'decoding': [0, 0, 0]}
+    print(f"{'page':<20} {'expected':>8} {'plain':>6} {'decoded':>8} {'false +':>8} {'plain ms':>9} {'decode ms':>10}")
+    for name, body in pages.items():
+        results = {}
+        for label, extractor in (('plain', plain), ('decoding', decoding)):
+            results[label] = score(extractor.extract_from_html(body)[0], expected[name])
+            totals[label] = [a + b for a, b in zip(totals[label], results[label])]
+        plain_ms = per_page_ms(plain, body, args.repeat)
+        decode_ms = per_page_ms(decoding, body, args.repeat)
+        print(f"{name[:20]:<20} {len(expected[name]):>8} {results['plain'][0]:>6} {results['decoding'][0]:>8} "
+              f"{results['decoding'][1]:>8} {plain_ms:>9.3f} {decode_ms:>10.3f}")
+
+    print()
+    for label, (hits, false_positives, misses) in totals.items():
+        recall = hits / (hits + misses) if hits + misses else 1.0
+        precision = hits / (hits + false_positives) if hits + false_positives else 1.0
+        print(f"{label:<10} recall {recall:6.1%}  precision {precision:6.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Page Decode Benchmark
+Compares the previous extraction path (decode the whole body to str as
+response.text does, regex extraction on the text, BeautifulSoup for links)
+with extract_page on the raw bytes, per page: CPU time and peak traced
+memory. Pages are synthetic listings in several encodings, or the .html
+files of --fixtures.
+
+Usage:
+    python benchmarks/bench_page_decode.py --size-kb 500 --repeat 5
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+from urllib.parse import urljoin
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import validators
+from bs4 import BeautifulSoup
+from app.services.email_extractor import EmailExtractor
+from app.services.extraction import extract_page, sniff_encoding
+
+_extractor = EmailExtractor()
+
+
+def legacy_extract(body, url, encoding):
+    """fetch_page before bytes-level extraction (reference)"""
+    html = body.decode(encoding, errors='replace')
+    emails, phones = _extractor.extract_from_html(html)
+    links = []
+    for a in BeautifulSoup(html, 'html.parser').find_all('a', href=True):
+        full_url = urljoin(url, a['href'])
+        if validators.url(full_url) and full_url.startswith('http'):
+            if '#' in full_url:
+                full_url = full_url.split('#')[0]
+            if full_url != url:
+                links.append(full_url)
+    return emails, phones, links
+
+
+def synthetic_pages(size_kb):
+    entry = ('<li class="company"><a href="/firma/{n}?ref=list&amp;page=2">Фирма «Север» {n}</a>'
+             '<span>Телефон: +7 (495) 555-{n:04d}</span> <span>Почта: office{n}@sever{n}.ru</span></li>\n')
+    entries = []
+    size = 0
+    n = 0
+    while size < size_kb * 1024:
+        entries.append(entry.format(n=n))
+        size += len(entries[-1].encode('utf-8'))
+        n += 1
+    html = ('<html><head><meta charset="{charset}"><title>Каталог</title></head><body><ul>'
+            + ''.join(entries) + '</ul></body></html>')
+    return {
+        'utf-8': html.format(charset='utf-8').encode('utf-8'),
+        'windows-1251': html.format(charset='windows-1251').encode('windows-1251'),
+        'utf-16 (BOM)': html.format(charset='utf-16').encode('utf-16'),
+    }
+
+
+def load_fixtures(path):
+    pages = {}
+    for filename in sorted(glob.glob(os.path.join(path, '*.htm*'))):
+        with open(filename, 'rb') as f:
+            pages[os.path.basename(filename)] = f.read()
+    return pages
+
+
+def measure(func, repeat):
+    best_cpu, peak = float('inf'), 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.thread_time()
+        result = func()
+        best_cpu = min(best_cpu, time.thread_time() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best_cpu, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Decoded-text vs raw-bytes page extraction')
+    parser.add_argument('--fixtures', help='Directory of .html files to use instead of synthetic pages')
+    parser.add_argument('--size-kb', type=int, default=500, help='Size of each synthetic page')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures) if args.fixtures else synthetic_pages(args.size_kb)
+    url = 'https://catalog.example.org/list'
+    print(f"{'page':<24} {'KB':>6} {'before ms':>10} {'bytes ms':>9} {'before peak KB':>15} {'bytes peak KB':>14} {'same':>5}")
+    for name, body in pages.items():
+        encoding = sniff_encoding(body)
+        before_cpu, before_peak, expected = measure(lambda: legacy_extract(body, url, encoding), args.repeat)
+        after_cpu, after_peak, (found, _) = measure(lambda: extract_page(body, url), args.repeat)
+        same = [sorted(part) for part in found] == [sorted(part) for part in expected]
+        print(f"{name[:24]:<24} {len(body) / 1024:>6.0f} {before_cpu * 1000:>10.1f} {after_cpu * 1000:>9.1f} "
+              f"{before_peak / 1024:>15.0f} {after_peak / 1024:>14.0f} {'yes' if same else 'NO':>5}")
+
+
+if __name__ == '__main__':
+    main()
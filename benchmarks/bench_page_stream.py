@@ -0,0 +1,102 @@
+"""
+Page Stream Benchmark
+Compares extracting a page after downloading it whole (extract_page) with
+extracting it chunk by chunk as it downloads (PageStream), for growing
+page sizes: peak traced memory, and the time from the first byte to the
+result over a simulated connection of --mbps.
+
+Usage:
+    python benchmarks/bench_page_stream.py --sizes-mb 1 4 16 --mbps 20
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+import tracemalloc
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import STREAM_CHUNK_SIZE
+from app.services.extraction import PageStream, extract_page
+
+URL = 'https://directory.example.org/list'
+
+
+def make_page(size_mb):
+    about = 'Family-owned since 1987, serving the metro area with same-day service and free estimates. ' * 12
+    entry = ('<li class="listing"><a href="/company/{n}">Company {n}</a><p>' + about + '</p>'
+             'Call (555) 010-{m:04d} or write to sales{n}@company{n}.com</li>\n')
+    script = '<script>window.__state = {{"page": {n}, "items": [1, 2, 3], "token": "{n:x}"}};</script>\n'
+    parts, size, n = [], 0, 0
+    while size < size_mb * 1024 * 1024:
+        parts.append((script if n % 20 == 0 else entry).format(n=n, m=n % 10000))
+        size += len(parts[-1])
+        n += 1
+    return ('<html><head><meta charset="utf-8"></head><body><ul>' + ''.join(parts) + '</ul></body></html>').encode('utf-8')
+
+
+def download(body, mbps):
+    """
+    The body in STREAM_CHUNK_SIZE chunks arriving at mbps megabits/sec
+
+    Chunks arrive on another thread whether or not they are read yet, as
+    they do into a socket's receive buffer.
+    """
+    seconds_per_chunk = STREAM_CHUNK_SIZE * 8 / (mbps * 1000 * 1000) if mbps else 0
+    received = queue.Queue()
+
+    def receive():
+        for start in range(0, len(body), STREAM_CHUNK_SIZE):
+            if seconds_per_chunk:
+                time.sleep(seconds_per_chunk)
+            received.put(body[start:start + STREAM_CHUNK_SIZE])
+        received.put(None)
+
+    threading.Thread(target=receive, daemon=True).start()
+    return iter(received.get, None)
+
+
+def whole(body, mbps):
+    received = b''.join(download(body, mbps))
+    return extract_page(received, URL)[0]
+
+
+def streamed(body, mbps):
+    stream = PageStream(URL)
+    for chunk in download(body, mbps):
+        stream.feed(chunk)
+    return stream.close()[0]
+
+
+def measure(func, body, mbps):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(body, mbps)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Whole-page vs streaming extraction')
+    parser.add_argument('--sizes-mb', type=float, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--mbps', type=float, default=20, help='Simulated download speed (0 = no delay)')
+    args = parser.parse_args()
+
+    print(f"{args.mbps:g} Mbit/s, {STREAM_CHUNK_SIZE // 1024} KB chunks (peak excludes the test page itself)")
+    print(f"{'MB':>6} {'whole s':>8} {'stream s':>9} {'whole peak MB':>14} {'stream peak MB':>15} {'same':>5}")
+    for size_mb in args.sizes_mb:
+        body = make_page(size_mb)
+        whole_s, whole_peak, expected = measure(whole, body, args.mbps)
+        stream_s, stream_peak, result = measure(streamed, body, args.mbps)
+        print(f"{len(body) / 1024 / 1024:>6.1f} {whole_s:>8.2f} {stream_s:>9.2f} {whole_peak / 1024 / 1024:>14.1f} "
+              f"{stream_peak / 1024 / 1024:>15.1f} {'yes' if result == expected else 'NO':>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Selenium Wait Benchmark
+Runs simulated engine searches (load a results page, scroll for more) with
+the fixed sleeps the scrapers used before (3-5 s after the page load, 2 s
+after every scroll) and with the condition-based waits of
+app/services/waits.py, reporting per-search latency, the time saved and
+how many results each way found (so a wait that ends too early shows up as
+missing results).
+
+The results page is served locally: it renders its first results after
+--render-ms and fetches another page of them on each scroll, which the
+server answers after --latency-ms. Chrome comes from the browser pool, so
+its startup isn't counted. Needs Chrome and Selenium installed.
+
+Usage:
+    python benchmarks/bench_scraper_waits.py --searches 10 --scrolls 3
+    python benchmarks/bench_scraper_waits.py --latency-ms 1500 --jitter
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.common.by import By
+from app.services.browser_pool import BrowserPool
+from app.services.waits import until_present, until_settled
+
+RESULT = 'li.result a'
+
+PAGE = """<!doctype html>
+<html><body><ol id="results"></ol><div style="height: 3000px"></div>
+<script>
+let page = 0, loading = false;
+function more() {
+    if (loading || page >= %(pages)d) return;
+    loading = true;
+    fetch('/results?page=' + page++).then(r => r.json()).then(links => {
+        for (const link of links) {
+            const li = document.createElement('li');
+            li.className = 'result';
+            li.innerHTML = '<a href="' + link + '">' + link + '</a>';
+            document.getElementById('results').appendChild(li);
+        }
+        loading = false;
+    });
+}
+setTimeout(more, %(render_ms)d);
+window.addEventListener('scroll', more);
+</script></body></html>"""
+
+
+def serve(render_ms, latency_ms, pages):
+    """Start the results server in the background; its base URL"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/results':
+                time.sleep(latency_ms / 1000)
+                page = int(parse_qs(url.query)['page'][0])
+                body = json.dumps([f'https://example.org/{page}/{n}' for n in range(10)]).encode()
+                content_type = 'application/json'
+            else:
+                body = (PAGE % {'pages': pages, 'render_ms': render_ms}).encode()
+                content_type = 'text/html'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}/search'
+
+
+def search_fixed(driver, url, scrolls):
+    """The waits the engine searches used before: a random 3-5 s, then 2 s per scroll"""
+    driver.get(url)
+    time.sleep(random.uniform(3, 5))
+    for _ in range(scrolls):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(2)
+    return len(driver.find_elements(By.CSS_SELECTOR, RESULT))
+
+
+def search_conditions(driver, url, scrolls, jitter):
+    driver.get(url)
+    until_present(driver, RESULT, jitter=jitter)
+    for _ in range(scrolls):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        until_settled(driver, RESULT)
+    return len(driver.find_elements(By.CSS_SELECTOR, RESULT))
+
+
+def run(search, session, url, searches, *args):
+    timings, found = [], []
+    for _ in range(searches):
+        session.driver.get('about:blank')
+        start = time.perf_counter()
+        found.append(search(session.driver, url, *args))
+        timings.append(time.perf_counter() - start)
+    return timings, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fixed sleeps vs condition-based waits per search')
+    parser.add_argument('--searches', type=int, default=10)
+    parser.add_argument('--scrolls', type=int, default=3, help='Scrolls per search (each loads a page of results)')
+    parser.add_argument('--render-ms', type=int, default=800, help='Delay before the first results render')
+    parser.add_argument('--latency-ms', type=int, default=600, help='Server latency of each further page of results')
+    parser.add_argument('--jitter', action='store_true', help='Apply SELENIUM_JITTER_FLOOR to the page loads')
+    parser.add_argument('--show', action='store_true', help='Run Chrome with a window instead of headless')
+    args = parser.parse_args()
+
+    url = serve(args.render_ms, args.latency_ms, args.scrolls + 1)
+    pool = BrowserPool(size=1, max_uses=args.searches * 2 + 1)
+    session = pool.checkout('bench', headless=not args.show)
+    try:
+        rows = (
+            ('fixed sleeps', run(search_fixed, session, url, args.searches, args.scrolls)),
+            ('condition waits', run(search_conditions, session, url, args.searches, args.scrolls, args.jitter)),
+        )
+    finally:
+        pool.release(session)
+        pool.shutdown()
+
+    expected = (args.scrolls + 1) * 10
+    print(f"{'waits':<16} {'searches':>8} {'mean s':>8} {'p50 s':>8} {'max s':>8} {'results':>12}")
+    for label, (timings, found) in rows:
+        print(f"{label:<16} {len(timings):>8} {statistics.mean(timings):>8.2f} {statistics.median(timings):>8.2f} "
+              f"{max(timings):>8.2f} {f'{min(found)}-{max(found)}/{expected}':>12}")
+    saved = statistics.mean(rows[0][1][0]) - statistics.mean(rows[1][1][0])
+    print(f"\nSaved per search: {saved:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Startup Benchmark
+Measures, in fresh interpreter processes, how long the web app takes to
+import, to build the Flask app and to answer its first request, and which
+heavy modules (DB driver, Selenium, HTML parsing) were loaded by then.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --path /
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only be imported once a search actually needs them
+HEAVY_MODULES = ['mysql.connector', 'selenium', 'bs4', 'requests', 'validators', 'pyarrow']
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+import app.routes
+imported = time.perf_counter()
+from app import create_app
+flask_app = create_app()
+created = time.perf_counter()
+response = flask_app.test_client().get(PATH)
+responded = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_response_ms': (responded - created) * 1000,
+    'total_ms': (responded - start) * 1000,
+    'status': response.status_code,
+    'heavy_loaded': [name for name in HEAVY if name in sys.modules],
+}))
+'''
+
+
+def run_once(path):
+    code = f"PATH = {path!r}\nHEAVY = {HEAVY_MODULES!r}\n" + CHILD
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    # The app may print to stdout; the measurement is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure app import time and time-to-first-response')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/', help='Path requested as the first response')
+    args = parser.parse_args()
+
+    runs = [run_once(args.path) for _ in range(args.runs)]
+
+    print(f"{'metric':<20} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for metric in ('import_ms', 'create_app_ms', 'first_response_ms', 'total_ms'):
+        values = [run[metric] for run in runs]
+        print(f"{metric:<20} {statistics.median(values):>10.1f} {min(values):>10.1f} {max(values):>10.1f}")
+
+    print(f"\nFirst response status: {runs[-1]['status']} ({args.path})")
+    loaded = runs[-1]['heavy_loaded']
+    print(f"Heavy modules loaded at first response: {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == '__main__':
+    main()
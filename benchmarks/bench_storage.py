@@ -0,0 +1,93 @@
+"""
+Storage Write Benchmark
+Replays the write pattern of a crawl (per-page result batches, crawled URL
+marks and periodic status updates from parallel workers) against one or
+more storage backends and reports write throughput.
+
+Usage:
+    python benchmarks/bench_storage.py --backends sqlite mysql --pages 2000 --workers 8
+"""
+
+import argparse
+import concurrent.futures
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+from app.migrations import run_migrations
+from app.services.phones import normalize_phone
+from app.storage import get_backend
+
+
+def make_backend(name):
+    if name == 'sqlite':
+        from app.storage.sqlite_backend import SQLiteBackend
+        # Fresh file per run so results are comparable
+        return SQLiteBackend(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    return get_backend(name)
+
+
+def write_page(db, search_id, page, emails_per_page, phones_per_page):
+    url = f"https://bench-{page % 97}.example.org/page/{page}"
+    emails = [(f"user{page}-{i}@bench{page % 13}.org", f"bench{page % 13}.org") for i in range(emails_per_page)]
+    phones = [normalize_phone(f"555-{page % 1000:03d}-{i:04d}") for i in range(phones_per_page)]
+    db.add_crawled_url(search_id, url)
+    new_emails, new_phones = db.add_page_results(search_id, url, emails, phones)
+    return len(new_emails) + len(new_phones)
+
+
+def run(backend_name, pages, workers, emails_per_page, phones_per_page):
+    db = Database(make_backend(backend_name))
+    run_migrations(db)
+    search_id = db.create_search('storage benchmark', 'web', 'bench')
+
+    rows = 0
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(write_page, db, search_id, page, emails_per_page, phones_per_page)
+            for page in range(pages)
+        ]
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            rows += future.result()
+            # Same cadence as the crawl loop's status checkpoint
+            if done % 5 == 0:
+                db.update_search_status(search_id, 'running', done, rows)
+    elapsed = time.perf_counter() - start
+
+    db.update_search_status(search_id, 'completed', pages, rows)
+    db.delete_search(search_id)
+
+    return {
+        'backend': backend_name,
+        'pages': pages,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 1),
+        'rows_per_sec': round(rows / elapsed, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare storage backend write throughput')
+    parser.add_argument('--backends', nargs='+', default=['sqlite'], choices=['sqlite', 'mysql'])
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--emails-per-page', type=int, default=3)
+    parser.add_argument('--phones-per-page', type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'backend':<10}{'pages':>8}{'rows':>8}{'seconds':>10}{'pages/s':>10}{'rows/s':>10}")
+    for name in args.backends:
+        result = run(name, args.pages, args.workers, args.emails_per_page, args.phones_per_page)
+        print(f"{result['backend']:<10}{result['pages']:>8}{result['rows']:>8}{result['seconds']:>10}"
+              f"{result['pages_per_sec']:>10}{result['rows_per_sec']:>10}")
+
+
+if __name__ == '__main__':
+    main()
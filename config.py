@@ -11,8 +11,11 @@ PORT = 5000
 
 # Database Settings
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-# SQLite path (kept for reference/fallback)
+DB_BACKEND = 'mysql'  # 'mysql' or 'sqlite' (embedded, WAL mode)
+
+# SQLite Settings (used when DB_BACKEND = 'sqlite')
 SQLITE_DB_PATH = os.path.join(BASE_DIR, 'email_extractor.db')
+SQLITE_BUSY_TIMEOUT = 30  # Seconds to wait for the write lock
 
 # MySQL Settings
 MYSQL_HOST = 'localhost'
@@ -28,6 +31,32 @@ REQUEST_DELAY = 1  # Reduced delay since we are parallel (per thread)
 REQUEST_TIMEOUT = 15  # Seconds to wait for response
 MAX_SEARCH_RESULTS = 20  # Number of initial URLs from search
 MAX_EXTERNAL_LINKS = 5  # Max external links to follow per page
+STATUS_CHECKPOINT_INTERVAL = 5  # Seconds between progress writes to the DB (what web processes stream of worker.py searches)
+EXTRACTION_PROCESSES = 0  # Processes parsing fetched pages (0 = parse on the crawl threads)
+EXTRACTION_BATCH_SIZE = 8  # Pages sent to an extraction process at once
+EXTRACTION_BATCH_WAIT = 0.01  # Seconds to wait for a batch to fill before sending it
+PAGE_SNIFF_BYTES = 2048  # Head of a page searched for a <meta> charset
+STREAM_EXTRACTION_BYTES = 1024 * 1024  # Pages larger than this are extracted chunk by chunk while downloading
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read from the connection at a time
+
+# Progress Stream (Server-Sent Events) Settings
+EVENT_HISTORY_SIZE = 1000  # Events buffered per search for Last-Event-ID reconnects
+EVENT_RETENTION = 120  # Seconds a finished search's events stay available
+SSE_KEEPALIVE_INTERVAL = 15  # Seconds between keep-alive comments on an idle stream
+SSE_RETRY_MS = 3000  # Client reconnect delay sent in the stream's retry field
+SSE_DB_POLL_INTERVAL = 2  # Seconds between DB reads when streaming a search run by another process
+
+# Logging Settings
+LOG_LEVEL = 'INFO'  # DEBUG adds per-URL, per-email and per-business messages
+LOG_FORMAT = 'text'  # 'text' for consoles, 'json' for one object per line (log shippers)
+
+# Tracing Settings
+TRACING_ENABLED = True  # Record per-search spans for /api/trace/<id>
+TRACE_MAX_SPANS = 5000  # Spans kept per search; later ones are counted but dropped
+
+# Profiling Settings (searches started with "profile": true)
+PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples of a profiled search's threads
+PROFILE_TOP_ALLOCATIONS = 50  # Source lines kept in a profile's allocation report
 
 # User Agent (identify yourself)
 USER_AGENT = 'EmailExtractorBot/1.0 (Educational/Research Purpose)'
@@ -35,6 +64,7 @@ USER_AGENT = 'EmailExtractorBot/1.0 (Educational/Research Purpose)'
 # Email Validation
 MIN_EMAIL_LENGTH = 6
 MAX_EMAIL_LENGTH = 100
+EMAIL_VERDICT_CACHE_SIZE = 100000  # Validation verdicts remembered across pages and searches
 
 # Excluded email patterns (common placeholders/fake emails)
 EXCLUDED_PATTERNS = [
@@ -49,6 +79,9 @@ EXCLUDED_PATTERNS = [
     'donotreply@'
 ]
 
+# Phone Normalization
+PHONE_DEFAULT_REGION = 'US'  # Region of numbers found without a country code (see REGIONS in app/services/phones.py)
+
 # Search Settings
 SEARCH_ENGINES = {
     'duckduckgo': 'https://html.duckduckgo.com/html/?q={query}',
@@ -58,9 +91,26 @@ SEARCH_ENGINES = {
 DEFAULT_SEARCH_ENGINE = 'duckduckgo'
 
 # Rate Limiting
-MAX_CONCURRENT_SEARCHES = 3
+MAX_CONCURRENT_SEARCHES = 3  # Searches a worker process runs at once; the rest wait in the queue
 SEARCH_COOLDOWN = 5  # Seconds between searches from same IP
 
+# Job Queue Settings
+MAX_QUEUED_SEARCHES = 1000  # Queued + running searches accepted before /api/search answers 503
+MAX_SEARCHES_PER_CLIENT = 5  # Queued + running single searches per client before /api/search answers 429
+MAX_BATCH_SIZE = 500  # Queries accepted by one /api/search/batch call
+MAX_BATCHES_PER_CLIENT = 2  # Unfinished batches per client before /api/search/batch answers 429
+BATCH_PAGE_CACHE_SIZE = 5000  # Fetched pages a worker keeps per batch so overlapping URLs are fetched once
+BATCH_CACHES_PER_WORKER = 4  # Batches whose page caches a worker keeps at the same time
+MAX_RUNNING_PER_CLIENT = 1  # Single searches of one client that run at the same time
+MAX_RUNNING_PER_BATCH = 3  # Searches of one batch that run at the same time (besides the client's single searches)
+MAX_SEARCH_PRIORITY = 9  # Priorities range 0 (default) .. MAX_SEARCH_PRIORITY, higher runs first
+JOB_POLL_INTERVAL = 2  # Seconds between queue polls of an idle worker
+JOB_HEARTBEAT_INTERVAL = 10  # Seconds between worker heartbeats (also picks up stop requests)
+JOB_STALE_AFTER = 120  # Running jobs without a heartbeat for this long are requeued
+JOB_REQUEUE_INTERVAL = 30  # Seconds between a worker's checks for stale jobs (of any worker)
+RUN_EMBEDDED_WORKER = True  # run.py starts a worker in-process; production runs worker.py instead
+WORKER_METRICS_PORT = 9101  # worker.py serves /metrics on this port (0 disables)
+
 # Proxy Settings
 USE_PROXIES = False  # Enable/disable proxy rotation
 # USE_PROXIES = True  # Enable/disable proxy rotation
@@ -74,3 +124,20 @@ PROXY_TIMEOUT = 10  # Seconds to wait for proxy validation
 HEADLESS_MODE = False  # Run browser in headless mode (set to False to see browser window)
 CHROME_DRIVER_PATH = None  # None = use Selenium's built-in manager
 
+# Browser Pool Settings (Chrome sessions shared by the Selenium scrapers)
+CHROME_POOL_SIZE = 3  # Chrome sessions a process keeps open at most (match MAX_CONCURRENT_SEARCHES)
+CHROME_POOL_WARM_SESSIONS = 1  # Sessions a search worker starts before its first search (0 = on demand)
+CHROME_POOL_MAX_USES = 25  # Searches a session serves before it is replaced
+CHROME_POOL_IDLE_TIMEOUT = 600  # Seconds an unused session is kept open
+CHROME_POOL_CHECKOUT_TIMEOUT = 300  # Seconds a scraper waits for a free session when all are busy
+
+# Selenium Wait Settings (how the Selenium scrapers wait for pages, see app/services/waits.py)
+SELENIUM_WAIT_TIMEOUT = 15  # Seconds to wait for a page's results to appear
+SELENIUM_SETTLE_TIMEOUT = 5  # Seconds to wait for a page to settle after a scroll or click
+SELENIUM_SETTLE_TIME = 0.5  # Seconds without DOM changes or requests in flight that count as settled
+SELENIUM_POLL_INTERVAL = 0.1  # Seconds between checks of a wait's condition
+SELENIUM_JITTER_FLOOR = (1, 2)  # Random minimum seconds a page load waits, so timing doesn't look scripted (None = off)
+
+# Bulk Export Settings
+EXPORT_BATCH_SIZE = 10000  # Rows per Parquet row group / Arrow record batch
+EXPORT_COMPRESSION = 'zstd'  # Parquet compression codec
@@ -8,6 +8,10 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.services.scrapers.web_search import WebSearchScraper
+from app.services.log import configure_logging
+
+# Show the scraper's per-result messages
+configure_logging(level='DEBUG')
 
 print("="*60)
 print("Web Search Debug Mode - Visible Browser")
@@ -4,6 +4,19 @@ from config import HOST, PORT, DEBUG
 app = create_app()
 
 if __name__ == '__main__':
+    # Local single-node runs apply pending migrations once at startup;
+    # production deploys run scripts/migrate_db.py instead
+    from app.database import Database
+    from app.migrations import run_migrations
+    run_migrations(Database())
+    
+    # Run queued searches in-process; with the reloader only the serving child does
+    import os
+    from config import RUN_EMBEDDED_WORKER
+    if RUN_EMBEDDED_WORKER and (not DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        from app.services.worker import SearchWorker
+        SearchWorker().start_in_background()
+    
     print(f"""
     ╔══════════════════════════════════════════╗
     ║   Email Extractor Platform Started!     ║
@@ -5,27 +5,23 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import Database
+from app.migrations import run_migrations, get_schema_version, LATEST_VERSION
 
 def migrate():
     print("Starting database migration...")
     try:
         db = Database()
-        # init_database is called in __init__, so just instantiating it triggers table creation
-        print("Database initialized and tables created/verified.")
+        applied = run_migrations(db)
         
-        # Verify businesses table exists
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SHOW TABLES LIKE 'businesses'")
-        if cursor.fetchone():
-            print("✅ 'businesses' table exists.")
+        if applied:
+            print(f"✅ Applied migrations: {', '.join(str(v) for v in applied)}")
         else:
-            print("❌ 'businesses' table was NOT created.")
-            
-        conn.close()
+            print("✅ Schema already up to date.")
+        print(f"Schema version: {get_schema_version(db)} (latest: {LATEST_VERSION})")
         
     except Exception as e:
         print(f"Migration failed: {e}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     migrate()
@@ -0,0 +1,22 @@
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Database
+
+def rebuild():
+    print("Rebuilding aggregate stats counters...")
+    try:
+        db = Database()
+        counters = db.rebuild_stats()
+        for name, value in counters.items():
+            print(f"  ✓ {name} = {value}")
+        print("\nStats counters rebuilt successfully!")
+        
+    except Exception as e:
+        print(f"\nRebuild failed: {e}")
+
+if __name__ == "__main__":
+    rebuild()
@@ -1,18 +1,18 @@
 from app.database import Database
+from app.migrations import run_migrations
 
 def setup():
     print("Initializing database...")
     try:
         db = Database()
-        # The __init__ method calls init_database() which creates all tables
-        # if they don't exist. Since tables were deleted, this will recreate them.
+        # Applies every pending versioned migration (creates all tables on a fresh database)
+        run_migrations(db)
         print("Database tables created successfully.")
         
         # Verify tables
         conn = db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SHOW TABLES")
-        tables = [table[0] for table in cursor.fetchall()]
+        tables = db.backend.list_tables(cursor)
         print(f"Tables found: {', '.join(tables)}")
         conn.close()
         
@@ -0,0 +1,48 @@
+"""
+Shared fixtures: a migrated SQLite database in a temporary directory and a
+Flask test client whose routes use it
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db(tmp_path):
+    from app.database import Database
+    from app.migrations import run_migrations
+    from app.storage.sqlite_backend import SQLiteBackend
+
+    database = Database(backend=SQLiteBackend(path=str(tmp_path / 'test.db')))
+    run_migrations(database)
+    return database
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    pytest.importorskip('flask')
+    pytest.importorskip('flask_cors')
+    from app import create_app
+    from app import routes
+
+    monkeypatch.setattr(routes, 'db', db)
+    app = create_app()
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+def sse_events(body):
+    """(event, data) pairs of a Server-Sent Events response body"""
+    import json
+
+    events = []
+    for message in body.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in message.splitlines() if ': ' in line and not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
@@ -0,0 +1,36 @@
+"""Batch searches: validation, claiming and the shared page cache"""
+
+import pytest
+
+from app.services.batch import BatchFetchCache
+
+
+@pytest.mark.parametrize('queries', ['dentists in Austin', ['dentists', 3], {'q': 'dentists'}])
+def test_queries_must_be_a_list_of_strings(client, queries):
+    response = client.post('/api/search/batch', json={'queries': queries})
+    assert response.status_code == 400
+
+
+def test_batch_searches_run_alongside_each_other(db):
+    _, search_ids = db.create_search_batch('b', 'client', 0, [
+        (f'dentists {n}', 'web', 'duckduckgo', {'query': f'dentists {n}'}) for n in range(4)
+    ])
+    claimed = [db.claim_search_job('w', 1, 3) for _ in range(4)]
+
+    # Three of the batch at once, regardless of the client's single-search quota of one
+    assert [job['search_id'] for job in claimed[:3]] == search_ids[:3]
+    assert claimed[3] is None
+
+
+def test_failed_fetches_are_not_cached():
+    cache = BatchFetchCache(10)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return ([], [], []) if len(calls) == 1 else (['info@acme.com'], [], [])
+
+    assert cache.get_or_fetch('https://acme.com', fetch, keep=any) == ([], [], [])
+    assert cache.get_or_fetch('https://acme.com', fetch, keep=any) == (['info@acme.com'], [], [])
+    assert cache.get_or_fetch('https://acme.com', fetch, keep=any) == (['info@acme.com'], [], [])
+    assert len(calls) == 2
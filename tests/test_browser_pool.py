@@ -0,0 +1,33 @@
+"""Browser pool: what happens to sessions handed back"""
+
+from app.services.browser_pool import BrowserPool, BrowserSession
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def fake_pool(monkeypatch):
+    pool = BrowserPool(size=2, checkout_timeout=0)
+    monkeypatch.setattr(pool, '_start', lambda key, scraper: BrowserSession(FakeDriver(), key[0], None, scraper))
+    return pool
+
+
+def test_debug_mode_keeps_only_the_last_browser_open(monkeypatch):
+    pool = fake_pool(monkeypatch)
+    sessions = []
+    for _ in range(3):
+        session = pool.checkout('maps')
+        pool.release(session, keep_open=True)
+        sessions.append(session)
+
+    # Each one left the pool, and the one before was quit when the next was kept open
+    assert [session.driver.quit_called for session in sessions] == [True, True, False]
+    assert pool._open == 0
+
+    pool.shutdown()
+    assert sessions[-1].driver.quit_called
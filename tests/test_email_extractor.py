@@ -0,0 +1,63 @@
+"""Email extraction: the anchored scan against a findall over the whole text, and the verdict cache"""
+
+import pytest
+
+from app.services import email_extractor
+from app.services.email_extractor import EMAIL_PATTERNS, EMAIL_WINDOW, EmailExtractor
+from app.services.metrics import CACHE_REQUESTS
+
+ADJACENT = [
+    'info@acme.orgu@v.io',
+    'sales@acme.com|support@acme.com',
+    'a@b.co@c.io@d.org',
+    'call 555-1234&#64;info@acme.orgu@v.io.contact@acme.org ok',
+    'x-y@acme.org.u@v.io x-y@acme.org.@',
+    '@@u@v.io@@ac.u@acme.orgu..c.ccbx-y@acme.org.@',
+]
+
+LONG_RUNS = [
+    'a' * (EMAIL_WINDOW + 40) + 'info@acme.org u@v.io',
+    'info@acme.org' + '.a' * EMAIL_WINDOW + 'u@v.io sales@acme.com',
+    'u@v.io' + 'b' * (EMAIL_WINDOW - 3) + '@acme.orgu..c.ccbx-y@acme.org',
+]
+
+
+@pytest.mark.parametrize('text', ADJACENT)
+def test_candidates_match_findall(text):
+    extractor = EmailExtractor()
+    assert extractor._email_candidates(text) == EMAIL_PATTERNS[str].findall(text)
+    assert extractor._email_candidates(text.encode()) == EMAIL_PATTERNS[bytes].findall(text.encode())
+
+
+@pytest.mark.parametrize('text', LONG_RUNS)
+def test_runs_past_the_window_find_no_other_valid_emails(text):
+    extractor = EmailExtractor()
+    expected = extractor._valid_unique(EMAIL_PATTERNS[str].findall(text))
+    assert extractor.extract_from_text(text) == expected
+
+
+@pytest.mark.parametrize('text', ADJACENT + LONG_RUNS)
+def test_streamed_page_matches_whole_page(text):
+    extractor = EmailExtractor()
+    stream = extractor.stream()
+    for start in range(0, len(text), 7):
+        stream.feed(text[start:start + 7])
+    assert stream.close()[0] == extractor.extract_from_html(text)[0]
+
+
+def verdict_lookups(result):
+    return CACHE_REQUESTS._values.get(('email_verdict', result), 0)
+
+
+def test_verdicts_are_cached_across_pages():
+    email_extractor._verdict_cache.clear()
+    extractor = EmailExtractor()
+    footer = '<footer>Contact info@acme.com or logo.png@2x.png</footer>'
+    hits, misses = verdict_lookups('hit'), verdict_lookups('miss')
+
+    assert extractor.extract_from_html('<p>Sales: sales@acme.com</p>' + footer)[0] == ['sales@acme.com', 'info@acme.com']
+    assert (verdict_lookups('hit') - hits, verdict_lookups('miss') - misses) == (0, 3)
+
+    # The footer's addresses, valid or not, are validated once for the whole site
+    assert extractor.extract_from_html('<p>Jobs: jobs@acme.com</p>' + footer)[0] == ['jobs@acme.com', 'info@acme.com']
+    assert (verdict_lookups('hit') - hits, verdict_lookups('miss') - misses) == (2, 4)
@@ -0,0 +1,16 @@
+"""Phone numbers: NANP plausibility checks"""
+
+import pytest
+
+from app.services.phones import normalize_phone, phone_from_parts
+
+
+@pytest.mark.parametrize('national', ['2120551234', '2121551234', '0125551234', '1125551234'])
+def test_nanp_area_code_and_exchange_never_start_with_0_or_1(national):
+    assert phone_from_parts(None, national) is None
+    assert phone_from_parts('1', national) is None
+
+
+def test_nanp_numbers_in_text():
+    assert normalize_phone('(212) 055-1234') is None
+    assert normalize_phone('(212) 555-1234').e164 == '+12125551234'
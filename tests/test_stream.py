@@ -0,0 +1,47 @@
+"""/api/stream of searches whose events aren't in this process's event bus"""
+
+from conftest import sse_events
+
+
+def test_finished_search_outside_the_bus_gets_its_results(client, db):
+    search_id = db.create_search('plumbers denver')
+    db.add_email(search_id, 'info@acme-plumbing.com', 'https://acme-plumbing.com/contact', 'acme-plumbing.com')
+    db.update_search_status(search_id, 'completed', pages_crawled=3, total_emails=1)
+
+    response = client.get(f'/api/stream/{search_id}')
+    events = [event for event, _ in sse_events(response.get_data(as_text=True))]
+
+    # No result events: the client must be told to fetch /api/results before 'complete'
+    assert events[-2:] == ['reset', 'complete']
+    assert not {'email', 'phone', 'business'} & set(events)
+
+    results = client.get(f'/api/results/{search_id}').get_json()['results']
+    assert [row['email'] for row in results['emails']] == ['info@acme-plumbing.com']
+
+
+def test_unknown_search(client):
+    assert client.get('/api/stream/999').status_code == 404
+
+
+def test_search_run_by_another_process_is_followed_until_it_finishes(client, db, monkeypatch):
+    import threading
+    from app import routes
+
+    monkeypatch.setattr(routes, 'SSE_DB_POLL_INTERVAL', 0.01)
+    search_id = db.create_search('plumbers denver')
+    db.update_search_status(search_id, 'running', pages_crawled=2, total_emails=0)
+
+    def checkpoints():
+        db.update_search_status(search_id, 'running', pages_crawled=5, total_emails=1)
+        db.update_search_status(search_id, 'completed', pages_crawled=8, total_emails=1)
+
+    # Read the stream while the "worker" writes its checkpoints
+    chunks = (chunk.decode() for chunk in client.get(f'/api/stream/{search_id}').iter_encoded())
+    first = next(chunk for chunk in chunks if 'event:' in chunk)
+    threading.Thread(target=checkpoints).start()
+    events = sse_events(first + ''.join(chunks))
+
+    statuses = [data for event, data in events if event == 'status']
+    assert statuses[0]['status'] == 'running' and statuses[0]['pages_crawled'] == 2
+    assert statuses[-1]['status'] == 'completed' and statuses[-1]['pages_crawled'] == 8
+    assert [event for event, _ in events][-2:] == ['reset', 'complete']
@@ -0,0 +1,62 @@
+"""
+Search Worker Entry Point
+
+Runs queued searches from the search_jobs table. Start one or more next to
+the web server (e.g. gunicorn wsgi:app):
+
+    python worker.py [--concurrency N]
+"""
+
+import argparse
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import MAX_CONCURRENT_SEARCHES, WORKER_METRICS_PORT
+from app.services.worker import SearchWorker
+from app.services import metrics
+from app.services.log import configure_logging
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves this worker's crawl metrics for Prometheus to scrape"""
+
+    def do_GET(self):
+        body = metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port):
+    server = ThreadingHTTPServer(('0.0.0.0', port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    print(f"Worker metrics on http://0.0.0.0:{port}/metrics")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run queued email extraction searches')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENT_SEARCHES,
+                        help='Searches to run at the same time')
+    parser.add_argument('--metrics-port', type=int, default=WORKER_METRICS_PORT,
+                        help='Port for the Prometheus metrics endpoint (0 disables)')
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    worker = SearchWorker(concurrency=args.concurrency)
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == '__main__':
+    main()